@@ -1,4 +1,22 @@
+import importlib.util
 import os
+import re
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv("auth.env")  # before the modules below read their settings
+
+import llm_cache
+import rate_limit
+import structured_output
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Tool modules stay loaded between menu picks so their SDK imports and
+# Gemini clients are only paid for once per session.
+loaded_tools = {}
 
 def display_menu():
     print("\nSelect a script to run:")
@@ -12,6 +30,24 @@ def display_menu():
     print("8. Analyse stakeholders, competitors and entry strategies")
     print("0. Exit")
 
+def load_tool(script_name):
+    """Imports a tool script in-process, reusing the module if it is already loaded."""
+    tool = loaded_tools.get(script_name)
+    if tool is not None:
+        return tool
+
+    module_name = "tool_" + re.sub(r"\W+", "_", os.path.splitext(script_name)[0])
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(BASE_DIR, script_name))
+    tool = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = tool
+    try:
+        spec.loader.exec_module(tool)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    loaded_tools[script_name] = tool
+    return tool
+
 def run_script(script_number):
     script_map = {
         "1": "1.py",
@@ -26,18 +62,41 @@ def run_script(script_number):
     
     script_name = script_map.get(script_number)
     
-    if script_name and os.path.exists(script_name):
+    if script_name and os.path.exists(os.path.join(BASE_DIR, script_name)):
         print(f"Running {script_name}...")
-        os.system(f'python "{script_name}"')
+        warm = script_name in loaded_tools
+        started = time.perf_counter()
+        try:
+            tool = load_tool(script_name)
+        except Exception as e:
+            print(f"Error loading {script_name}: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{script_name} ready in {elapsed_ms:.1f} ms ({'warm' if warm else 'cold'} start)")
+
+        try:
+            tool.main()
+        except (KeyboardInterrupt, EOFError):
+            print("\nReturning to menu.")
+        except SystemExit:
+            pass
+        except Exception as e:
+            print(f"Error running {script_name}: {e}")
     else:
         print(f"Script {script_name} not found.")
 
 def main():
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+
     while True:
         display_menu()
         choice = input("Enter the number of the script to run (or 0 to exit): ")
         
         if choice == "0":
+            llm_cache.print_stats()
+            structured_output.print_stats()
+            rate_limit.print_stats()
             print("Exiting program.")
             break
         elif choice in map(str, range(1, 9)):
@@ -45,4 +104,5 @@ def main():
         else:
             print("Invalid choice. Please select a valid script number.")
 
-main()
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,23 @@
-from google import genai
 import json
 from dotenv import load_dotenv
-import os
-import requests
 
-load_dotenv("auth.env")
+load_dotenv("auth.env")  # before the modules below read their settings
 
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-custom_search_api_key = os.getenv("CUSTOM_SEARCH_API_KEY")
-search_engine_id = os.getenv("SEARCH_ENGINE_ID")
+import gemini_client
+import profile_search
+import profile_store
+import structured_output
+
+TOOL_NAME = "people_search"
 
 def get_dheader_to_ask_user(jobrole):
-    response = client.models.generate_content(
+    headers = structured_output.generate(
+        [f"What would you need to know to help me decide what profile to search for when hiring a {jobrole}? Give only the short headers (questions) for what's needed, most important first, no explanations."],
+        "headers",
         model="gemini-2.0-flash",
-        contents=[f"What would you need to know to help me decide what profile to search for when hiring a {jobrole}? Give in list and do not give any preface and para info just give headers in list. Just provide headers for what's needed. Give directly from point 1 no pretexts and explanations."]
+        tool=TOOL_NAME,
     )
-    return response.text.split("\n")
+    return [header.strip() for header in headers if header.strip()]
 
 def asking_user_togive_headers(allheaders):
     userdata = {}
@@ -30,17 +32,24 @@ def asking_user_togive_headers(allheaders):
 
 def showing_candidates(role, user_inputs):
     user_inputs_str = json.dumps(user_inputs)
-    response = client.models.generate_content(
+    response = gemini_client.generate(
+        [f"I need to hire {role}. Based on these details:\n{user_inputs_str}\nSuggest ideal candidate profiles. Give me a relevant search term I should use in LinkedIn to search for such a candidate. Don't give extra info, just the details I need to enter in LinkedIn to search users with that criteria."],
         model="gemini-2.0-flash",
-        contents=[f"I need to hire {role}. Based on these details:\n{user_inputs_str}\nSuggest ideal candidate profiles. Give me a relevant search term I should use in LinkedIn to search for such a candidate. Don't give extra info, just the details I need to enter in LinkedIn to search users with that criteria."]
+        tool=TOOL_NAME,
     )
-    return response.text
+    return response
 
-def search_linkedin_profiles(query):
-    url = f"https://www.googleapis.com/customsearch/v1?key={custom_search_api_key}&cx={search_engine_id}&q={query}"
-    response = requests.get(url)
-    results = response.json()
-    return results
+def search_linkedin_profiles(recommendations, role, user_inputs):
+    """
+    Searches only the result pages not already in the local profile store,
+    then returns the stored profiles found by this search's queries, ranked
+    against the role and the answers to the requirement questions.
+    """
+    store = profile_store.ProfileStore()
+    queries = profile_search.derive_queries(recommendations, role)
+    fetched = profile_search.search_profiles(queries, store=store)
+    requirements = " ".join([role, *(str(answer) for answer in user_inputs.values())])
+    return store.rank(requirements, queries) or fetched
 
 def main():
     role = input("What role are you looking to hire? (e.g. Developer, Designer): ")
@@ -50,10 +59,10 @@ def main():
     print("\nRecommended candidate profiles:\n")
     print(recommendations)
 
-    search_query = recommendations  # Use the generated recommendations as the search query
-    linkedin_profiles = search_linkedin_profiles(search_query)
-    print("\nLinkedIn Profiles:\n")
-    for item in linkedin_profiles.get('items', []):
+    linkedin_profiles = search_linkedin_profiles(recommendations, role, user_inputs)
+    print(f"\nLinkedIn Profiles ({len(linkedin_profiles)}):\n")
+    for item in linkedin_profiles:
         print(f"Title: {item['title']}\nLink: {item['link']}\n")
 
-main()
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,53 @@
+import argparse
+import csv
+import json
 import os
-import google.generativeai as genai
-import fitz  # PyMuPDF for reading PDFs
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from dotenv import load_dotenv
 
-load_dotenv("auth.env")
+load_dotenv("auth.env")  # before the modules below read their settings
 
-gemini_api_key = os.getenv("GOOGLE_API_KEY")
-genai.configure(api_key=gemini_api_key)
+import gemini_client
+import law_cache
+import structured_output
+from law_index import LawIndex
+from lazy_imports import lazy_import
 
-MODEL_NAME = 'gemini-1.0-pro'
-model = genai.GenerativeModel(MODEL_NAME)
+fitz = lazy_import("fitz")  # PyMuPDF for reading PDFs
+
+MODEL_NAME = 'gemini-2.0-flash'  # structured_output needs a model with response schemas
+TOOL_NAME = "legal_check"
+
+# Only the LAW_TOP_K laws most relevant to a decision (BM25 score above
+# LAW_MIN_SCORE) are sent to the model.
+LAW_TOP_K = int(os.getenv("LAW_TOP_K", "25"))
+LAW_MIN_SCORE = float(os.getenv("LAW_MIN_SCORE", "0"))
+
+# Laws are sent in shards of at most LAW_SHARD_TOKENS tokens, with up to
+# LAW_MAX_CONCURRENCY shards in flight at once.
+LAW_SHARD_TOKENS = int(os.getenv("LAW_SHARD_TOKENS", "4000"))
+LAW_MAX_CONCURRENCY = int(os.getenv("LAW_MAX_CONCURRENCY", "4"))
+
+# Decisions evaluated in parallel in batch mode (python 11.py --batch FILE).
+BATCH_WORKERS = int(os.getenv("LAW_BATCH_WORKERS", "4"))
+
+
+def get_model():
+    """Returns the shared handle for MODEL_NAME."""
+    return gemini_client.get_model(MODEL_NAME)
 
 
 def load_laws_from_pdf(filepath):
-    """Loads laws from a PDF file, assuming one law per line."""
+    """
+    Loads laws from a PDF file, assuming one law per line.
+
+    The extracted lines are cached next to the PDF (see law_cache), so the
+    PDF is only parsed again when its content changes.
+    """
     try:
+        cached = law_cache.load(filepath)
+        if cached is not None:
+            return cached
         doc = fitz.open(filepath)
         laws = []
         for page in doc:
@@ -22,6 +55,7 @@ def load_laws_from_pdf(filepath):
             lines = text.splitlines() 
             laws.extend([line.strip() for line in lines if line.strip()])
         doc.close()
+        law_cache.save(filepath, laws)
         return laws
     except FileNotFoundError:
         print(f"Error: Law PDF file not found at {filepath}")
@@ -31,14 +65,100 @@ def load_laws_from_pdf(filepath):
         return []
 
 
-def analyze_decision_vs_laws(decision_text, laws, model):
+def select_relevant_laws(decision_text, laws, index=None, top_k=LAW_TOP_K, min_score=LAW_MIN_SCORE):
+    """Returns the laws most relevant to the decision, best match first."""
+    if top_k <= 0 or len(laws) <= top_k:
+        return list(laws)
+    if index is None:
+        index = LawIndex(laws)
+    return [laws[i] for i, _ in index.top_k(decision_text, k=top_k, min_score=min_score)]
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def pack_law_shards(laws, token_budget=LAW_SHARD_TOKENS):
+    """Splits laws, in order, into shards whose combined text fits the token budget."""
+    shards = []
+    current = []
+    used = 0
+    for law in laws:
+        cost = estimate_tokens(law) + 1
+        if current and used + cost > token_budget:
+            shards.append(current)
+            current = []
+            used = 0
+        current.append(law)
+        used += cost
+    if current:
+        shards.append(current)
+    return shards
+
+
+def build_law_prompt(decision_text, laws):
+    return f"""
+You are an expert legal analyst.  You must carefully analyze the following business decision and compare it to the following laws.
+
+Business Decision:
+{decision_text}
+
+Laws:
+{chr(10).join(laws)}
+
+Analyze whether the business decision potentially violates any of the listed laws.
+Return one entry per law with the law text, whether the decision could violate it,
+and a clear and concise explanation of how it could be violated (or why it is not).
+"""
+
+
+def parse_law_response(entries):
+    """Splits the structured law check reply into (violations, rationales)."""
+    violations = []
+    rationales = []
+    for entry in entries:
+        if entry["violated"]:
+            violations.append(entry["law"].strip())
+            rationales.append(entry["explanation"].strip())
+    return violations, rationales
+
+
+def analyze_law_shard(decision_text, laws, model, strict=False, failures=None):
+    try:
+        entries = structured_output.generate(build_law_prompt(decision_text, laws), "law_check", model, tool=TOOL_NAME)
+        return parse_law_response(entries)
+    except Exception as e:
+        if strict:
+            raise
+        print(f"Error during Gemini analysis: {e}")
+        if failures is not None:
+            failures.append({"laws": laws, "error": str(e)})
+        return [], []
+
+
+def analyze_decision_vs_laws(decision_text, laws, model, index=None, top_k=LAW_TOP_K, min_score=LAW_MIN_SCORE,
+                             shard_tokens=LAW_SHARD_TOKENS, max_concurrency=LAW_MAX_CONCURRENCY, strict=False,
+                             failures=None):
     """
     Analyzes a business decision against a list of laws using Gemini.
 
+    The relevant laws are packed into shards of at most `shard_tokens`
+    tokens, which are checked concurrently and merged back in law order.
+
     Args:
         decision_text (str): The text describing the business decision.
         laws (list): A list of strings, where each string is a law.
         model: The Gemini model to use.
+        index (LawIndex): Index over `laws`; built on the fly if omitted.
+        top_k (int): Maximum number of laws sent to the model (0 sends all).
+        min_score (float): BM25 score a law needs to be considered relevant.
+        shard_tokens (int): Token budget for the laws in one request.
+        max_concurrency (int): Maximum number of shards checked at once.
+        strict (bool): Raise Gemini errors instead of reporting them and
+            skipping the failed shard.
+        failures (list): If given, one {"laws": [...], "error": str} entry
+            is appended per shard that could not be checked.
 
     Returns:
         list: A list of laws that the decision potentially violates,
@@ -50,67 +170,218 @@ def analyze_decision_vs_laws(decision_text, laws, model):
         print("Warning: No laws provided for analysis.")
         return [], []
 
-    prompt = f"""
-You are an expert legal analyst.  You must carefully analyze the following business decision and compare it to the following laws.
+    laws = select_relevant_laws(decision_text, laws, index, top_k, min_score)
+    if not laws:
+        print("None of the stored laws relate to this decision closely enough to check.")
+        return [], []
 
-Business Decision:
-{decision_text}
+    shards = pack_law_shards(laws, shard_tokens)
+    failed = []
+    if len(shards) == 1:
+        results = [analyze_law_shard(decision_text, shards[0], model, strict, failed)]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(shards)))) as pool:
+            results = list(pool.map(lambda shard: analyze_law_shard(decision_text, shard, model, strict, failed), shards))
+    if failed:
+        unchecked = sum(len(failure["laws"]) for failure in failed)
+        print(f"Warning: {unchecked} of {len(laws)} relevant laws could not be checked; the result is incomplete.")
+        if failures is not None:
+            failures.extend(failed)
 
-Laws:
-{chr(10).join(laws)}  # Join laws with newline character
+    violations = []
+    rationales = []
+    for shard_violations, shard_rationales in results:
+        violations.extend(shard_violations)
+        rationales.extend(shard_rationales)
+    return violations, rationales
 
-Analyze whether the business decision potentially violates any of the listed laws.
-For each law, provide a clear and concise explanation of how the decision could violate it.
-If a law is not violated, you should EXPLICITLY state "No violation".
-Your response should follow this format EXACTLY:
 
-Law: [Law text]
-Violation: [Explanation of violation OR "No violation"]
+def read_decisions(path, invalid=None):
+    """
+    Yields (record_id, decision_text) from a JSONL or CSV file.
 
-Begin!
-"""
+    JSONL lines are objects with a "decision" field (or plain JSON strings);
+    CSV files need a "decision" column. An "id" field/column is used when
+    present, otherwise the line number is the record id. JSONL lines that
+    are neither are reported, added to `invalid` as (line_number, reason)
+    and skipped. Raises ValueError at once for a CSV file without a
+    "decision" column.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            columns = next(csv.reader(f), [])
+        if "decision" not in columns:
+            raise ValueError(f"{path} has no 'decision' column")
+        return _read_csv_decisions(path)
+    return _read_jsonl_decisions(path, invalid if invalid is not None else [])
 
-    try:
-        response = model.generate_content(prompt)
-        response_text = response.text
 
-        violations = []
-        rationales = []
-        current_law = None
-        current_violation = None
+def _read_csv_decisions(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row_number, row in enumerate(csv.DictReader(f), start=1):
+            yield str(row.get("id") or row_number), (row.get("decision") or "").strip()
+
 
-        for line in response_text.splitlines():
+def _read_jsonl_decisions(path, invalid):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
             line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                reason = f"not valid JSON ({e})"
+            else:
+                if isinstance(record, str):
+                    yield str(line_number), record.strip()
+                    continue
+                if isinstance(record, dict):
+                    yield str(record.get("id", line_number)), str(record.get("decision", "")).strip()
+                    continue
+                reason = "not a JSON object or string"
+            print(f"Line {line_number}: skipped, {reason}")
+            invalid.append((line_number, reason))
 
-            if line.startswith("Law:"):
-                current_law = line[len("Law:"):].strip()
-            elif line.startswith("Violation:"):
-                current_violation = line[len("Violation:"):].strip()  
 
-            if current_law is not None and current_violation is not None:
-                if current_violation != "No violation":
-                    violations.append(current_law)
-                    rationales.append(current_violation)
-                current_law = None 
-                current_violation = None
+def completed_record_ids(output_path):
+    """
+    Returns the ids already written successfully to a batch output file.
+
+    Failed results (and a line cut off by an interrupted run) are removed
+    from the file, which is rewritten atomically, since those records are
+    checked again and appended anew: every id appears at most once.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    kept = []
+    dropped = 0
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                dropped += 1  # partially written line from an interrupted run
+                continue
+            if result.get("error") or str(result["id"]) in done:
+                dropped += 1
+                continue
+            done.add(str(result["id"]))
+            kept.append(line if line.endswith("\n") else line + "\n")
+    if dropped:
+        temp_path = output_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(temp_path, output_path)
+    return done
 
-        return violations, rationales
 
+def evaluate_record(record_id, decision_text, laws, model, index):
+    try:
+        violations, rationales = analyze_decision_vs_laws(decision_text, laws, model, index, strict=True)
     except Exception as e:
-        print(f"Error during Gemini analysis: {e}")
-        return [], []
+        return {"id": record_id, "decision": decision_text, "violations": [], "error": str(e)}
+    return {
+        "id": record_id,
+        "decision": decision_text,
+        "violations": [{"law": law, "rationale": rationale} for law, rationale in zip(violations, rationales)],
+        "error": None,
+    }
 
 
-if __name__ == "__main__":
+def run_batch(input_path, output_path, laws, model, index=None, workers=BATCH_WORKERS):
+    """
+    Checks every decision in `input_path` and appends one JSON line per result
+    to `output_path` as soon as it completes.
+
+    Records already in the output without an error are skipped, so an
+    interrupted batch resumes where it stopped; earlier failures are dropped
+    from the output and checked again. At most `workers` decisions
+    are evaluated at once and only a small window of them is held in memory.
+    Input lines that cannot be read are reported and counted as skipped;
+    results that finished are written even if reading the input fails.
+    """
+    if index is None:
+        index = LawIndex(laws)
+    invalid = []
+    decisions = read_decisions(input_path, invalid)
+    done = completed_record_ids(output_path)
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        if out.tell() > 0:
+            with open(output_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    out.write("\n")
+
+        def write_results(finished):
+            for future in finished:
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["failed" if result["error"] else "ok"] += 1
+                status = f"error: {result['error']}" if result["error"] else f"{len(result['violations'])} potential violation(s)"
+                print(f"[{result['id']}] {status}")
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            pending = set()
+            try:
+                for record_id, decision_text in decisions:
+                    if record_id in done or not decision_text:
+                        counts["skipped"] += 1
+                        continue
+                    pending.add(pool.submit(evaluate_record, record_id, decision_text, laws, model, index))
+                    if len(pending) >= 2 * workers:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        write_results(finished)
+            finally:
+                write_results(as_completed(pending))
+    counts["skipped"] += len(invalid)
+
+    print(f"Batch finished: {counts['ok']} checked, {counts['failed']} failed, {counts['skipped']} skipped. Results in {output_path}")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check business decisions against the laws in laws.pdf.")
+    parser.add_argument("--batch", help="JSONL or CSV file of decisions to check")
+    parser.add_argument("--output", help="JSONL file for batch results (default: <batch file>.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="decisions checked in parallel")
+    args = parser.parse_args(argv)
+
     law_file_path = "laws.pdf" 
     laws = load_laws_from_pdf(law_file_path)
-    business_decision = input("Enter the business decision to analyze: ")
+    index = LawIndex(laws)
 
-    violations, rationales = analyze_decision_vs_laws(business_decision, laws, model)
+    batch_path = args.batch
+    if not batch_path:
+        business_decision = input("Enter the business decision to analyze (or a .jsonl/.csv file of decisions): ")
+        if business_decision.strip().lower().endswith((".jsonl", ".csv")) and os.path.exists(business_decision.strip()):
+            batch_path = business_decision.strip()
+    if batch_path:
+        output_path = args.output or os.path.splitext(batch_path)[0] + ".results.jsonl"
+        try:
+            run_batch(batch_path, output_path, laws, get_model(), index, args.workers)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+        return
+
+    failures = []
+    violations, rationales = analyze_decision_vs_laws(business_decision, laws, get_model(), index, failures=failures)
     if violations:
         print("Potential Law Violations:")
         for i, law in enumerate(violations):
             print(f"- {law}")
             print(f"  Rationale: {rationales[i]}")  # Print the rationale
+    elif failures:
+        print("No potential law violations found in the laws that were checked, but the check is incomplete (see the errors above).")
     else:
         print("No potential law violations found.")
+    if failures:
+        print("Run the check again once the Gemini errors clear; unchecked laws are not covered by this result.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,54 @@
-from dotenv import load_dotenv
 import os
+import argparse
 import datetime
-import google.generativeai as genai
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+import json
 import re
+import time
+import uuid
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv("auth.env")  # before the modules below read their settings
+
+import calendar_store
+import gemini_client
+import meeting_parser
+import scheduler
+import structured_output
+from lazy_imports import lazy_import
+
+google_credentials = lazy_import("google.oauth2.credentials")
+google_auth_flow = lazy_import("google_auth_oauthlib.flow")
+google_auth_requests = lazy_import("google.auth.transport.requests")
+discovery = lazy_import("googleapiclient.discovery")
 
-load_dotenv("auth.env")
-gemini_api_key = os.getenv("GOOGLE_API_KEY")
-genai.configure(api_key=gemini_api_key)
-model = genai.GenerativeModel('gemini-1.0-pro')
+MODEL_NAME = 'gemini-2.0-flash'  # structured_output needs a model with response schemas
+TOOL_NAME = "calendar"
+
+def get_model():
+    """Returns the shared handle for MODEL_NAME."""
+    return gemini_client.get_model(MODEL_NAME)
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 TOKEN_FILE = 'token.json'
+# Used only when the installed google-api-python-client has no bundled
+# (static) discovery document for Calendar v3.
+DISCOVERY_CACHE_FILE = os.getenv("CALENDAR_DISCOVERY_CACHE", "calendar_discovery.json")
 CREDENTIALS_FILE = 'client_secret_535201760510-8thq35fisfododotdfmevmfujknqop0m.apps.googleusercontent.com.json'
+# Reads within this many seconds of the last sync skip the delta request.
+SYNC_INTERVAL_SECONDS = float(os.getenv("CALENDAR_SYNC_INTERVAL", "30"))
+# Bulk mode: requests per Calendar API batch (the API accepts at most 50),
+# rounds of retries for failed items, and meeting requests parsed at once.
+BATCH_SIZE = min(int(os.getenv("CALENDAR_BATCH_SIZE", "50")), 50)
+BATCH_RETRIES = int(os.getenv("CALENDAR_BATCH_RETRIES", "3"))
+BULK_PARSE_WORKERS = int(os.getenv("CALENDAR_PARSE_WORKERS", "4"))
+# Scheduling: the owner's time zone, working hours (in every participant's
+# own time zone) and how far ahead free slots are searched.
+CALENDAR_TIME_ZONE = os.getenv("CALENDAR_TIME_ZONE", "Asia/Kolkata")
+WORK_HOURS = os.getenv("CALENDAR_WORK_HOURS", "09:00-18:00")
+SLOT_SEARCH_DAYS = int(os.getenv("CALENDAR_SLOT_SEARCH_DAYS", "14"))
+SUGGESTED_SLOTS = 3
 
 EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
@@ -25,115 +58,336 @@ def is_valid_email(email):
         return False
     return EMAIL_REGEX.match(email) is not None
 
+def build_event_body(date, start_time, subject, participants, duration_minutes=60):
+    """Builds the Calendar API body for a meeting; entries that are not emails go in the description."""
+    valid_participants = []
+    notes = ""
+    for p in participants:
+        p = p.strip()
+        if is_valid_email(p):
+            valid_participants.append(p)
+        elif p.lower() != 'none':
+            notes += f"{p}; "
+
+    start = datetime.datetime.strptime(f"{date} {start_time}", "%Y-%m-%d %H:%M")
+    end = start + datetime.timedelta(minutes=duration_minutes)
+    return {
+        'summary': subject,
+        'start': {
+            'dateTime': start.isoformat(),
+            'timeZone': CALENDAR_TIME_ZONE,
+        },
+        'end': {
+            'dateTime': end.isoformat(),
+            'timeZone': CALENDAR_TIME_ZONE,
+        },
+        'attendees': [{'email': p} for p in valid_participants],
+        'description': notes.strip("; ")
+    }
+
+def work_hours():
+    start, end = WORK_HOURS.split("-")
+    return datetime.time.fromisoformat(start.strip()), datetime.time.fromisoformat(end.strip())
+
+def local_slot(slot_start):
+    """(date, time) strings for a UTC slot start, in the owner's time zone."""
+    local = slot_start.astimezone(zoneinfo.ZoneInfo(CALENDAR_TIME_ZONE))
+    return local.strftime("%Y-%m-%d"), local.strftime("%H:%M")
+
+def write_file_atomically(path, text):
+    """Writes via a temporary file and os.replace so readers never see a half-written file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def build_calendar_service(creds):
+    """Builds the Calendar v3 client without fetching the discovery document over the network."""
+    try:
+        return discovery.build('calendar', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
+    except (TypeError, discovery.UnknownApiNameOrVersion):
+        # Releases before 2.0 have no static_discovery argument and no bundled documents.
+        pass
+    if os.path.exists(DISCOVERY_CACHE_FILE):
+        with open(DISCOVERY_CACHE_FILE) as f:
+            return discovery.build_from_document(f.read(), credentials=creds)
+    service = discovery.build('calendar', 'v3', credentials=creds, static_discovery=False, cache_discovery=False)
+    try:
+        write_file_atomically(DISCOVERY_CACHE_FILE, json.dumps(service._rootDesc))
+    except (OSError, AttributeError, TypeError) as e:
+        print(f"Warning: could not cache the Calendar discovery document: {e}")
+    return service
+
+# 403 is also what permission errors return; only these reasons mean "slow down".
+RATE_LIMIT_REASONS = frozenset(["rateLimitExceeded", "userRateLimitExceeded"])
+
+def error_reasons(error):
+    """The "reason" codes of a Google API HttpError."""
+    reasons = set()
+    for detail in getattr(error, "error_details", None) or []:
+        if isinstance(detail, dict) and detail.get("reason"):
+            reasons.add(detail["reason"])
+    content = getattr(error, "content", None)
+    if content:
+        try:
+            data = json.loads(content)
+            for detail in data.get("error", {}).get("errors", []):
+                if detail.get("reason"):
+                    reasons.add(detail["reason"])
+        except (ValueError, TypeError, AttributeError):
+            pass
+    return reasons
+
+def is_retryable(error):
+    """Rate limits, server errors and transport failures are worth another try; other 4xx are not."""
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status == 403:
+        return bool(error_reasons(error) & RATE_LIMIT_REASONS)
+    return status is None or status == 429 or status >= 500
+
 class GoogleCalendarManager:
+    """
+    Talks to Google Calendar. Nothing is loaded or sent until the first
+    call that needs the API: `service` then reads the saved token (or runs
+    the OAuth flow), refreshes it if it has expired and builds the client.
+    """
+
     def __init__(self):
         self.creds = None
-        self.authenticate()
+        self._service = None
+        self.connect_ms = None
+        self.store = calendar_store.EventStore()
+        self._synced_at = None
+
+    @property
+    def service(self):
+        if self._service is None:
+            started = time.perf_counter()
+            self.authenticate()
+            self._service = build_calendar_service(self.creds)
+            self.connect_ms = (time.perf_counter() - started) * 1000
+            print(f"Connected to Google Calendar in {self.connect_ms:.0f} ms.")
+        elif self.creds is not None and self.creds.expired and self.creds.refresh_token:
+            # Long sessions outlive the access token; refresh it here so the
+            # renewed token is saved, not only held by the HTTP client.
+            self.refresh_credentials()
+        return self._service
 
     def authenticate(self):
         if os.path.exists(TOKEN_FILE):
-            self.creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+            self.creds = google_credentials.Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
         if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired:
-                self.creds.refresh(Request())
+            if self.creds and self.creds.expired and self.creds.refresh_token:
+                self.refresh_credentials()
             else:
-                flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
+                flow = google_auth_flow.InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
                 self.creds = flow.run_local_server(port=0)
-            with open(TOKEN_FILE, 'w') as token:
-                token.write(self.creds.to_json())
-        self.service = build('calendar', 'v3', credentials=self.creds)
-
-    def add_event(self, date, time, subject, participants):
-        valid_participants = []
-        notes = ""
-        for p in participants:
-            p = p.strip()
-            if is_valid_email(p):
-                valid_participants.append(p)
-            elif p.lower() != 'none':
-                notes += f"{p}; "
-
-        event = {
-            'summary': subject,
-            'start': {
-                'dateTime': f'{date}T{time}:00',
-                'timeZone': 'Asia/Kolkata',
-            },
-            'end': {
-                'dateTime': f'{date}T{int(time.split(":")[0]) + 1}:{time.split(":")[1]}:00',
-                'timeZone': 'Asia/Kolkata',
-            },
-            'attendees': [{'email': p} for p in valid_participants],
-            'description': notes.strip("; ")
-        }
+                write_file_atomically(TOKEN_FILE, self.creds.to_json())
+
+    def refresh_credentials(self):
+        self.creds.refresh(google_auth_requests.Request())
+        write_file_atomically(TOKEN_FILE, self.creds.to_json())
+
+    def sync(self, force=False):
+        """Brings the local event store up to date (only changes are fetched after the first run)."""
+        if not force and self._synced_at is not None and time.time() - self._synced_at < SYNC_INTERVAL_SECONDS:
+            return
+        self.store.sync(self.service)
+        self._synced_at = time.time()
+
+    def upcoming_events(self, until=None):
+        self.sync()
+        return self.store.between(datetime.datetime.now(datetime.timezone.utc), until)
+
+    def busy_index(self, attendees, time_min, time_max):
+        """Free/busy of the owner and `attendees` as a BusyIndex; calendars we cannot see are reported."""
+        calendars = ['primary'] + [a for a in attendees if is_valid_email(a)]
+        busy, errors = scheduler.query_busy(self.service, calendars, time_min, time_max)
+        for calendar, reason in errors.items():
+            print(f"Note: could not read the availability of {calendar} ({reason}).")
+        return scheduler.BusyIndex(busy)
+
+    def find_free_slots(self, attendees, duration_minutes=60, time_zones=(), start_date=None,
+                        days=SLOT_SEARCH_DAYS, count=SUGGESTED_SLOTS, busy=None):
+        """Earliest `count` slots (UTC datetimes) inside everyone's working hours where nobody is busy."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        start_date = start_date or now.astimezone(zoneinfo.ZoneInfo(CALENDAR_TIME_ZONE)).date()
+        end_date = start_date + datetime.timedelta(days=days)
+        work_start, work_end = work_hours()
+        windows = scheduler.working_windows(start_date, end_date, [CALENDAR_TIME_ZONE, *time_zones], work_start, work_end)
+        windows = [(max(start, now), end) for start, end in windows if end > now]
+        if not windows:
+            return []
+        if busy is None:
+            busy = self.busy_index(attendees, windows[0][0], windows[-1][1])
+        return busy.free_slots(windows, datetime.timedelta(minutes=duration_minutes), count)
+
+    def check_slot(self, date, start_time, participants, duration_minutes=60, time_zones=()):
+        """
+        Returns (conflicts, suggestions) for a meeting: the busy blocks it
+        overlaps and, if there are any, the earliest free slots from that day on.
+        Free/busy is only fetched for the meeting itself and, when it
+        conflicts, for the days searched for suggestions.
+        """
+        zone = zoneinfo.ZoneInfo(CALENDAR_TIME_ZONE)
+        start = datetime.datetime.strptime(f"{date} {start_time}", "%Y-%m-%d %H:%M").replace(tzinfo=zone)
+        end = start + datetime.timedelta(minutes=duration_minutes)
+        conflicts = self.busy_index(participants, start, end).conflicts(start, end)
+        if not conflicts:
+            return [], []
+        suggestions = self.find_free_slots(participants, duration_minutes, time_zones, start.date())
+        return conflicts, suggestions
+
+    def add_event(self, date, start_time, subject, participants, duration_minutes=60):
+        event = build_event_body(date, start_time, subject, participants, duration_minutes)
 
         try:
             event = self.service.events().insert(calendarId='primary', body=event).execute()
+            self.store.put(event)
             print(f"Event created: {event.get('htmlLink')}")
         except Exception as e:
             print(f"Error creating event: {e}")
             raise
 
+    def run_batch(self, operations):
+        """
+        Runs inserts and deletes through Calendar API batch requests.
+
+        `operations` are dicts with "action" ("add" with a "body", or
+        "remove" with an "event_id"). Items that fail with a retryable error
+        are sent again, alone with the other failures, up to BATCH_RETRIES
+        more times. Every insert gets its event id up front, so a retried
+        insert that had in fact gone through gets a 409 instead of creating
+        the event twice; that event is then read back. Returns one
+        {"ok", "event" / "error"} result per operation.
+        """
+        for operation in operations:
+            if operation["action"] == "add" and "id" not in operation["body"]:
+                # Event ids are base32hex; a UUID in hex only uses allowed characters.
+                operation["body"] = dict(operation["body"], id=uuid.uuid4().hex)
+        results = [None] * len(operations)
+        pending = list(range(len(operations)))
+        for attempt in range(BATCH_RETRIES + 1):
+            if attempt:
+                time.sleep(min(2 ** attempt, 30))
+            failed = []
+            existing = []
+            for start in range(0, len(pending), BATCH_SIZE):
+                chunk = pending[start:start + BATCH_SIZE]
+                for i in chunk:
+                    results[i] = None
+
+                def on_response(request_id, response, exception):
+                    i = int(request_id)
+                    operation = operations[i]
+                    status = getattr(getattr(exception, "resp", None), "status", None)
+                    if exception is not None and operation["action"] == "add" and status == 409 and attempt:
+                        existing.append(i)  # created by an earlier attempt whose answer was lost
+                    # A 410 on delete means the event is already gone, which is what we wanted.
+                    elif exception is not None and not (operation["action"] == "remove" and status == 410):
+                        results[i] = {"ok": False, "error": str(exception)}
+                        if is_retryable(exception):
+                            failed.append(i)
+                    elif operation["action"] == "add":
+                        self.store.put(response)
+                        results[i] = {"ok": True, "event": response}
+                    else:
+                        self.store.remove(operation["event_id"])
+                        results[i] = {"ok": True}
+
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for i in chunk:
+                    operation = operations[i]
+                    if operation["action"] == "add":
+                        request = self.service.events().insert(calendarId='primary', body=operation["body"])
+                    else:
+                        request = self.service.events().delete(calendarId='primary', eventId=operation["event_id"])
+                    batch.add(request, request_id=str(i))
+                try:
+                    batch.execute()
+                except Exception as e:
+                    # The whole batch request failed: retry every item that got no answer.
+                    for i in chunk:
+                        if results[i] is None and i not in existing:
+                            results[i] = {"ok": False, "error": str(e)}
+                            failed.append(i)
+            for i in existing:
+                try:
+                    event = self.service.events().get(calendarId='primary', eventId=operations[i]["body"]["id"]).execute()
+                except Exception as e:
+                    results[i] = {"ok": False, "error": str(e)}
+                    if is_retryable(e):
+                        failed.append(i)
+                    continue
+                self.store.put(event)
+                results[i] = {"ok": True, "event": event}
+            pending = sorted(failed)
+            if not pending:
+                break
+        return results
+
     def remove_event(self, event_summary, event_date):
         try:
-            now = datetime.datetime.utcnow().isoformat() + 'Z'
-            events_result = self.service.events().list(calendarId='primary', timeMin=now, singleEvents=True, orderBy='startTime').execute()
-            events = events_result.get('items', [])
-
-            if not events:
-                print('No upcoming events found.')
+            self.sync()
+            matches = self.store.find(event_summary, event_date)
+            if not matches:
+                print(f"No matching event found for '{event_summary}' on {event_date}.")
                 return
 
-            for event in events:
-                event_start_date = event['start'].get('dateTime', event['start'].get('date')).split("T")[0]
-                if event['summary'].lower() == event_summary.lower() and event_start_date == event_date:
-                    self.service.events().delete(calendarId='primary', eventId=event['id']).execute()
-                    print(f"Event '{event_summary}' on {event_date} deleted.")
-                    return
-
-            print(f"No matching event found for '{event_summary}' on {event_date}.")
+            self.delete_event(matches[0])
         except Exception as e:
             print(f"An error occurred: {e}")
 
     def list_events(self):
-        now = datetime.datetime.utcnow().isoformat() + 'Z'
-        one_year_from_now = (datetime.datetime.utcnow() + datetime.timedelta(days=365)).isoformat() + 'Z'
-        events_result = self.service.events().list(calendarId='primary', timeMin=now, timeMax=one_year_from_now, singleEvents=True, orderBy='startTime').execute()
-        events = events_result.get('items', [])
+        one_year_from_now = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=365)
+        events = self.upcoming_events(one_year_from_now)
 
         if not events:
             print('No upcoming events found.')
         for event in events:
             start = event['start'].get('dateTime', event['start'].get('date'))
-            print(start, event['summary'], event.get('attendees', []))
+            print(start, event.get('summary', ''), event.get('attendees', []))
+
+    def delete_event(self, event):
+        self.service.events().delete(calendarId='primary', eventId=event['id']).execute()
+        self.store.remove(event['id'])
+        start = event['start'].get('dateTime', event['start'].get('date'))
+        print(f"Event '{event.get('summary', '')}' on {start[:10]} deleted.")
 
     def remove_event_with_gemini(self, user_input):
         try:
-            now = datetime.datetime.utcnow().isoformat() + 'Z'
-            end_of_year = datetime.datetime(datetime.datetime.now().year, 12, 31).isoformat() + 'Z'
-            events_result = self.service.events().list(calendarId='primary', timeMin=now, timeMax=end_of_year, singleEvents=True, orderBy='startTime').execute()
-            events = events_result.get('items', [])
-
+            events = self.upcoming_events()
             if not events:
                 print('No upcoming events found.')
                 return
 
-            events_details = "\n".join([f"{event['summary']} on {event['start'].get('dateTime', event['start'].get('date'))}" for event in events])
+            shortlist, confident = meeting_parser.rank_events(user_input, events)
+            if not shortlist:
+                print("No upcoming event matches that request. Please provide more details.")
+                return
+            if confident:
+                self.delete_event(shortlist[0][1])
+                return
+
+            candidates = "\n".join(
+                f"- id: {event['id']} | {event.get('summary', '')} | {event['start'].get('dateTime', event['start'].get('date'))}"
+                for _, event in shortlist
+            )
             prompt = f"""
-            Given the following events scheduled this year:
-            {events_details}
-            And the user request: "{user_input}"
-            Specify the exact event to be deleted.
+            Today is {datetime.date.today():%Y-%m-%d}. These are the calendar events that best match the user's request:
+            {candidates}
+            The user request: "{user_input}"
+            Give the id of the one event to delete, or null if none of them clearly matches.
             """
 
-            response = model.generate_content(prompt)
-            gemini_output = response.text
-
-            event_summary = re.search(r'event "(.+?)"', gemini_output)
-            event_date = re.search(r'on (\d{4}-\d{2}-\d{2})', gemini_output)
-
-            if event_summary and event_date:
-                self.remove_event(event_summary.group(1), event_date.group(1))
+            event_id = structured_output.generate(prompt, "event_choice", get_model(), tool=TOOL_NAME)["event_id"]
+            chosen = next((event for _, event in shortlist if event['id'] == event_id), None)
+            if chosen:
+                self.delete_event(chosen)
             else:
                 print("Could not identify the event to be deleted. Please provide more details.")
         except Exception as e:
@@ -144,52 +398,198 @@ class StartupFounderCalendar:
         self.calendar_manager = GoogleCalendarManager()
 
     def parse_meeting_request(self, request_text):
+        details = meeting_parser.parse(request_text)
+        if details is not None:
+            meeting_parser.record("rules")
+            return details
+        meeting_parser.record("model")
+
+        today = datetime.date.today()
         prompt = f"""
         You are a helpful assistant for a busy startup founder. Your task is to parse meeting requests provided in natural language and extract the following information:
-        - **Date (YYYY-MM-DD):** The date of the meeting.
-        - **Time (HH:MM):** The start time of the meeting in 24-hour format.
-        - **Subject:** A brief description of the meeting's purpose.
-        - **Participants:** A list of the *valid* email addresses of the people who will attend the meeting. If no email is provided return an empty list: []. Only include valid email addresses.
-        If the request is unclear or missing information, state what is missing and request clarification. If the request does not refer to scheduling a meeting at all, return 'no meeting request found'. If no participants are mentioned, set participants to an empty list: [].
+        - **date (YYYY-MM-DD):** The date of the meeting. Today is {today:%Y-%m-%d} ({today:%A}).
+        - **time (HH:MM):** The start time of the meeting in 24-hour format.
+        - **subject:** A brief description of the meeting's purpose.
+        - **participants:** A list of the *valid* email addresses of the people who will attend the meeting. If no email is provided return an empty list: []. Only include valid email addresses.
+        Set no_meeting to false and fill in these keys; if information is missing, set that key to null. If the request does not refer to scheduling a meeting at all, set no_meeting to true.
 
         Here are some examples:
         **Input:** "Schedule a meeting with john.doe@example.com tomorrow at 2 PM to discuss the marketing plan."
-        **Output:** {{'date': '{datetime.date.today() + datetime.timedelta(days=1):%Y-%m-%d}', 'time': '14:00', 'subject': 'Discuss marketing plan', 'participants': ['john.doe@example.com']}}
+        **Output:** {{"no_meeting": false, "date": "{today + datetime.timedelta(days=1):%Y-%m-%d}", "time": "14:00", "subject": "Discuss marketing plan", "participants": ["john.doe@example.com"]}}
 
         **Input:** "Can we chat next week about the product roadmap?"
-        **Output:** {{'date': '{datetime.date.today() + datetime.timedelta(days=7):%Y-%m-%d}', 'time': '10:00', 'subject': 'Product Roadmap Discussion', 'participants': []}}
+        **Output:** {{"no_meeting": false, "date": "{today + datetime.timedelta(days=7):%Y-%m-%d}", "time": "10:00", "subject": "Product Roadmap Discussion", "participants": []}}
 
         **Input:** "Cancel my meeting on Friday"
-        **Output:** "no meeting request found"
+        **Output:** {{"no_meeting": true}}
 
         **Input:** "Meeting on the 15th at 3 with the investors."
-        **Output:** {{'date': '{datetime.date.today().replace(day=15):%Y-%m-%d}', 'time': '15:00', 'subject': 'Meeting with investors', 'participants': []}}
+        **Output:** {{"no_meeting": false, "date": "{today.replace(day=15):%Y-%m-%d}", "time": "15:00", "subject": "Meeting with investors", "participants": []}}
 
         Now, parse the following request: "{request_text}"
         """
         try:
-            response = model.generate_content(prompt)
-            gemini_output = response.text
-            meeting_details = eval(gemini_output)
-            return meeting_details
+            reply = structured_output.generate(prompt, "meeting_request", get_model(), tool=TOOL_NAME)
+            return meeting_parser.from_model_reply(reply)
         except Exception as e:
             print(f"Error parsing meeting request: {e}")
             return None
 
+    def read_bulk_file(self, path):
+        """
+        Reads a bulk file into a list of items ready for `run_bulk`.
+
+        In a .jsonl file every line is an object with "action": "add" (either
+        a natural language "request" or "date", "time", "subject" and
+        "participants") or "action": "remove" (with "summary" and "date").
+        In any other file every non-empty line is a meeting request. Lines
+        that are not a JSON object are kept with a "result" saying why they
+        were skipped.
+        """
+        items = []
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                if path.lower().endswith(".jsonl"):
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        record = {"action": "invalid", "result": f"skipped, not valid JSON ({e})"}
+                    if not isinstance(record, dict):
+                        record = {"action": "invalid", "result": "skipped, not a JSON object"}
+                else:
+                    record = {"action": "add", "request": line}
+                record["line"] = line_number
+                items.append(record)
+        return items
+
+    def run_bulk(self, path, workers=BULK_PARSE_WORKERS):
+        """Schedules and cancels every meeting in a bulk file with batched API calls."""
+        items = self.read_bulk_file(path)
+        to_parse = [item for item in items if item.get("action", "add") == "add" and "request" in item]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for item, details in zip(to_parse, pool.map(lambda item: self.parse_meeting_request(item["request"]), to_parse)):
+                if isinstance(details, dict):
+                    item.update({key: details.get(key) for key in ("date", "time", "subject", "participants")})
+
+        manager = self.calendar_manager
+        manager.sync()
+        operations = []
+        operation_items = []
+        for item in items:
+            action = item.get("action", "add")
+            if action == "invalid":
+                continue
+            if action == "add":
+                if not (item.get("date") and item.get("time") and item.get("subject")):
+                    item["result"] = "could not extract the date, time and subject"
+                    continue
+                date = meeting_parser.normalize_date(item["date"])
+                time_of_day = meeting_parser.normalize_time(item["time"])
+                if not date or not time_of_day:
+                    item["result"] = f"could not read the date '{item['date']}' and time '{item['time']}'"
+                    continue
+                body = build_event_body(date, time_of_day, item["subject"], item.get("participants") or [])
+                operations.append({"action": "add", "body": body})
+            elif action == "remove":
+                matches = manager.store.find(item.get("summary", ""), item.get("date", ""))
+                if not matches:
+                    item["result"] = f"no event '{item.get('summary')}' on {item.get('date')}"
+                    continue
+                operations.append({"action": "remove", "event_id": matches[0]["id"]})
+            else:
+                item["result"] = f"unknown action '{action}'"
+                continue
+            operation_items.append(item)
+
+        for item, result in zip(operation_items, manager.run_batch(operations)):
+            if not result["ok"]:
+                item["result"] = f"failed: {result['error']}"
+            elif item.get("action", "add") == "add":
+                item["result"] = f"created {result['event'].get('htmlLink', '')}".strip()
+            else:
+                item["result"] = "deleted"
+            item["ok"] = result["ok"]
+
+        succeeded = sum(1 for item in items if item.get("ok"))
+        for item in items:
+            print(f"Line {item['line']}: {item['result']}")
+        print(f"{succeeded} of {len(items)} item(s) done.")
+        return items
+
+    def schedule_meeting(self, date, start_time, subject, participants):
+        """Books the meeting, or offers the earliest free slots if someone is busy then."""
+        manager = self.calendar_manager
+        conflicts, suggestions = manager.check_slot(date, start_time, participants)
+        if conflicts:
+            zone = zoneinfo.ZoneInfo(CALENDAR_TIME_ZONE)
+            for start, end in conflicts:
+                print(f"Busy from {start.astimezone(zone):%Y-%m-%d %H:%M} to {end.astimezone(zone):%H:%M}.")
+            if not suggestions:
+                print("No free slot found in the next few days. The meeting was not scheduled.")
+                return
+            print("Free slots:")
+            for i, (start, _) in enumerate(suggestions, start=1):
+                print(f"{i}. {' '.join(local_slot(start))}")
+            choice = input("Pick a slot number, or press Enter to cancel: ").strip()
+            if not choice.isdigit() or not 1 <= int(choice) <= len(suggestions):
+                print("The meeting was not scheduled.")
+                return
+            date, start_time = local_slot(suggestions[int(choice) - 1][0])
+        manager.add_event(date, start_time, subject, participants)
+
+    def show_free_slots(self, user_input):
+        """Lists the earliest slots when the owner and the mentioned people are all free."""
+        attendees = meeting_parser.EMAIL.findall(user_input)
+        duration = re.search(r"(\d+)\s*(h|hour|hours|hr|hrs|m|min|mins|minutes)\b", user_input)
+        duration_minutes = 60
+        if duration:
+            duration_minutes = int(duration.group(1)) * (60 if duration.group(2).startswith("h") else 1)
+        zones = input("Time zones of other attendees (e.g. America/New_York), comma separated, or Enter for none: ")
+        time_zones = []
+        for name in (z.strip() for z in zones.split(",")):
+            if not name:
+                continue
+            try:
+                zoneinfo.ZoneInfo(name)
+                time_zones.append(name)
+            except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+                print(f"Ignoring unknown time zone '{name}'.")
+        slots = self.calendar_manager.find_free_slots(attendees, duration_minutes, time_zones)
+        if not slots:
+            print("No free slot found in working hours for everyone.")
+        for start, _ in slots:
+            print(f"{' '.join(local_slot(start))} ({CALENDAR_TIME_ZONE}), {duration_minutes} minutes")
+
     def handle_request(self, user_input):
+        if user_input.strip().lower().startswith("bulk "):
+            path = user_input.strip()[5:].strip()
+            if os.path.exists(path):
+                self.run_bulk(path)
+            else:
+                print(f"File not found: {path}")
+            return False
         user_input = user_input.lower()
-        if "schedule" in user_input or "meeting" in user_input or "meet" in user_input:
+        if meeting_parser.is_free_slot_request(user_input):
+            self.show_free_slots(user_input)
+        elif "schedule" in user_input or "meeting" in user_input or "meet" in user_input:
             meeting_details = self.parse_meeting_request(user_input)
             if meeting_details:
                 if isinstance(meeting_details, str) and meeting_details == "no meeting request found":
                     print("No meeting request found, please rephrase your request or provide more details.")
                 else:
-                    date = meeting_details.get("date")
-                    time = meeting_details.get("time")
+                    date = meeting_parser.normalize_date(meeting_details.get("date"))
+                    start_time = meeting_parser.normalize_time(meeting_details.get("time"))
                     subject = meeting_details.get("subject")
                     participants = meeting_details.get("participants")
-                    if date and time and subject and participants is not None:
-                        self.calendar_manager.add_event(date, time, subject, participants)
+                    if meeting_details.get("date") and not date:
+                        print(f"Could not read the meeting date '{meeting_details['date']}'. Please give it like 2024-07-02.")
+                    elif meeting_details.get("time") and not start_time:
+                        print(f"Could not read the meeting time '{meeting_details['time']}'. Please give it like 15:00 or 3pm.")
+                    elif date and start_time and subject and participants is not None:
+                        self.schedule_meeting(date, start_time, subject, participants)
                     else:
                         print("Could not extract all required meeting details. Please provide more information.")
             else:
@@ -205,8 +605,25 @@ class StartupFounderCalendar:
             print("Invalid command. Please provide a valid request.")
         return False
 
-founder_calendar = StartupFounderCalendar()
-while True:
-    user_input = input("Enter your request: ")
-    if founder_calendar.handle_request(user_input):
-        break
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schedule and manage meetings in Google Calendar.")
+    parser.add_argument("--bulk", help="file of meetings to add or remove (.jsonl, or one request per line)")
+    parser.add_argument("--workers", type=int, default=BULK_PARSE_WORKERS, help="meeting requests parsed in parallel")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    founder_calendar = StartupFounderCalendar()
+    print(f"Calendar ready in {(time.perf_counter() - started) * 1000:.1f} ms (Google sign-in happens on first use).")
+    if args.bulk:
+        founder_calendar.run_bulk(args.bulk, args.workers)
+        meeting_parser.print_stats()
+        return
+    while True:
+        user_input = input("Enter your request: ")
+        if founder_calendar.handle_request(user_input):
+            meeting_parser.print_stats()
+            break
+
+if __name__ == "__main__":
+    main()
+
@@ -1,23 +1,26 @@
 from dotenv import load_dotenv
-import os
-from google import genai
 
-def load_api_key():
-    load_dotenv("auth.env")
-    return os.getenv("GOOGLE_API_KEY")
+load_dotenv("auth.env")  # before the modules below read their settings
 
-client = genai.Client(api_key=load_api_key())
+import gemini_client
+
+TOOL_NAME = "market_insights"
 
 def generate_response(prompt):
-    response = client.models.generate_content(
+    response = gemini_client.generate(
+        prompt,
         model="gemini-2.0-flash",
-        contents=prompt,
+        tool=TOOL_NAME,
     )
-    return response.text
+    return response
 
 def market_insights():
     industry = input("Enter the industry you want insights on: ")
     prompt = f"Get latest market insights and growth domains for the {industry} industry from sources like Moneycontrol, Jefferies, and JP Morgan. Summarize key findings with accurate numeric data.List Sources"
     print(generate_response(prompt))
 
-market_insights()
\ No newline at end of file
+def main():
+    market_insights()
+
+if __name__ == "__main__":
+    main()
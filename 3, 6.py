@@ -1,22 +1,23 @@
 import os
-import google.generativeai as genai
 import re
 from dotenv import load_dotenv
 
-load_dotenv("auth.env")
+load_dotenv("auth.env")  # before the modules below read their settings
 
-gemini_api_key = os.getenv("GOOGLE_API_KEY")
-genai.configure(api_key=gemini_api_key)
+import gemini_client
+
+TOOL_NAME = "surveys_investors"
 
 def configure_genai():
+    load_dotenv("auth.env")
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         print("Error: Please set the GEMINI_API_KEY environment variable")
         exit(1)
-    genai.configure(api_key=api_key)
+    gemini_client.get_client()
 
 def get_gemini_model():
-    return genai.GenerativeModel('gemini-pro')
+    return gemini_client.get_model('gemini-pro')
 
 def generate_survey_questions(topic, audience, num_questions=10):
     model = get_gemini_model()
@@ -33,8 +34,7 @@ def generate_survey_questions(topic, audience, num_questions=10):
     Format each question clearly with these sections.
     """
     
-    response = model.generate_content(prompt)
-    return response.text
+    return model.generate(prompt, tool=TOOL_NAME)
 
 def analyze_company_and_find_investors(company_description, products, industry, stage):
     model = get_gemini_model()
@@ -55,8 +55,7 @@ def analyze_company_and_find_investors(company_description, products, industry,
     Format your response in a clear, readable way with section headings.
     """
     
-    response = model.generate_content(prompt)
-    return response.text
+    return model.generate(prompt, tool=TOOL_NAME)
 
 def main():
     
@@ -129,4 +128,5 @@ def main():
         else:
             print("Invalid choice. Please select 1, 2, or 3.")
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,42 @@
+import json
 import os
-import google.generativeai as genai
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dotenv import load_dotenv
 
-load_dotenv("auth.env")
+load_dotenv("auth.env")  # before the modules below read their settings
+
+import finance_engine
+import gemini_client
+
+TOOL_NAME = "financial_advisor"
+
+# The full report runs its analyses in parallel, each allowed REPORT_TIMEOUT
+# seconds from when it starts running.
+REPORT_CONCURRENCY = int(os.getenv("REPORT_CONCURRENCY", "4"))
+REPORT_TIMEOUT = float(os.getenv("REPORT_TIMEOUT", "120"))
 
 def configure_genai():
+    load_dotenv("auth.env")
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         print("Error: Please set the GEMINI_API_KEY environment variable")
         exit(1)
-    genai.configure(api_key=api_key)
+    gemini_client.get_client()
 
 def get_gemini_model():
-    return genai.GenerativeModel('gemini-pro')
+    return gemini_client.get_model('gemini-pro')
 
 def calculate_breakeven(startup_details):
     model = get_gemini_model()
+    fixed_costs = finance_engine.parse_total(startup_details['fixed_costs'])
+    variable_cost = finance_engine.parse_amount(startup_details['variable_costs'])
+    price = finance_engine.parse_amount(startup_details['pricing'])
+    if None not in (fixed_costs, variable_cost, price):
+        return explain_breakeven(startup_details, fixed_costs, variable_cost, price)
+
+    # The figures could not be read as numbers, so let the model interpret them.
     prompt = f"""
     Based on the following startup information, calculate the breakeven point and provide analysis:
     
@@ -35,19 +56,90 @@ def calculate_breakeven(startup_details):
     Be specific and practical in your analysis.
     """
     
-    response = model.generate_content(prompt)
-    return response.text
+    return model.generate(prompt, tool=TOOL_NAME)
 
-def create_budget_plan(startup_details, monthly_capital):
+def explain_breakeven(startup_details, fixed_costs, variable_cost, price):
     model = get_gemini_model()
+    result = finance_engine.breakeven(fixed_costs, variable_cost, price)
+    prices = finance_engine.spread(price)
+    variable_costs = finance_engine.spread(variable_cost)
+    grid = finance_engine.sensitivity_grid(fixed_costs, prices, variable_costs)
+    figures = (finance_engine.format_breakeven(result, fixed_costs, variable_cost, price)
+               + "\n\n" + finance_engine.format_grid(grid, prices, variable_costs))
+
     prompt = f"""
-    Create a detailed budget plan for a startup with the following details:
+    The breakeven figures below have already been calculated exactly for this startup. Do not recalculate or change them.
+    
+    Industry: {startup_details['industry']}
+    Product/Service: {startup_details['product']}
+    
+{figures}
+    
+    Please provide:
+    1. Analysis of what these figures mean for the business
+    2. Recommendations for reducing the breakeven point, using the sensitivity table
+    3. Estimated timeline to reach breakeven based on market conditions
+    4. Key metrics to track for financial sustainability
+    
+    Be specific and practical in your analysis.
+    """
+    
+    return figures + "\n\n" + model.generate(prompt, tool=TOOL_NAME)
+
+def project_startup_cash_flow(startup_details, available_capital, months=12):
+    """
+    Runs the local cash-flow projection from `available_capital` as starting
+    cash, or returns None if the inputs are not exact numbers.
+    """
+    def optional(key, parse=finance_engine.parse_amount):
+        text = startup_details.get(key)
+        return 0.0 if not text or not str(text).strip() else parse(text)
+
+    capital = finance_engine.parse_amount(available_capital)
+    fixed_costs = finance_engine.parse_total(startup_details.get('fixed_costs'))
+    units = optional('monthly_units')
+    growth = optional('monthly_growth', finance_engine.parse_percent)
+    variable_cost = optional('variable_costs')
+    price = optional('pricing')
+    if None in (capital, fixed_costs, units, growth, variable_cost, price):
+        return None
+    return finance_engine.project_cash_flow(capital, fixed_costs, variable_cost, price, units, growth / 100, months)
+
+def create_budget_plan(startup_details, monthly_capital, available_capital=None):
+    model = get_gemini_model()
+    projection = project_startup_cash_flow(startup_details, available_capital)
+    if projection is not None:
+        figures = "Cash flow projection (computed exactly):\n" + finance_engine.format_projection(projection)
+        prompt = f"""
+    Create a detailed budget plan for a startup with the following details. The cash flow projection has already been calculated exactly; do not recalculate or change it.
     
     Industry: {startup_details['industry']}
     Product/Service: {startup_details['product']}
     Current Monthly Capital: ${monthly_capital}
+    Capital Available (starting cash): ${available_capital}
     Fixed Costs: {startup_details['fixed_costs']}
     
+{figures}
+    
+    Please provide:
+    1. A breakdown of recommended budget allocation (marketing, development, operations, etc.)
+    2. Cost-cutting strategies specific to this type of business
+    3. Essential vs. non-essential expenses for a startup in this phase
+    4. What the projection and runway mean for the next 6 months
+    5. Financial red flags to watch out for
+    
+    The goal is to maximize runway and achieve breakeven as quickly as possible.
+    """
+        return figures + "\n\n" + model.generate(prompt, tool=TOOL_NAME)
+
+    prompt = f"""
+    Create a detailed budget plan for a startup with the following details:
+    
+    Industry: {startup_details['industry']}
+    Product/Service: {startup_details['product']}
+    Current Monthly Capital: ${monthly_capital}
+    Fixed Costs: {startup_details.get('fixed_costs', 'Not provided')}
+    
     Please provide:
     1. A breakdown of recommended budget allocation (marketing, development, operations, etc.)
     2. Cost-cutting strategies specific to this type of business
@@ -58,8 +150,7 @@ def create_budget_plan(startup_details, monthly_capital):
     The goal is to maximize runway and achieve breakeven as quickly as possible.
     """
     
-    response = model.generate_content(prompt)
-    return response.text
+    return model.generate(prompt, tool=TOOL_NAME)
 
 def analyze_focus_areas(startup_details):
     model = get_gemini_model()
@@ -77,8 +168,7 @@ def analyze_focus_areas(startup_details):
     The startup has limited capital and needs to prioritize efforts for survival and growth.
     """
     
-    response = model.generate_content(prompt)
-    return response.text
+    return model.generate(prompt, tool=TOOL_NAME)
 
 def evaluate_capital_options(startup_details, available_capital):
     model = get_gemini_model()
@@ -99,8 +189,120 @@ def evaluate_capital_options(startup_details, available_capital):
     Consider both short-term survival and long-term growth potential in your analysis.
     """
     
-    response = model.generate_content(prompt)
-    return response.text
+    return model.generate(prompt, tool=TOOL_NAME)
+
+def generate_full_report(startup_details, monthly_capital, available_capital,
+                         timeout=REPORT_TIMEOUT, max_concurrency=REPORT_CONCURRENCY):
+    """
+    Runs all four analyses concurrently and assembles them into one report.
+
+    Each analysis gets `timeout` seconds from when it starts running, so a
+    section waiting for a free worker (max_concurrency below 4) is not cut
+    short by the time it spent in the queue.
+    """
+    sections = [
+        ("Breakeven Analysis", calculate_breakeven, (startup_details,)),
+        ("Budget Plan", create_budget_plan, (startup_details, monthly_capital, available_capital)),
+        ("Key Focus Areas", analyze_focus_areas, (startup_details,)),
+        ("Capital Utilization Options", evaluate_capital_options, (startup_details, available_capital)),
+    ]
+    started_at = [None] * len(sections)
+    started = [threading.Event() for _ in sections]
+
+    def run(i, func, args):
+        started_at[i] = time.monotonic()
+        started[i].set()
+        return func(*args)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+    futures = [pool.submit(run, i, func, args) for i, (_, func, args) in enumerate(sections)]
+
+    report = [
+        "Startup Financial Report",
+        f"Industry: {startup_details['industry']}",
+        f"Product/Service: {startup_details['product']}",
+        f"Stage: {startup_details['stage']}",
+    ]
+    for i, ((title, _, _), future) in enumerate(zip(sections, futures)):
+        started[i].wait()
+        remaining = max(0.0, started_at[i] + timeout - time.monotonic())
+        try:
+            body = future.result(timeout=remaining)
+        except FutureTimeout:
+            body = f"Timed out after {timeout:g} seconds."
+        except Exception as e:
+            body = f"Error generating this section: {e}"
+        report.append(f"\n\n=== {title} ===\n\n{body}")
+    # Do not wait for calls that timed out; their results are simply dropped.
+    pool.shutdown(wait=False, cancel_futures=True)
+    return "\n".join(report)
+
+def read_distribution(label):
+    """Asks for "mean sd", "low-high" or a single number and returns a distribution spec."""
+    text = input(f"  {label} (e.g. '0.03 0.01' for mean and sd, '0.02-0.06' for a range): ").strip()
+    if not text:
+        return None
+    if "-" in text.lstrip("-"):
+        low, high = text.lstrip("-").split("-", 1)
+        return {"low": float(("-" if text.startswith("-") else "") + low), "high": float(high)}
+    parts = text.split()
+    if len(parts) == 2:
+        return {"mean": float(parts[0]), "sd": float(parts[1])}
+    return float(parts[0])
+
+def read_capital_options():
+    """Loads simulation options from a JSON file, or asks for them one by one."""
+    path = input("JSON file describing the options (press Enter to type them in): ").strip()
+    if path:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    options = []
+    while True:
+        name = input("\nOption name (press Enter when done): ").strip()
+        if not name:
+            return options
+        options.append({
+            "name": name,
+            "monthly_spend": finance_engine.parse_amount(input("  Monthly acquisition spend: ")) or 0.0,
+            "cac": read_distribution("Customer acquisition cost"),
+            "growth": read_distribution("Monthly organic customer growth"),
+            "churn": read_distribution("Monthly churn"),
+            "cost": read_distribution("Extra monthly operating cost"),
+        })
+
+def run_capital_simulation(startup_details):
+    """Simulates the user's capital deployment options locally; no Gemini call."""
+    try:
+        cash = finance_engine.parse_amount(input("How much capital do you have available to deploy? "))
+        fixed_costs = finance_engine.parse_total(startup_details.get('fixed_costs') or input("What are your monthly fixed costs? (e.g., rent, salaries) "))
+        arpu = finance_engine.parse_amount(input("Monthly revenue per customer: "))
+        customers = finance_engine.parse_amount(input("Current number of customers (press Enter for 0): ")) or 0
+        months = int(finance_engine.parse_amount(input("Months to simulate (press Enter for 24): ")) or 24)
+        breakeven_by = int(finance_engine.parse_amount(input("Breakeven target month (press Enter for 12): ")) or 12)
+        paths = int(finance_engine.parse_amount(input("Simulated paths per option (press Enter for 20000): ")) or 20000)
+        seed = finance_engine.parse_amount(input("Random seed (press Enter for a new one): "))
+        if None in (cash, fixed_costs, arpu):
+            print("Error: Capital, fixed costs and revenue per customer must be numbers")
+            return None
+        options = read_capital_options()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return None
+    if not options:
+        print("Error: At least one option is required")
+        return None
+
+    workers = min(os.cpu_count() or 1, 4) if paths * len(options) >= 200000 else 1
+    try:
+        summaries, seed = finance_engine.simulate_capital_options(
+            options, cash, fixed_costs, arpu, customers, months, paths, breakeven_by,
+            seed=None if seed is None else int(seed), workers=workers,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None
+    return finance_engine.format_simulation(summaries, months, breakeven_by, paths, seed)
 
 def main():
     configure_genai()
@@ -120,9 +322,11 @@ def main():
         print("2. Create Budget Plan")
         print("3. Analyze Key Focus Areas")
         print("4. Evaluate Capital Utilization Options")
-        print("5. Exit")
+        print("5. Simulate Capital Options (local Monte Carlo)")
+        print("6. Generate Full Report (all analyses at once)")
+        print("7. Exit")
         
-        choice = input("\nSelect an option (1-5): ")
+        choice = input("\nSelect an option (1-7): ")
         
         if choice == "1":
             print("\n--- Breakeven Calculation ---")
@@ -150,8 +354,20 @@ def main():
                 print("Error: Please enter a valid number for monthly capital")
                 continue
             
+            if not startup_details.get('fixed_costs'):
+                startup_details['fixed_costs'] = input("What are your monthly fixed costs? (e.g., rent, salaries) ")
+            startup_details['monthly_units'] = input("Expected units/customers sold next month (press Enter to skip): ")
+            available_capital = None
+            if startup_details['monthly_units'].strip():
+                available_capital = input("How much capital do you have available now (starting cash)? ")
+                startup_details['monthly_growth'] = input("Expected monthly sales growth in % (press Enter for 0): ")
+                if not startup_details.get('pricing'):
+                    startup_details['pricing'] = input("What is your product/service pricing? ")
+                if not startup_details.get('variable_costs'):
+                    startup_details['variable_costs'] = input("What are your variable costs per unit/customer? ")
+            
             print("\nCreating budget plan...")
-            budget_plan = create_budget_plan(startup_details, monthly_capital)
+            budget_plan = create_budget_plan(startup_details, monthly_capital, available_capital)
             print("\n" + budget_plan)
             
             save = input("\nSave this budget plan to file? (y/n): ")
@@ -193,10 +409,54 @@ def main():
                 print("Analysis saved to capital_options.txt")
             
         elif choice == "5":
+            print("\n--- Capital Options Simulation ---")
+            simulation = run_capital_simulation(startup_details)
+            if simulation is None:
+                continue
+            print("\n" + simulation)
+            
+            save = input("\nSave this simulation to file? (y/n): ")
+            if save.lower() == 'y':
+                with open('capital_simulation.txt', 'w') as f:
+                    f.write(simulation)
+                print("Simulation saved to capital_simulation.txt")
+            
+        elif choice == "6":
+            print("\n--- Full Financial Report ---")
+            startup_details['fixed_costs'] = input("What are your monthly fixed costs? (e.g., rent, salaries) ")
+            startup_details['variable_costs'] = input("What are your variable costs per unit/customer? ")
+            startup_details['pricing'] = input("What is your product/service pricing? ")
+            startup_details['monthly_units'] = input("Expected units/customers sold next month (press Enter to skip): ")
+            startup_details['monthly_growth'] = input("Expected monthly sales growth in % (press Enter for 0): ")
+            monthly_capital = input("What is your current monthly capital? ")
+            available_capital = input("How much capital do you have available to deploy? ")
+            
+            try:
+                float(monthly_capital)
+                float(available_capital)
+            except ValueError:
+                print("Error: Please enter valid numbers for monthly and available capital")
+                continue
+            
+            print("\nGenerating all analyses...")
+            started = time.monotonic()
+            report = generate_full_report(startup_details, monthly_capital, available_capital)
+            print("\n" + report)
+            print(f"\nReport generated in {time.monotonic() - started:.1f} seconds.")
+            
+            filename = input("\nEnter filename to save the report (press Enter for startup_report.txt, 'n' to skip): ").strip()
+            if filename.lower() != 'n':
+                filename = filename or 'startup_report.txt'
+                with open(filename, 'w') as f:
+                    f.write(report)
+                print(f"Report saved to {filename}")
+            
+        elif choice == "7":
             print("Exiting. Good luck with your startup!")
             break
             
         else:
-            print("Invalid choice. Please select 1-5.")
+            print("Invalid choice. Please select 1-7.")
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
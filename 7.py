@@ -1,41 +1,177 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext
-from dotenv import load_dotenv
+import argparse
+import csv
+import json
 import os
-from google import genai
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def load_api_key():
-    load_dotenv("auth.env")
-    return os.getenv("GOOGLE_API_KEY")
+from dotenv import load_dotenv
 
-client = genai.Client(api_key=load_api_key())
+load_dotenv("auth.env")  # before the modules below read their settings
 
-def finding_hashtags(industry):
-    response=client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=[f"generate a list of 10 trending social media hashtags related to the {industry} industry. I need only hashtags as output no explanation, nothing else."]
+import gemini_client
+import structured_output
 
-    )
-    if response.text:
-        hashtags = response.text.split("\n")
-        return [tag.strip() for tag in hashtags if tag.startswith("#")]
-    else:
-        return ["No hashtags found."]
+TOOL_NAME = "marketing"
+MODEL_NAME = "gemini-2.0-flash"
+
+# Batch mode: industries packed into one request and requests in flight at
+# once. Requests per minute are limited per model by rate_limit (GEMINI_RPM).
+BATCH_SIZE = int(os.getenv("MARKETING_BATCH_SIZE", "8"))
+BATCH_CONCURRENCY = int(os.getenv("MARKETING_CONCURRENCY", "4"))
+
+def as_hashtags(tags):
+    return [tag.strip() if tag.strip().startswith("#") else "#" + tag.strip() for tag in tags if tag.strip()]
+
+def finding_hashtags(industry):
+    try:
+        tags = structured_output.generate(
+            [f"generate a list of 10 trending social media hashtags related to the {industry} industry."],
+            "hashtags",
+            model=MODEL_NAME,
+            tool=TOOL_NAME,
+        )
+    except structured_output.ParseError as e:
+        print(f"Could not read the hashtags from the reply: {e}")
+        tags = []
+    return as_hashtags(tags) or ["No hashtags found."]
     
 def suggestions(hashtags):
-    response=client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=[f"I'm a company who wants to use these hashtags for advertising: {', '.join(hashtags)} give me recommendations on how to use them."]
+    response=gemini_client.generate(
+        [f"I'm a company who wants to use these hashtags for advertising: {', '.join(hashtags)} give me recommendations on how to use them."],
+        model=MODEL_NAME,
+        tool=TOOL_NAME,
 
     )
     print("\nMarketing Recommendations:\n")
-    print(response.text)
+    print(response)
+
+def industry_key(industry):
+    """Industries are matched ignoring case and extra spaces ("Fintech" is "fintech ")."""
+    return " ".join(str(industry).split()).lower()
+
+def unique_industries(industries):
+    """Drops blank and repeated industries, keeping the first spelling of each."""
+    unique = {}
+    for industry in industries:
+        industry = " ".join(str(industry).split())
+        if industry:
+            unique.setdefault(industry_key(industry), industry)
+    return list(unique.values())
+
+def generate_batch(industries):
+    """
+    Asks for hashtags and recommendations for several industries in one
+    request. Returns {industry: {"hashtags": [...], "recommendations": str}}
+    for the industries found in the reply.
+    """
+    listing = "\n".join(f"- {industry}" for industry in industries)
+    entries = structured_output.generate(
+        [f"For each of these industries or advert terms:\n{listing}\n"
+         "generate a list of 10 trending social media hashtags related to it, and recommendations on how a company "
+         "should use those hashtags for advertising. Return one entry per industry, with the industry exactly as written above."],
+        "marketing_batch",
+        model=MODEL_NAME,
+        tool=TOOL_NAME,
+    )
+    results = {}
+    for entry in entries:
+        results[industry_key(entry["industry"])] = {
+            "hashtags": as_hashtags(entry["hashtags"]),
+            "recommendations": entry["recommendations"].strip(),
+        }
+    return {industry: results[industry_key(industry)] for industry in industries if industry_key(industry) in results}
+
+def read_industries(path):
+    """Reads industries from a .json list, a .csv ("industry" column, else the first column) or one per line."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            industries = json.load(f)
+        elif path.lower().endswith(".csv"):
+            rows = list(csv.reader(f))
+            column = 0
+            if rows and "industry" in [cell.strip().lower() for cell in rows[0]]:
+                column = [cell.strip().lower() for cell in rows[0]].index("industry")
+                rows = rows[1:]
+            industries = [row[column] for row in rows if len(row) > column]
+        else:
+            industries = f.read().splitlines()
+    return unique_industries(industries)
+
+def run_batch(industries, batch_size=BATCH_SIZE, concurrency=BATCH_CONCURRENCY):
+    """
+    Generates hashtags and recommendations for every industry, `batch_size`
+    per request with up to `concurrency` requests at once. Industries left
+    out of a reply (or in a failed request) are retried once in a request
+    of their own. Repeats, in any case, are checked once. Returns one row
+    per industry, in input order.
+    """
+    industries = unique_industries(industries)
+    results = {}
+    errors = {}
+
+    def run(batch):
+        try:
+            results.update(generate_batch(batch))
+        except Exception as e:
+            for industry in batch:
+                errors[industry] = str(e)
+
+    batches = [industries[i:i + batch_size] for i in range(0, len(industries), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        list(pool.map(run, batches))
+        missing = [industry for industry in industries if industry not in results]
+        list(pool.map(run, [[industry] for industry in missing]))
+
+    rows = []
+    for industry in industries:
+        result = results.get(industry)
+        if result:
+            rows.append({"industry": industry, **result, "error": ""})
+        else:
+            rows.append({"industry": industry, "hashtags": [], "recommendations": "",
+                         "error": errors.get(industry, "missing from the model's reply")})
+    return rows
+
+def write_results(rows, path):
+    if path.lower().endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["industry", "hashtags", "recommendations", "error"])
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict(row, hashtags=" ".join(row["hashtags"])))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+
+def batch_main(input_path, output_path=None):
+    industries = read_industries(input_path)
+    output_path = output_path or os.path.splitext(input_path)[0] + ".marketing.csv"
+    started = time.perf_counter()
+    rows = run_batch(industries)
+    write_results(rows, output_path)
+    failed = sum(1 for row in rows if row["error"])
+    requests = -(-len(industries) // BATCH_SIZE) if industries else 0
+    print(f"{len(rows) - failed} of {len(rows)} industries done in {time.perf_counter() - started:.1f}s "
+          f"(about {requests} request(s) instead of {2 * len(industries)}); results written to {output_path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trending hashtags and marketing recommendations.")
+    parser.add_argument("--batch", help="file of industries (.txt one per line, .csv or .json list)")
+    parser.add_argument("--output", help="results file, .csv or .json (default: <batch file>.marketing.csv)")
+    args = parser.parse_args(argv)
+    if args.batch:
+        batch_main(args.batch, args.output)
+        return
 
-def main():
-    industry = input("Enter industry or advert term: ")
+    industry = input("Enter industry or advert term (or a .txt/.csv/.json file of industries): ")
+    if industry.strip().lower().endswith((".txt", ".csv", ".json")) and os.path.exists(industry.strip()):
+        batch_main(industry.strip())
+        return
     hashtags = finding_hashtags(industry)
     print("\nTrending Hashtags are:")
     print(", ".join(hashtags))
     suggestions(hashtags)
 
-main()
+if __name__ == "__main__":
+    main()
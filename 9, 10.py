@@ -1,169 +1,229 @@
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
 
-def get_gemini_model():
-    load_dotenv("auth.env")  # Load environment variables from auth.env file
-    api_key = os.getenv('GOOGLE_API_KEY')
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in environment variables.  Please set it in your auth.env file or environment.")
-    genai.configure(api_key=api_key)
-    return genai
-
-def find_potential_clients(startup_details):
-    try:
-        model = get_gemini_model()
-        gemini = model.GenerativeModel('gemini-pro')  # Specify the model to use
-        prompt = f"""
-        Based on the following startup information, identify potential clients and market entry strategies:
-
-        Industry: {startup_details['industry']}
-        Product/Service: {startup_details['product']}
-        Target Market: {startup_details['target_market']}
-        Value Proposition: {startup_details['value_proposition']}
-
-        Please provide:
-        1. Detailed ideal client profiles with demographics and psychographics
-        2. List of potential client segments ranked by conversion probability
-        3. Specific strategies to reach and convert each client segment
-        4. Estimated client acquisition costs for each segment
-        5. Potential market size and reachable clients in first year
-        6. Most effective marketing channels for each segment
-        7. Common client pain points and how to address them
-
-        Be specific and provide actionable insights.
-        """
-
-        response = gemini.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error generating client analysis: {e}"
+load_dotenv("auth.env")  # before the modules below read their settings
 
+import gemini_client
 
-def analyze_competitors(startup_details):
-    try:
-        model = get_gemini_model()
-        gemini = model.GenerativeModel('gemini-pro')  # Specify the model to use
-        prompt = f"""
-        Provide a detailed competitor analysis for a startup in the following space:
-
-        Industry: {startup_details['industry']}
-        Product/Service: {startup_details['product']}
-        Target Market: {startup_details['target_market']}
-        Key Features: {startup_details['key_features']}
-
-        Please provide:
-        1. Top 5 direct competitors and their market positions
-        2. Detailed SWOT analysis for each major competitor
-        3. Competitor pricing strategies and business models
-        4. Market share distribution among key players
-        5. Competitive advantages and disadvantages
-        6. Gaps in competitor offerings that can be exploited
-        7. Potential defensive strategies from competitors
-        8. Recommended positioning strategy based on competition
-
-        Focus on actionable insights and specific strategies.
-        """
-
-        response = gemini.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error generating competitor analysis: {e}"
+MODEL_NAME = 'gemini-pro'
+TOOL_NAME = "market_analysis"
 
-
-def analyze_market_entry(startup_details):
+def get_gemini_model():
+    # The shared client reads auth.env and configures itself once per process.
+    return gemini_client.get_model(MODEL_NAME)
+
+def company_context(startup_details):
+    """The startup profile shared by every analysis in a session."""
+    return f"""
+    You are a market analyst advising the following startup. Use this profile for every request.
+
+    Industry: {startup_details['industry']}
+    Product/Service: {startup_details['product']}
+    Target Market: {startup_details['target_market']}
+    Value Proposition: {startup_details['value_proposition']}
+    Key Features: {startup_details['key_features']}
+    Available Resources: {startup_details['resources']}
+    """
+
+def stream_analysis(prompt, output_path, label, session=None):
+    """
+    Prints the analysis as it is generated and, if output_path is given,
+    writes each chunk to "<output_path>.partial" as it arrives. The finished
+    file replaces output_path only once the whole answer has arrived, so a
+    failed call never overwrites an earlier analysis and its partial output
+    is kept next to it. With a session, only the task prompt is sent and the
+    token usage of the call is reported. Returns the text received.
+    """
+    chunks = []
+    partial_path = f"{output_path}.partial" if output_path else None
+    out = open(partial_path, 'w', encoding='utf-8') if output_path else None
+    stream = session.stream(prompt) if session is not None else get_gemini_model().stream(prompt, tool=TOOL_NAME)
     try:
-        model = get_gemini_model()
-        gemini = model.GenerativeModel('gemini-pro')  # Specify the model to use
-        prompt = f"""
-        Analyze market entry strategies for:
-
-        Industry: {startup_details['industry']}
-        Product/Service: {startup_details['product']}
-        Target Market: {startup_details['target_market']}
-        Available Resources: {startup_details['resources']}
-
-        Please provide:
-        1. Most viable market entry strategies ranked by effectiveness
-        2. Resource requirements for each strategy
-        3. Timeline for market penetration
-        4. Risk assessment for each strategy
-        5. Key success metrics to track
-        6. Potential barriers to entry and how to overcome them
-
-        Consider both immediate impact and long-term sustainability.
-        """
-
-        response = gemini.generate_content(prompt)
-        return response.text
+        for chunk in stream:
+            print(chunk, end="", flush=True)
+            chunks.append(chunk)
+            if out:
+                out.write(chunk)
+                out.flush()
+        print()
+        if session is not None:
+            print(f"\n{session.usage_report()}")
+        if out:
+            out.close()
+            os.replace(partial_path, output_path)
+            print(f"\nAnalysis saved to {output_path}")
     except Exception as e:
-        return f"Error generating market entry analysis: {e}"
-
+        print(f"\nError generating {label}: {e}")
+        if out:
+            out.close()
+            if chunks:
+                print(f"Partial output kept in {partial_path}; {output_path} was not changed")
+            else:
+                os.remove(partial_path)
+    return "".join(chunks)
+
+def find_potential_clients(startup_details, output_path=None, session=None):
+    task = """
+    Please provide:
+    1. Detailed ideal client profiles with demographics and psychographics
+    2. List of potential client segments ranked by conversion probability
+    3. Specific strategies to reach and convert each client segment
+    4. Estimated client acquisition costs for each segment
+    5. Potential market size and reachable clients in first year
+    6. Most effective marketing channels for each segment
+    7. Common client pain points and how to address them
+
+    Be specific and provide actionable insights.
+    """
+    if session is not None:
+        instruction = "For the startup described in your instructions, identify potential clients and market entry strategies:\n"
+        return stream_analysis(instruction + task, output_path, "client analysis", session)
+
+    prompt = f"""
+    Based on the following startup information, identify potential clients and market entry strategies:
+
+    Industry: {startup_details['industry']}
+    Product/Service: {startup_details['product']}
+    Target Market: {startup_details['target_market']}
+    Value Proposition: {startup_details['value_proposition']}
+{task}"""
+
+    return stream_analysis(prompt, output_path, "client analysis")
+
+
+def analyze_competitors(startup_details, output_path=None, session=None):
+    task = """
+    Please provide:
+    1. Top 5 direct competitors and their market positions
+    2. Detailed SWOT analysis for each major competitor
+    3. Competitor pricing strategies and business models
+    4. Market share distribution among key players
+    5. Competitive advantages and disadvantages
+    6. Gaps in competitor offerings that can be exploited
+    7. Potential defensive strategies from competitors
+    8. Recommended positioning strategy based on competition
+
+    Focus on actionable insights and specific strategies.
+    """
+    if session is not None:
+        instruction = "Provide a detailed competitor analysis for the startup described in your instructions.\n"
+        return stream_analysis(instruction + task, output_path, "competitor analysis", session)
+
+    prompt = f"""
+    Provide a detailed competitor analysis for a startup in the following space:
+
+    Industry: {startup_details['industry']}
+    Product/Service: {startup_details['product']}
+    Target Market: {startup_details['target_market']}
+    Key Features: {startup_details['key_features']}
+{task}"""
+
+    return stream_analysis(prompt, output_path, "competitor analysis")
+
+
+def analyze_market_entry(startup_details, output_path=None, session=None):
+    task = """
+    Please provide:
+    1. Most viable market entry strategies ranked by effectiveness
+    2. Resource requirements for each strategy
+    3. Timeline for market penetration
+    4. Risk assessment for each strategy
+    5. Key success metrics to track
+    6. Potential barriers to entry and how to overcome them
+
+    Consider both immediate impact and long-term sustainability.
+    """
+    if session is not None:
+        instruction = "Analyze market entry strategies for the startup described in your instructions.\n"
+        return stream_analysis(instruction + task, output_path, "market entry analysis", session)
+
+    prompt = f"""
+    Analyze market entry strategies for:
+
+    Industry: {startup_details['industry']}
+    Product/Service: {startup_details['product']}
+    Target Market: {startup_details['target_market']}
+    Available Resources: {startup_details['resources']}
+{task}"""
+
+    return stream_analysis(prompt, output_path, "market entry analysis")
+
+
+def collect_startup_details(previous=None):
+    """Asks for the startup profile; with `previous`, pressing Enter keeps the old answer."""
+    questions = [
+        ('industry', "What industry is your startup in? "),
+        ('product', "What is your main product/service? "),
+        ('target_market', "Who is your target market? "),
+        ('value_proposition', "What is your unique value proposition? "),
+        ('key_features', "What are your key product/service features? "),
+        ('resources', "What resources do you have available for market entry? "),
+    ]
+    startup_details = {}
+    for key, question in questions:
+        if previous:
+            answer = input(f"{question}[{previous[key]}] ")
+            startup_details[key] = answer or previous[key]
+        else:
+            startup_details[key] = input(question)
+    return startup_details
 
 def main():
     print("\nMarket Analysis and Client Discovery Tool")
     print("----------------------------------------")
 
-    # Collect startup information
-    startup_details = {}
-    startup_details['industry'] = input("What industry is your startup in? ")
-    startup_details['product'] = input("What is your main product/service? ")
-    startup_details['target_market'] = input("Who is your target market? ")
-    startup_details['value_proposition'] = input("What is your unique value proposition? ")
-    startup_details['key_features'] = input("What are your key product/service features? ")
-    startup_details['resources'] = input("What resources do you have available for market entry? ")
+    # Collect startup information once; every analysis in the session reuses it.
+    startup_details = collect_startup_details()
+    while True:
+        session = gemini_client.ContextSession(company_context(startup_details), model=MODEL_NAME, tool=TOOL_NAME)
+        try:
+            edit_requested = run_menu(startup_details, session)
+        finally:
+            session.close()
+        if not edit_requested:
+            break
+        startup_details = collect_startup_details(startup_details)
 
+def run_menu(startup_details, session):
+    """Runs the analysis menu; returns True if the user wants to edit the startup details."""
     while True:
         print("\nMarket Analysis Options:")
         print("1. Find Potential Clients")
         print("2. Analyze Competitors")
         print("3. Analyze Market Entry Strategies")
-        print("4. Exit")
+        print("4. Edit Startup Details")
+        print("5. Exit")
 
-        choice = input("\nSelect an option (1-4): ")
+        choice = input("\nSelect an option (1-5): ")
 
         if choice == "1":
             print("\n--- Potential Client Analysis ---")
-            print("\nAnalyzing potential clients...")
-            client_analysis = find_potential_clients(startup_details)
-            print("\n" + client_analysis)
-
             save = input("\nSave this client analysis to file? (y/n): ")
-            if save.lower() == 'y':
-                with open('client_analysis.txt', 'w', encoding='utf-8') as f:
-                    f.write(client_analysis)
-                print("Analysis saved to client_analysis.txt")
+            print("\nAnalyzing potential clients...\n")
+            find_potential_clients(startup_details, 'client_analysis.txt' if save.lower() == 'y' else None, session)
 
         elif choice == "2":
             print("\n--- Competitor Analysis ---")
-            print("\nAnalyzing competitors...")
-            competitor_analysis = analyze_competitors(startup_details)
-            print("\n" + competitor_analysis)
-
             save = input("\nSave this competitor analysis to file? (y/n): ")
-            if save.lower() == 'y':
-                with open('competitor_analysis.txt', 'w', encoding='utf-8') as f:
-                    f.write(competitor_analysis)
-                print("Analysis saved to competitor_analysis.txt")
+            print("\nAnalyzing competitors...\n")
+            analyze_competitors(startup_details, 'competitor_analysis.txt' if save.lower() == 'y' else None, session)
 
         elif choice == "3":
             print("\n--- Market Entry Strategy ---")
-            print("\nAnalyzing market entry strategies...")
-            entry_analysis = analyze_market_entry(startup_details)
-            print("\n" + entry_analysis)
-
             save = input("\nSave this market entry analysis to file? (y/n): ")
-            if save.lower() == 'y':
-                with open('market_entry_analysis.txt', 'w', encoding='utf-8') as f:
-                    f.write(entry_analysis)
-                print("Analysis saved to market_entry_analysis.txt")
+            print("\nAnalyzing market entry strategies...\n")
+            analyze_market_entry(startup_details, 'market_entry_analysis.txt' if save.lower() == 'y' else None, session)
 
         elif choice == "4":
+            print("\n--- Edit Startup Details (press Enter to keep an answer) ---")
+            return True
+
+        elif choice == "5":
             print("Exiting. Good luck with your market analysis!")
-            break
+            return False
 
         else:
-            print("Invalid choice. Please select 1-4.")
+            print("Invalid choice. Please select 1-5.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""Local copy of a Google Calendar, kept current with incremental sync.
+
+The first `sync()` pulls every event once and stores the `nextSyncToken`
+the API returns. Later syncs send that token and only receive what changed
+(new, edited and cancelled events), so listing and looking up events is a
+local SQLite query instead of a full `events().list` download. If Google
+expires the token (HTTP 410) the store is wiped and fully re-synced.
+
+Pages are requested with a `fields=` mask (EVENT_FIELDS) so only the parts
+of each event the tool uses are downloaded. Lookups by id and by
+(summary, date) go through dictionaries held in memory next to the
+database; only range queries (`between`) hit SQLite.
+
+A database written by an older version without the `end_ts` column is
+cleared on open, so the next sync downloads the calendar again.
+"""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import zoneinfo
+
+SYNC_PAGE_SIZE = 2500
+EVENT_FIELDS = (
+    "nextPageToken,nextSyncToken,"
+    "items(id,status,summary,description,start,end,attendees(email),htmlLink)"
+)
+
+
+def normalize_summary(summary):
+    return " ".join((summary or "").lower().split())
+
+
+def event_start(event):
+    start = event.get("start", {})
+    return start.get("dateTime", start.get("date", ""))
+
+
+def to_timestamp(value, time_zone=None):
+    """
+    Epoch seconds for an RFC 3339 date-time or an all-day date.
+
+    Values without an offset (all-day dates, or the echo of an event we sent
+    with a separate timeZone) are read in `time_zone`, falling back to UTC.
+    """
+    if not value:
+        return 0.0
+    if "T" not in value:
+        value += "T00:00:00"
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        try:
+            tz = zoneinfo.ZoneInfo(time_zone) if time_zone else datetime.timezone.utc
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            tz = datetime.timezone.utc
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed.timestamp()
+
+
+def event_timestamp(event):
+    return to_timestamp(event_start(event), event.get("start", {}).get("timeZone"))
+
+
+def event_end_timestamp(event):
+    """End of an event in epoch seconds (its start if it has no end)."""
+    end = event.get("end", {})
+    value = end.get("dateTime", end.get("date"))
+    if not value:
+        return event_timestamp(event)
+    return to_timestamp(value, end.get("timeZone") or event.get("start", {}).get("timeZone"))
+
+
+def fetch_pages(service, **params):
+    """Yields every page of an `events().list` request, following nextPageToken."""
+    page_token = None
+    while True:
+        page = service.events().list(pageToken=page_token, **params).execute()
+        yield page
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def is_sync_token_expired(error):
+    resp = getattr(error, "resp", None)
+    return getattr(resp, "status", None) == 410
+
+
+class EventStore:
+    def __init__(self, path=None, calendar_id="primary"):
+        self.path = path or os.getenv("CALENDAR_STORE_PATH", "calendar_events.sqlite")
+        self.calendar_id = calendar_id
+        self.api_calls = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(events)")]
+        if columns and "end_ts" not in columns:
+            self._db.executescript("DROP TABLE events; DROP TABLE IF EXISTS sync_state;")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                id TEXT PRIMARY KEY,
+                summary_norm TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                start_ts REAL NOT NULL,
+                end_ts REAL NOT NULL,
+                event TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_start ON events (start_ts);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._reload_index()
+
+    def _index(self, event):
+        self._unindex(event["id"])
+        self._by_id[event["id"]] = event
+        key = (normalize_summary(event.get("summary")), event_start(event)[:10])
+        self._by_key.setdefault(key, []).append(event["id"])
+
+    def _unindex(self, event_id):
+        event = self._by_id.pop(event_id, None)
+        if event is None:
+            return
+        key = (normalize_summary(event.get("summary")), event_start(event)[:10])
+        ids = self._by_key.get(key, [])
+        if event_id in ids:
+            ids.remove(event_id)
+        if not ids:
+            self._by_key.pop(key, None)
+
+    def _state(self, key):
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, value))
+
+    @property
+    def last_sync(self):
+        value = self._state("last_sync")
+        return float(value) if value else None
+
+    def sync(self, service):
+        """Fetches changes since the last sync (everything on the first run). Returns (changed, removed)."""
+        with self._lock:
+            sync_token = self._state("sync_token")
+            try:
+                changed, removed = self._sync_pages(service, sync_token)
+            except Exception as e:
+                self._db.rollback()
+                self._reload_index()
+                if sync_token is None or not is_sync_token_expired(e):
+                    raise
+                changed, removed = self._sync_pages(service, None)
+            return changed, removed
+
+    def _reload_index(self):
+        self._by_id = {}
+        self._by_key = {}
+        for (event,) in self._db.execute("SELECT event FROM events ORDER BY start_ts"):
+            self._index(json.loads(event))
+
+    def _sync_pages(self, service, sync_token):
+        params = {
+            "calendarId": self.calendar_id,
+            "singleEvents": True,
+            "maxResults": SYNC_PAGE_SIZE,
+            "fields": EVENT_FIELDS,
+        }
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            self._db.execute("DELETE FROM events")
+            self._by_id = {}
+            self._by_key = {}
+
+        changed = removed = 0
+        for page in fetch_pages(service, **params):
+            self.api_calls += 1
+            for event in page.get("items", []):
+                if event.get("status") == "cancelled":
+                    self._delete(event["id"])
+                    removed += 1
+                else:
+                    self._upsert(event)
+                    changed += 1
+
+        self._set_state("sync_token", page.get("nextSyncToken"))
+        self._set_state("last_sync", str(time.time()))
+        self._db.commit()
+        return changed, removed
+
+    def _upsert(self, event):
+        start = event_start(event)
+        start_ts = event_timestamp(event)
+        self._db.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+            (event["id"], normalize_summary(event.get("summary")), start[:10], start_ts,
+             max(start_ts, event_end_timestamp(event)), json.dumps(event)),
+        )
+        self._index(event)
+
+    def _delete(self, event_id):
+        self._db.execute("DELETE FROM events WHERE id = ?", (event_id,))
+        self._unindex(event_id)
+
+    def put(self, event):
+        """Records an event we just created or changed through the API."""
+        with self._lock:
+            self._upsert(event)
+            self._db.commit()
+
+    def remove(self, event_id):
+        """Drops an event we just deleted through the API."""
+        with self._lock:
+            self._delete(event_id)
+            self._db.commit()
+
+    def get(self, event_id):
+        return self._by_id.get(event_id)
+
+    def find(self, summary, date):
+        """Events with this summary (case and spacing ignored) starting on `date` (YYYY-MM-DD)."""
+        ids = self._by_key.get((normalize_summary(summary), date), [])
+        return sorted((self._by_id[event_id] for event_id in ids), key=event_timestamp)
+
+    def between(self, time_min, time_max=None):
+        """
+        Events overlapping [time_min, time_max), given as datetimes, in start
+        order. This includes events that started earlier and are still running.
+        """
+        min_ts = time_min.timestamp()
+        max_ts = time_max.timestamp() if time_max else float("inf")
+        rows = self._db.execute(
+            "SELECT event FROM events WHERE start_ts < ? AND (end_ts > ? OR start_ts >= ?) ORDER BY start_ts",
+            (max_ts, min_ts, min_ts),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM events")
+            self._db.execute("DELETE FROM sync_state")
+            self._db.commit()
+            self._by_id = {}
+            self._by_key = {}
@@ -0,0 +1,320 @@
+"""Exact financial figures for the startup financial advisor ("4, 5.py").
+
+Breakeven, month-by-month cash flow / runway and price-cost sensitivity are
+computed locally with NumPy, so Gemini only has to write the narrative
+around numbers that are already correct. Capital deployment options can be
+compared with a seeded Monte Carlo simulation (simulate_capital_options).
+"""
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+_AMOUNT = re.compile(
+    r"(?:(?<!\w)(\$|₹|€|£|rs\.?|inr|usd|eur|gbp)\s*|(?<!\w))"
+    r"(\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"\s*(%|k|m|mn|million|thousand|lakh|lakhs|crore|crores)?(?![\w.])",
+    re.IGNORECASE,
+)
+_MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mn": 1e6, "million": 1e6,
+    "lakh": 1e5, "lakhs": 1e5,
+    "crore": 1e7, "crores": 1e7,
+}
+# Words that multiply an amount by a count ("2 employees at 50k each").
+_MULTIPLYING = re.compile(r"\b(?:each|apiece|times)\b|(?<!\w)[x×](?!\w)", re.IGNORECASE)
+
+Amount = namedtuple("Amount", "value is_percent is_money")
+
+
+def find_amounts(text):
+    """
+    Returns every amount in free text as Amount(value, is_percent, is_money).
+
+    Commas between digits are thousands separators ("12,500", "2,50,000").
+    An amount is clearly money when it has a currency sign or code, a
+    thousands separator or a magnitude ("4k", "2.5 lakh"); a bare "12" may
+    just as well be a count or a number of months.
+    """
+    if text is None:
+        return []
+    amounts = []
+    for match in _AMOUNT.finditer(str(text)):
+        currency, digits, suffix = match.group(1), match.group(2), (match.group(3) or "").lower()
+        amounts.append(Amount(
+            float(digits.replace(",", "")) * _MULTIPLIERS.get(suffix, 1),
+            suffix == "%",
+            bool(currency or "," in digits or suffix in _MULTIPLIERS),
+        ))
+    return amounts
+
+
+def parse_amount(text):
+    """
+    Reads a single amount from free text ("$12,500", "4k", "2.5 lakh").
+
+    Returns None when there is no amount, more than one, or a percentage
+    ("10% of price"), since those cannot be turned into one exact figure.
+    """
+    amounts = find_amounts(text)
+    if len(amounts) != 1 or amounts[0].is_percent:
+        return None
+    return amounts[0].value
+
+
+def parse_total(text):
+    """
+    Adds up the amounts in free text ("rent 20,000, salaries 50,000").
+
+    A single number is read as is. With several, every one of them has to
+    be clearly money (see find_amounts), otherwise "rent 20000 for 12
+    months" would add the months to the rent, and none may be multiplied
+    by a count ("2 employees at 50k each"). Those texts, percentages and texts
+    without an amount give None, so the caller can let the model read them.
+    """
+    amounts = find_amounts(text)
+    if not amounts or any(amount.is_percent for amount in amounts):
+        return None
+    if re.search(r"\d", _AMOUNT.sub(" ", str(text))) or _MULTIPLYING.search(str(text)):
+        return None  # "2x50k", "Q3", "50k each": not a plain sum of amounts
+    if len(amounts) > 1 and not all(amount.is_money for amount in amounts):
+        return None
+    return sum(amount.value for amount in amounts)
+
+
+def parse_percent(text):
+    """Reads a single number, with or without a % sign ("5", "5%"), or None."""
+    amounts = find_amounts(text)
+    return amounts[0].value if len(amounts) == 1 else None
+
+
+def breakeven(fixed_costs, variable_cost, price):
+    """Returns breakeven units and revenue per month, or None if each sale loses money."""
+    margin = price - variable_cost
+    if margin <= 0:
+        return None
+    units = fixed_costs / margin
+    return {
+        "contribution_margin": margin,
+        "margin_ratio": margin / price,
+        "units": units,
+        "units_rounded": int(np.ceil(units)),
+        "revenue": units * price,
+    }
+
+
+def project_cash_flow(starting_cash, fixed_costs, variable_cost=0.0, price=0.0,
+                      units_per_month=0.0, monthly_growth=0.0, months=12):
+    """
+    Projects cash month by month.
+
+    Unit sales start at `units_per_month` and grow by `monthly_growth`
+    (0.05 = 5%) each month. Returns the per-month arrays plus the first month
+    cash runs out (runway) and the first month with a non-negative result.
+    """
+    month = np.arange(1, months + 1)
+    units = units_per_month * (1 + monthly_growth) ** (month - 1)
+    revenue = units * price
+    costs = fixed_costs + units * variable_cost
+    net = revenue - costs
+    cash = starting_cash + np.cumsum(net)
+
+    out_of_cash = np.flatnonzero(cash < 0)
+    profitable = np.flatnonzero(net >= 0)
+    if len(out_of_cash):
+        runway_months = int(out_of_cash[0])
+    elif net[-1] < 0:
+        # Still burning at the end of the horizon: extend at the last burn rate.
+        runway_months = months + int(cash[-1] // -net[-1])
+    else:
+        runway_months = None
+    return {
+        "month": month,
+        "units": units,
+        "revenue": revenue,
+        "costs": costs,
+        "net": net,
+        "cash": cash,
+        "runway_months": runway_months,
+        "breakeven_month": int(month[profitable[0]]) if len(profitable) else None,
+    }
+
+
+def sensitivity_grid(fixed_costs, prices, variable_costs):
+    """Breakeven units for every (variable cost, price) pair; inf where a sale loses money."""
+    prices = np.asarray(prices, dtype=float)[np.newaxis, :]
+    variable_costs = np.asarray(variable_costs, dtype=float)[:, np.newaxis]
+    margin = prices - variable_costs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(margin > 0, np.ceil(fixed_costs / margin), np.inf)
+
+
+def spread(value, pct=0.2, steps=5):
+    """`steps` values from value*(1-pct) to value*(1+pct)."""
+    return np.linspace(value * (1 - pct), value * (1 + pct), steps)
+
+
+def format_breakeven(result, fixed_costs, variable_cost, price):
+    if result is None:
+        return (f"Price ({price:,.2f}) does not cover the variable cost per unit ({variable_cost:,.2f}), "
+                f"so there is no breakeven point at this price.")
+    return "\n".join([
+        f"Fixed costs per month: {fixed_costs:,.2f}",
+        f"Variable cost per unit: {variable_cost:,.2f}",
+        f"Price per unit: {price:,.2f}",
+        f"Contribution margin per unit: {result['contribution_margin']:,.2f} ({result['margin_ratio']:.1%} of price)",
+        f"Breakeven: {result['units_rounded']:,} units per month ({result['revenue']:,.2f} revenue per month)",
+    ])
+
+
+def format_grid(grid, prices, variable_costs):
+    lines = ["Breakeven units per month (rows: variable cost, columns: price)"]
+    lines.append(" " * 12 + "".join(f"{p:>12,.2f}" for p in prices))
+    for cost, row in zip(variable_costs, grid):
+        cells = "".join(f"{'n/a':>12}" if np.isinf(u) else f"{u:>12,.0f}" for u in row)
+        lines.append(f"{cost:>12,.2f}{cells}")
+    return "\n".join(lines)
+
+
+def format_projection(projection, months=None):
+    rows = len(projection["month"]) if months is None else months
+    lines = [f"{'Month':>5}{'Units':>10}{'Revenue':>14}{'Costs':>14}{'Net':>14}{'Cash':>14}"]
+    for i in range(rows):
+        lines.append(
+            f"{projection['month'][i]:>5}{projection['units'][i]:>10,.0f}{projection['revenue'][i]:>14,.2f}"
+            f"{projection['costs'][i]:>14,.2f}{projection['net'][i]:>14,.2f}{projection['cash'][i]:>14,.2f}"
+        )
+    runway = projection["runway_months"]
+    lines.append("Runway: " + ("cash does not run out" if runway is None else f"{runway} month(s)"))
+    first_positive = projection["breakeven_month"]
+    lines.append("First month at or above breakeven: " + ("not reached" if first_positive is None else str(first_positive)))
+    return "\n".join(lines)
+
+
+# Monte Carlo simulation of capital deployment options
+#
+# Each option is a dict of the form
+#
+#     {"name": "Paid acquisition",
+#      "monthly_spend": 4000,                 # acquisition budget per month
+#      "cac": {"mean": 120, "sd": 30},        # cost to acquire one customer
+#      "growth": {"mean": 0.03, "sd": 0.02},  # organic monthly customer growth
+#      "churn": {"low": 0.02, "high": 0.06},  # monthly share of customers lost
+#      "cost": 1500}                          # extra monthly operating cost
+#
+# where every distribution is a constant, {"mean", "sd"} (normal) or
+# {"low", "high"} (uniform). CAC, churn and cost are drawn once per path;
+# growth is drawn again every month.
+
+SIMULATION_CHUNK = 10000
+
+
+def _draw(rng, spec, size):
+    if spec is None:
+        return np.zeros(size)
+    if isinstance(spec, (int, float)):
+        return np.full(size, float(spec))
+    if "low" in spec:
+        return rng.uniform(spec["low"], spec["high"], size)
+    return rng.normal(spec["mean"], spec.get("sd", 0.0), size)
+
+
+def _simulate_chunk(option, cash, fixed_costs, arpu, customers, months, n_paths, seed):
+    rng = np.random.default_rng(seed)
+    cac = np.maximum(_draw(rng, option.get("cac"), n_paths), 1e-9)
+    churn = np.clip(_draw(rng, option.get("churn"), n_paths), 0.0, 1.0)
+    extra_cost = np.maximum(_draw(rng, option.get("cost"), n_paths), 0.0)
+    spend = float(option.get("monthly_spend", 0.0))
+
+    cash = np.full(n_paths, float(cash))
+    customers = np.full(n_paths, float(customers))
+    runway = np.full(n_paths, np.inf)
+    breakeven_month = np.full(n_paths, np.inf)
+    for month in range(1, months + 1):
+        growth = _draw(rng, option.get("growth"), n_paths)
+        customers = np.maximum(customers * (1 + growth) * (1 - churn) + spend / cac, 0.0)
+        net = customers * arpu - (fixed_costs + extra_cost + spend)
+        cash = cash + net
+        alive = np.isinf(runway)
+        breakeven_month[alive & (net >= 0) & np.isinf(breakeven_month)] = month
+        runway[alive & (cash < 0)] = month - 1
+    return runway, breakeven_month, cash
+
+
+def _summarize(name, runway, breakeven_month, ending_cash, months, breakeven_by):
+    capped_runway = np.where(np.isinf(runway), months, runway)
+    worst = np.sort(ending_cash)[:max(1, len(ending_cash) // 20)]
+    p10, p50, p90 = np.percentile(capped_runway, [10, 50, 90])
+    return {
+        "name": name,
+        "runway_p10": float(p10),
+        "runway_p50": float(p50),
+        "runway_p90": float(p90),
+        "p_breakeven": float(np.mean(breakeven_month <= breakeven_by)),
+        "p_out_of_cash": float(np.mean(np.isfinite(runway))),
+        "ending_cash_p5": float(np.percentile(ending_cash, 5)),
+        "ending_cash_p50": float(np.percentile(ending_cash, 50)),
+        "expected_shortfall": float(worst.mean()),
+    }
+
+
+def simulate_capital_options(options, cash, fixed_costs, arpu, customers=0, months=24,
+                             paths=20000, breakeven_by=12, seed=None, workers=1):
+    """
+    Simulates `paths` futures for every option and summarises runway,
+    breakeven probability and downside risk.
+
+    Paths are generated in fixed chunks, each with its own child of the seed,
+    so a given seed gives the same results whether or not a process pool
+    (`workers` > 1) is used. Returns (summaries, seed). Raises ValueError
+    unless there is at least one option, one path and one month.
+    """
+    if not options:
+        raise ValueError("at least one capital option is required")
+    if int(paths) != paths or paths < 1:
+        raise ValueError(f"paths must be a whole number of at least 1, not {paths}")
+    if int(months) != months or months < 1:
+        raise ValueError(f"months must be a whole number of at least 1, not {months}")
+    root = np.random.SeedSequence(seed)
+    jobs = []
+    for option, option_seed in zip(options, root.spawn(len(options))):
+        chunks = [SIMULATION_CHUNK] * (paths // SIMULATION_CHUNK)
+        if paths % SIMULATION_CHUNK:
+            chunks.append(paths % SIMULATION_CHUNK)
+        for size, chunk_seed in zip(chunks, option_seed.spawn(len(chunks))):
+            jobs.append((option, cash, fixed_costs, arpu, customers, months, size, chunk_seed))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*jobs)))
+    else:
+        results = [_simulate_chunk(*job) for job in jobs]
+
+    summaries = []
+    for option in options:
+        option_results = [result for job, result in zip(jobs, results) if job[0] is option]
+        runway, breakeven_month, ending_cash = (np.concatenate(parts) for parts in zip(*option_results))
+        summaries.append(_summarize(option["name"], runway, breakeven_month, ending_cash, months, breakeven_by))
+    return summaries, root.entropy
+
+
+def format_simulation(summaries, months, breakeven_by, paths, seed):
+    def runway(value):
+        return f"{months}+" if value >= months else f"{value:.0f}"
+
+    lines = [
+        f"Monte Carlo simulation: {paths:,} paths per option over {months} months (seed {seed})",
+        f"{'Option':<24}{'Runway P10/P50/P90':>20}{f'P(breakeven <= {breakeven_by}m)':>22}"
+        f"{'P(out of cash)':>16}{'Cash P5':>14}{'Worst 5% avg':>14}",
+    ]
+    for s in summaries:
+        runways = f"{runway(s['runway_p10'])}/{runway(s['runway_p50'])}/{runway(s['runway_p90'])}"
+        lines.append(
+            f"{s['name'][:23]:<24}{runways:>20}{s['p_breakeven']:>22.1%}"
+            f"{s['p_out_of_cash']:>16.1%}{s['ending_cash_p5']:>14,.0f}{s['expected_shortfall']:>14,.0f}"
+        )
+    return "\n".join(lines)
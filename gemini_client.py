@@ -0,0 +1,286 @@
+"""Process-wide Gemini client shared by every tool.
+
+All tools talk to Gemini through one `google.genai.Client`, built on first
+use and kept for the rest of the process, so auth.env is read once and the
+underlying HTTP connections (and their TLS sessions) are kept alive and
+reused between calls. The connection pool can be tuned with:
+
+    GEMINI_POOL_SIZE          max open connections (default 10)
+    GEMINI_KEEPALIVE_SECONDS  how long idle connections are kept (default 120)
+    GEMINI_TIMEOUT_MS         per-request timeout (default 120000)
+
+Every generation call goes through rate_limit, which keeps each model under
+its per-minute quotas and retries transient errors.
+"""
+import os
+import threading
+
+from dotenv import load_dotenv
+
+import llm_cache
+import rate_limit
+from lazy_imports import lazy_import
+
+genai = lazy_import("google.genai")
+genai_types = lazy_import("google.genai.types")
+httpx = lazy_import("httpx")
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Smallest context, in tokens, each model family accepts for context caching.
+# Models not listed (e.g. gemini-pro, gemini-1.0-pro) do not support it.
+CACHE_MIN_TOKENS = {
+    "gemini-1.5-flash": 32768,
+    "gemini-1.5-pro": 32768,
+    "gemini-2.0-flash": 4096,
+    "gemini-2.5-flash": 1024,
+    "gemini-2.5-pro": 4096,
+}
+
+# Models from before JSON mode and system instructions: they reject
+# response_mime_type/response_schema and system_instruction.
+LEGACY_MODELS = ("gemini-pro", "gemini-1.0-pro")
+
+_lock = threading.Lock()
+_client = None
+_models = {}
+
+
+def _http_options():
+    pool_size = int(os.getenv("GEMINI_POOL_SIZE", "10"))
+    keepalive_seconds = float(os.getenv("GEMINI_KEEPALIVE_SECONDS", "120"))
+    timeout_ms = int(os.getenv("GEMINI_TIMEOUT_MS", "120000"))
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=keepalive_seconds,
+    )
+    try:
+        return genai_types.HttpOptions(timeout=timeout_ms, client_args={"limits": limits})
+    except Exception:
+        # Older google-genai releases do not accept client_args; they still
+        # reuse one httpx client, just with its default pool limits.
+        return genai_types.HttpOptions(timeout=timeout_ms)
+
+
+def get_client():
+    """Returns the shared client, creating it on the first call."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                load_dotenv("auth.env")
+                api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GOOGLE_API_KEY not found in environment variables.  Please set it in your auth.env file or environment.")
+                _client = genai.Client(api_key=api_key, http_options=_http_options())
+    return _client
+
+
+class ModelHandle:
+    """A model name bound to the shared client, used like `GenerativeModel`."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, contents, config=None):
+        return rate_limit.call(
+            self.name,
+            lambda: get_client().models.generate_content(model=self.name, contents=contents, config=config),
+            rate_limit.estimate_tokens(contents),
+        )
+
+    def generate(self, contents, config=None, tool=None, use_cache=True):
+        """Returns the response text, served from the response cache when possible."""
+        return llm_cache.cached_call(
+            self.name, contents, config, tool,
+            lambda: self.generate_content(contents, config=config).text,
+            use_cache=use_cache,
+        )
+
+    def stream(self, contents, config=None, tool=None, use_cache=True):
+        """Yields the response text chunk by chunk as it is generated.
+
+        A cached response is yielded as a single chunk; a streamed one is
+        cached only once it has arrived completely.
+        """
+        cache = llm_cache.get_cache()
+        key = llm_cache.cache_key(self.name, contents, config)
+        if use_cache and not llm_cache.bypass_enabled():
+            cached = cache.get(key, tool)
+            if cached is not None:
+                yield cached
+                return
+        chunks = []
+        for chunk in rate_limit.stream(
+            self.name,
+            lambda: get_client().models.generate_content_stream(model=self.name, contents=contents, config=config),
+            rate_limit.estimate_tokens(contents),
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        if chunks:
+            cache.put(key, "".join(chunks), tool=tool, model=self.name)
+
+    def __repr__(self):
+        return f"<ModelHandle {self.name}>"
+
+
+def get_model(name=DEFAULT_MODEL):
+    """Returns the process-wide handle for a model."""
+    with _lock:
+        handle = _models.get(name)
+        if handle is None:
+            handle = _models[name] = ModelHandle(name)
+    return handle
+
+
+def generate(contents, model=DEFAULT_MODEL, config=None, tool=None, use_cache=True):
+    """Runs one generation on the shared client and returns the response text."""
+    return get_model(model).generate(contents, config=config, tool=tool, use_cache=use_cache)
+
+
+def cache_min_tokens(model):
+    """Minimum cacheable context for `model`, or None if it cannot cache context."""
+    name = model.rsplit("/", 1)[-1]
+    prefixes = [prefix for prefix in CACHE_MIN_TOKENS if name.startswith(prefix)]
+    return CACHE_MIN_TOKENS[max(prefixes, key=len)] if prefixes else None
+
+
+def is_legacy_model(model):
+    """True for gemini-pro and gemini-1.0-pro (and their versioned names)."""
+    return model.rsplit("/", 1)[-1].startswith(LEGACY_MODELS)
+
+
+def supports_response_schema(model):
+    """Whether `model` accepts a JSON response schema (structured_output)."""
+    return not is_legacy_model(model)
+
+
+def supports_system_instruction(model):
+    """Whether `model` accepts a system instruction (ContextSession)."""
+    return not is_legacy_model(model)
+
+
+class ContextSession:
+    """
+    Holds context shared by several prompts (e.g. a company profile) so that
+    each request only carries its task-specific instruction.
+
+    The context is stored with the API's context caching when the model and
+    context size allow it (CACHE_MIN_TOKENS), and cached tokens are not
+    billed as fresh input again. Otherwise it is sent as the system
+    instruction on every call, without first trying to create a cache, or,
+    for models without system instructions (gemini-pro), placed before the
+    task in the prompt itself. In
+    both cases `last_usage` and `totals` report how many input tokens were
+    served from the cached context.
+    """
+
+    def __init__(self, context, model=DEFAULT_MODEL, tool=None, ttl_seconds=3600):
+        self.context = context
+        self.model = model
+        self.tool = tool
+        self.ttl_seconds = ttl_seconds
+        self.cache_name = None
+        self.cache_error = None
+        self.last_usage = None
+        self.totals = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        self._started = False
+
+    def _start(self):
+        self._started = True
+        min_tokens = cache_min_tokens(self.model)
+        if min_tokens is None:
+            self.cache_error = f"{self.model} does not support context caching"
+            return
+        if rate_limit.estimate_tokens(self.context) < min_tokens:
+            self.cache_error = f"context is below the {min_tokens} tokens {self.model} needs for caching"
+            return
+        try:
+            cached = rate_limit.call(
+                self.model,
+                lambda: get_client().caches.create(
+                    model=self.model,
+                    config=genai_types.CreateCachedContentConfig(
+                        system_instruction=self.context,
+                        ttl=f"{self.ttl_seconds}s",
+                        display_name=self.tool or "context-session",
+                    ),
+                ),
+                rate_limit.estimate_tokens(self.context),
+                usage=None,
+            )
+            self.cache_name = cached.name
+        except Exception as e:
+            self.cache_error = str(e)
+
+    def _config(self):
+        if not self._started:
+            self._start()
+        if self.cache_name:
+            return genai_types.GenerateContentConfig(cached_content=self.cache_name)
+        if supports_system_instruction(self.model):
+            return genai_types.GenerateContentConfig(system_instruction=self.context)
+        return None  # the context goes into the prompt instead
+
+    def _contents(self, task, config):
+        return task if config is not None else [self.context, task]
+
+    def _record_usage(self, usage):
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+        self.last_usage = {"prompt_tokens": prompt_tokens, "cached_tokens": cached_tokens}
+        self.totals["calls"] += 1
+        self.totals["prompt_tokens"] += prompt_tokens
+        self.totals["cached_tokens"] += cached_tokens
+
+    def stream(self, task, use_cache=True):
+        """Yields the answer to `task`, given the session context, chunk by chunk."""
+        cache = llm_cache.get_cache()
+        key = llm_cache.cache_key(self.model, [self.context, task])
+        self.last_usage = None
+        if use_cache and not llm_cache.bypass_enabled():
+            cached = cache.get(key, self.tool)
+            if cached is not None:
+                yield cached
+                return
+        chunks = []
+        usage = None
+        config = self._config()
+        contents = self._contents(task, config)
+        for chunk in rate_limit.stream(
+            self.model,
+            lambda: get_client().models.generate_content_stream(model=self.model, contents=contents, config=config),
+            rate_limit.estimate_tokens(task if self.cache_name else [self.context, task]),
+        ):
+            usage = chunk.usage_metadata or usage
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        if usage is not None:
+            self._record_usage(usage)
+        if chunks:
+            cache.put(key, "".join(chunks), tool=self.tool, model=self.model)
+
+    def usage_report(self):
+        """One-line summary of the input tokens used by the last call."""
+        if self.last_usage is None:
+            return "Input tokens: none (answer served from the response cache)"
+        prompt_tokens = self.last_usage["prompt_tokens"]
+        cached_tokens = self.last_usage["cached_tokens"]
+        if not self.cache_name:
+            reason = self.cache_error or "context caching unavailable"
+            return f"Input tokens: {prompt_tokens} ({reason}; company context re-sent)"
+        saved = cached_tokens / prompt_tokens if prompt_tokens else 0
+        return (f"Input tokens: {prompt_tokens}, of which {cached_tokens} came from the cached context "
+                f"({saved:.0%} not re-sent)")
+
+    def close(self):
+        if self.cache_name:
+            try:
+                rate_limit.call(self.model, lambda: get_client().caches.delete(name=self.cache_name), usage=None)
+            except Exception:
+                pass  # the cache expires on its own after ttl_seconds
+            self.cache_name = None
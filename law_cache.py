@@ -0,0 +1,112 @@
+"""Sidecar cache for the law lines extracted from a PDF.
+
+`save()` writes `<pdf>.lawcache` next to the PDF:
+
+    header   magic, SHA-256 of the PDF, PDF mtime and size, line count
+    offsets  (count + 1) little-endian uint64 byte offsets into the blob
+    blob     every line, UTF-8 encoded, back to back
+
+`load()` memory-maps that file and returns a `LawList`, which decodes a line
+only when it is accessed. The cache is valid while the PDF's mtime and size
+match; if they differ the PDF is hashed and the cache is only rebuilt when
+the content actually changed.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+
+MAGIC = b"NNLAWS01"
+_HEADER = struct.Struct("<8s32sdQQ")
+_OFFSET = struct.Struct("<Q")
+
+
+def cache_path(pdf_path):
+    return pdf_path + ".lawcache"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class LawList(Sequence):
+    """Read-only list of law lines backed by a memory-mapped cache file."""
+
+    def __init__(self, buffer, count):
+        self._buffer = buffer
+        self._count = count
+        self._offsets_at = _HEADER.size
+        self._blob_at = _HEADER.size + (count + 1) * _OFFSET.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("law index out of range")
+        start, end = struct.unpack_from("<QQ", self._buffer, self._offsets_at + index * _OFFSET.size)
+        return self._buffer[self._blob_at + start:self._blob_at + end].decode("utf-8")
+
+
+def _update_header(path, header):
+    """Rewrites the header in place; a read-only cache is still used, only hashed again next time."""
+    try:
+        with open(path, "r+b") as f:
+            f.write(header)
+    except OSError:
+        pass
+
+
+def load(pdf_path):
+    """Returns the cached lines for `pdf_path`, or None if there is no valid cache."""
+    stat = os.stat(pdf_path)
+    path = cache_path(pdf_path)
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None
+            magic, digest, mtime, size, count = _HEADER.unpack(header)
+            if magic != MAGIC:
+                return None
+            if (mtime, size) != (stat.st_mtime, stat.st_size):
+                if size != stat.st_size or digest != file_digest(pdf_path):
+                    return None
+                # Touched but unchanged: remember the new mtime so the next
+                # run can skip hashing again.
+                _update_header(path, _HEADER.pack(MAGIC, digest, stat.st_mtime, size, count))
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, struct.error):
+        return None
+    return LawList(buffer, count)
+
+
+def save(pdf_path, laws):
+    """Writes the cache file for `pdf_path`; failures only cost the next run a re-parse."""
+    stat = os.stat(pdf_path)
+    encoded = [law.encode("utf-8") for law in laws]
+    offsets = [0]
+    for line in encoded:
+        offsets.append(offsets[-1] + len(line))
+
+    path = cache_path(pdf_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, file_digest(pdf_path), stat.st_mtime, stat.st_size, len(encoded)))
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            f.write(b"".join(encoded))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write law cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
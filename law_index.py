@@ -0,0 +1,77 @@
+"""Lexical retrieval over law passages.
+
+`LawIndex` is a BM25 index built once from the output of
+`load_laws_from_pdf`. Postings are stored as flat NumPy arrays (one slice
+per term, with the BM25 weight of every posting precomputed), so scoring a
+decision is a single weighted bincount over the postings of its terms.
+"""
+import re
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+    a an and any are as at be been by for from has have if in into is it its
+    no not of on or shall should such that the their them then there these
+    this those to was were will with without which who whom may must all
+""".split())
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LawIndex:
+    def __init__(self, laws, k1=1.5, b=0.75):
+        self.laws = laws
+        n_docs = len(laws)
+        self._vocab = {}
+        term_ids = []
+        doc_ids = []
+        lengths = np.zeros(n_docs)
+        for doc, law in enumerate(laws):
+            tokens = tokenize(law)
+            lengths[doc] = len(tokens)
+            for token in tokens:
+                term_ids.append(self._vocab.setdefault(token, len(self._vocab)))
+                doc_ids.append(doc)
+
+        # Sorting (term, doc) pairs groups each term's postings together and
+        # np.unique's counts give the term frequency within each law.
+        pairs = np.asarray(term_ids, dtype=np.int64) * max(n_docs, 1) + np.asarray(doc_ids, dtype=np.int64)
+        pairs, term_freqs = np.unique(pairs, return_counts=True)
+        terms = pairs // max(n_docs, 1)
+        self._docs = pairs % max(n_docs, 1)
+        self._offsets = np.searchsorted(terms, np.arange(len(self._vocab) + 1))
+
+        doc_freqs = np.diff(self._offsets)
+        idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        avg_length = lengths.mean() if n_docs and lengths.mean() > 0 else 1.0
+        length_norm = k1 * (1 - b + b * lengths / avg_length)
+        self._weights = idf[terms] * term_freqs * (k1 + 1) / (term_freqs + length_norm[self._docs])
+
+    def __len__(self):
+        return len(self.laws)
+
+    def scores(self, query):
+        """Returns the BM25 score of every law against `query`."""
+        term_ids = {self._vocab[token] for token in tokenize(query) if token in self._vocab}
+        if not term_ids:
+            return np.zeros(len(self.laws))
+        postings = np.concatenate([
+            np.arange(self._offsets[term], self._offsets[term + 1]) for term in term_ids
+        ])
+        return np.bincount(self._docs[postings], weights=self._weights[postings], minlength=len(self.laws))
+
+    def top_k(self, query, k=25, min_score=0.0):
+        """Returns [(law_index, score)] for the best `k` laws scoring above `min_score`, best first."""
+        if k <= 0:
+            return []
+        scores = self.scores(query)
+        candidates = np.flatnonzero((scores > min_score) & (scores > 0))
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in candidates]
@@ -0,0 +1,163 @@
+"""Deferred imports for the heavy SDKs used by the tools.
+
+`lazy_import("fitz")` returns a stand-in that only imports the real module
+the first time one of its attributes is used, so a tool that never touches
+the PDF parser or the OAuth stack never pays for loading them.
+
+Every deferred import is timed. Setting NEONET_IMPORT_REPORT=1 additionally
+installs a meta path hook that records the cost of each module loaded along
+the way (self and cumulative time, like `python -X importtime`) and prints
+`print_import_report()` at exit, checked against IMPORT_BUDGET_MS.
+"""
+import atexit
+import importlib
+import os
+import sys
+import threading
+import time
+
+IMPORT_BUDGET_MS = float(os.getenv("NEONET_IMPORT_BUDGET_MS", "1500"))
+
+_lock = threading.RLock()
+_lazy_import_times = {}
+
+
+def timed_import(name):
+    """Imports a module by name and records how long the first load took."""
+    if name in sys.modules:
+        return sys.modules[name]
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    _lazy_import_times[name] = (time.perf_counter() - started) * 1000
+    return module
+
+
+class LazyModule:
+    """Placeholder for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    self._module = timed_import(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+class _TimedLoader:
+    """Wraps a module loader so the time spent executing the module is recorded."""
+
+    def __init__(self, loader, fullname, timer):
+        self._loader = loader
+        self._fullname = fullname
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer.enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.leave(self._fullname, (time.perf_counter() - started) * 1000)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class ImportTimer:
+    """Meta path hook recording (module, self ms, cumulative ms) for every import."""
+
+    def __init__(self):
+        self.records = []
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "searching", False):
+            return None
+        self._local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.searching = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+    def _child_ms(self):
+        """Per-thread stack of time spent in nested imports, one entry per module being executed."""
+        stack = getattr(self._local, "child_ms", None)
+        if stack is None:
+            stack = self._local.child_ms = []
+        return stack
+
+    def enter(self):
+        self._child_ms().append(0.0)
+
+    def leave(self, fullname, cumulative_ms):
+        child_ms = self._child_ms()
+        children_ms = child_ms.pop()
+        if child_ms:
+            child_ms[-1] += cumulative_ms
+        self.records.append((fullname, cumulative_ms - children_ms, cumulative_ms))
+
+
+_import_timer = None
+
+
+def enable_import_timing():
+    """Starts recording per-module import cost for everything imported from now on."""
+    global _import_timer
+    with _lock:
+        if _import_timer is None:
+            _import_timer = ImportTimer()
+            sys.meta_path.insert(0, _import_timer)
+    return _import_timer
+
+
+def import_costs():
+    """Returns {module: milliseconds} for the deferred imports done so far."""
+    return dict(_lazy_import_times)
+
+
+def print_import_report(budget_ms=IMPORT_BUDGET_MS, limit=15):
+    total_ms = sum(_lazy_import_times.values())
+    print(f"\nImport time report (budget {budget_ms:.0f} ms)")
+    for name, ms in sorted(_lazy_import_times.items(), key=lambda item: -item[1]):
+        print(f"  {ms:9.1f} ms  {name}")
+    if _import_timer is not None and _import_timer.records:
+        print("  Slowest modules (self / cumulative):")
+        slowest = sorted(_import_timer.records, key=lambda record: -record[1])[:limit]
+        for name, self_ms, cumulative_ms in slowest:
+            print(f"  {self_ms:9.1f} ms / {cumulative_ms:9.1f} ms  {name}")
+    status = "within budget" if total_ms <= budget_ms else "OVER BUDGET"
+    print(f"  Total deferred imports: {total_ms:.1f} ms ({status})")
+    return total_ms <= budget_ms
+
+
+if os.getenv("NEONET_IMPORT_REPORT") == "1":
+    enable_import_timing()
+    atexit.register(print_import_report)
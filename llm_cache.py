@@ -0,0 +1,188 @@
+"""Disk-backed cache for Gemini responses.
+
+Entries live in a small SQLite database keyed on a hash of the model name,
+the whitespace-normalised prompt and the generation config. Each tool has
+its own time-to-live (TOOL_TTLS), the database is kept under a size limit
+by evicting the least recently used entries, and hit/miss counters are kept
+per tool.
+
+    NEONET_CACHE_PATH    database file (default llm_cache.sqlite)
+    NEONET_CACHE_MAX_MB  size limit before LRU eviction (default 50)
+    NEONET_CACHE_BYPASS  set to 1 to always call the model (results are
+                         still stored, so this also refreshes the cache)
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+DEFAULT_TTL = DAY
+TOOL_TTLS = {
+    "people_search": 7 * DAY,
+    "market_insights": 12 * HOUR,
+    "surveys_investors": 7 * DAY,
+    "financial_advisor": 3 * DAY,
+    "marketing": DAY,
+    "market_analysis": 3 * DAY,
+    "legal_check": 30 * DAY,
+    "calendar": HOUR,
+}
+
+_WHITESPACE = re.compile(r"[ \t]+")
+
+
+def normalize_prompt(contents):
+    """Strips indentation and repeated spaces so cosmetic prompt edits still hit."""
+    if isinstance(contents, str):
+        lines = (_WHITESPACE.sub(" ", line).strip() for line in contents.strip().splitlines())
+        return "\n".join(lines)
+    if isinstance(contents, (list, tuple)):
+        return [normalize_prompt(part) for part in contents]
+    return str(contents)
+
+
+def _config_to_dict(config):
+    if config is None:
+        return None
+    if hasattr(config, "model_dump"):
+        return config.model_dump(exclude_none=True, mode="json")
+    if isinstance(config, dict):
+        return config
+    return str(config)
+
+
+def cache_key(model, contents, config=None):
+    payload = json.dumps(
+        [model, normalize_prompt(contents), _config_to_dict(config)],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or os.getenv("NEONET_CACHE_PATH", "llm_cache.sqlite")
+        self.max_bytes = max_bytes or int(float(os.getenv("NEONET_CACHE_MAX_MB", "50")) * 1024 * 1024)
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                tool TEXT,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+        """)
+
+    def get(self, key, tool=None):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses[tool] = self.misses.get(tool, 0) + 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits[tool] = self.hits.get(tool, 0) + 1
+            return row[0]
+
+    def put(self, key, response, tool=None, model=None, ttl=None):
+        if ttl is None:
+            ttl = TOOL_TTLS.get(tool, DEFAULT_TTL)
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, tool, model, response, size, now + ttl, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the limit so eviction does not run on every insert.
+        target = self.max_bytes * 0.9
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ).fetchall():
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self):
+        """Returns {tool: {"hits": n, "misses": n}} for this process."""
+        tools = set(self.hits) | set(self.misses)
+        return {tool: {"hits": self.hits.get(tool, 0), "misses": self.misses.get(tool, 0)} for tool in tools}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def print_stats():
+    """Prints per-tool hit/miss counts, if the cache was used in this process."""
+    if _cache is None:
+        return
+    print("\nResponse cache (hits/misses):")
+    for tool, counts in sorted(_cache.stats().items(), key=lambda item: str(item[0])):
+        print(f"  {tool or 'untagged'}: {counts['hits']}/{counts['misses']}")
+
+
+def bypass_enabled():
+    return os.getenv("NEONET_CACHE_BYPASS") == "1"
+
+
+def cached_call(model, contents, config, tool, call, use_cache=True):
+    """Returns the cached text for this request, or runs `call()` and stores its text."""
+    cache = get_cache()
+    key = cache_key(model, contents, config)
+    if use_cache and not bypass_enabled():
+        cached = cache.get(key, tool)
+        if cached is not None:
+            return cached
+    text = call()
+    if text:
+        cache.put(key, text, tool=tool, model=model)
+    return text
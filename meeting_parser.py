@@ -0,0 +1,337 @@
+"""Rule-based parsing of meeting requests for the calendar tool (12.py).
+
+`parse()` understands the way most requests are written:
+
+    dates     2026-11-02, "2 November", "Nov 2nd 2026", today, tomorrow,
+              "day after tomorrow", weekdays ("on friday", "next friday"),
+              "next week", "the 15th"
+    times     14:00, 2pm, 2:30 p.m., noon
+    people    email addresses
+    subject   the text after "about", "to discuss", "regarding", "re:" ...
+
+and returns the same dict the model is asked for. Anything it is not sure
+about (no time, a bare "at 3", two different dates, no subject) returns
+None so the caller can ask Gemini instead. `record()` and `print_stats()`
+keep track of how often the rules were enough.
+
+`rank_events()` does the same for removals: it scores events against a
+request like "cancel the investor call on friday" by summary similarity
+and the dates mentioned, so only a short list of candidates (or none, when
+one event clearly matches) has to go to the model.
+"""
+import datetime
+import difflib
+import re
+import threading
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+        ("may",), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+        ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ], start=1)
+    for name in names
+}
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY = "|".join(WEEKDAYS)
+
+ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?(?:\s+of)?\s+({_MONTH})\.?(?:,?\s+(\d{{4}}))?\b")
+MONTH_DAY = re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b")
+ORDINAL_DAY = re.compile(r"\bthe\s+(\d{1,2})(?:st|nd|rd|th)\b")
+RELATIVE_DAY = re.compile(r"\b(day after tomorrow|tomorrow|today|next week)\b")
+WEEKDAY = re.compile(rf"\b(?:(next|this)\s+)?({_WEEKDAY})\b")
+
+CLOCK_TIME = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\s*(am|pm|a\.m\.|p\.m\.)?(?![\w.])")
+HOUR_TIME = re.compile(r"\b(1[0-2]|0?[1-9])\s*(am|pm|a\.m\.|p\.m\.)(?![\w.])")
+NOON = re.compile(r"\b(noon|midday)\b")
+BARE_HOUR = re.compile(r"\bat\s+\d{1,2}\b(?!\s*[:.]?\d)")
+
+FREE_SLOT_REQUEST = re.compile(
+    r"\b(?:free|open|available)\s+(?:time\s+)?slots?\b"
+    r"|\bfind\s+(?:a\s+|some\s+)?(?:time|slot)\b"
+    r"|\bwhen\s+(?:am\s+i|are\s+we|are\s+they|is\s+\S+|are\s+\S+)\s+(?:all\s+|both\s+)?(?:free|available)\b"
+    r"|\b(?:check|show|what(?:'s| is))\s+(?:my\s+|our\s+|their\s+|the\s+)?availability\b"
+)
+SECONDS = re.compile(r"^(\d{1,2}:\d{2}):\d{2}$")
+
+SUBJECT = re.compile(r"\b(?:to talk about|to discuss|discussing|about|regarding|re:|to review)\s+")
+# Words left dangling at the end of a subject once dates and times are cut out.
+_TRAILING = re.compile(r"(?:\s+(?:on|at|with|and|by|from|for|the|this|next|of|in))+\s*$")
+_MARK = "\x00"
+
+
+def _valid_date(year, month, day):
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _next_day_of_month(day, today):
+    """The next date (today included) that falls on this day of the month."""
+    year, month = today.year, today.month
+    for _ in range(12):
+        date = _valid_date(year, month, day)
+        if date and date >= today:
+            return date
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+
+def _with_year(month, day, year, today):
+    if year:
+        return _valid_date(int(year), month, day)
+    date = _valid_date(today.year, month, day)
+    if date and date < today:
+        date = _valid_date(today.year + 1, month, day)
+    return date
+
+
+def _weekday_date(qualifier, weekday, today):
+    """
+    "friday"/"this friday" is the coming Friday (a week from today if today
+    is Friday); "next friday" is the Friday of next week.
+    """
+    target = WEEKDAYS.index(weekday)
+    if qualifier == "next":
+        next_monday = today + datetime.timedelta(days=7 - today.weekday())
+        return next_monday + datetime.timedelta(days=target)
+    return today + datetime.timedelta(days=(target - today.weekday() - 1) % 7 + 1)
+
+
+def _find_dates(text, today):
+    """Returns ({dates found}, [(start, end)] spans they came from)."""
+    dates = set()
+    spans = []
+
+    def add(match, date):
+        spans.append(match.span())
+        dates.add(date)
+
+    for m in ISO_DATE.finditer(text):
+        add(m, _valid_date(int(m.group(1)), int(m.group(2)), int(m.group(3))))
+    for m in DAY_MONTH.finditer(text):
+        add(m, _with_year(MONTHS[m.group(2)], int(m.group(1)), m.group(3), today))
+    for m in MONTH_DAY.finditer(text):
+        if not any(start <= m.start() < end for start, end in spans):
+            add(m, _with_year(MONTHS[m.group(1)], int(m.group(2)), m.group(3), today))
+    for m in ORDINAL_DAY.finditer(text):
+        if not any(start <= m.start() < end for start, end in spans):
+            add(m, _next_day_of_month(int(m.group(1)), today))
+    for m in RELATIVE_DAY.finditer(text):
+        offsets = {"today": 0, "tomorrow": 1, "day after tomorrow": 2, "next week": 7}
+        add(m, today + datetime.timedelta(days=offsets[m.group(1)]))
+    for m in WEEKDAY.finditer(text):
+        add(m, _weekday_date(m.group(1), m.group(2), today))
+    return dates, spans
+
+
+def _to_24h(hour, minute, meridiem):
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.startswith("p") else 0)
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _find_times(text):
+    times = set()
+    spans = []
+    for m in CLOCK_TIME.finditer(text):
+        spans.append(m.span())
+        times.add(_to_24h(int(m.group(1)), int(m.group(2)), m.group(3)))
+    text = _mask(text, spans)
+    for m in HOUR_TIME.finditer(text):
+        spans.append(m.span())
+        times.add(_to_24h(int(m.group(1)), 0, m.group(2)))
+    for m in NOON.finditer(text):
+        spans.append(m.span())
+        times.add("12:00")
+    return times, spans
+
+
+def _mask(text, spans):
+    chars = list(text)
+    for start, end in spans:
+        chars[start:end] = [_MARK] * (end - start)
+    return "".join(chars)
+
+
+def _subject(masked):
+    match = SUBJECT.search(masked)
+    if not match:
+        return None
+    subject = masked[match.end():].split(_MARK)[0]
+    subject = _TRAILING.sub("", subject.strip(" \t.,;:!?")).strip(" \t.,;:!?")
+    subject = re.sub(r"^(?:the|a|an|our|my)\s+", "", subject)
+    if not subject:
+        return None
+    return subject[0].upper() + subject[1:]
+
+
+def is_free_slot_request(text):
+    """True for requests to find free time ("find a free slot", "when are we all free"),
+    not for any text that happens to mention availability."""
+    return bool(FREE_SLOT_REQUEST.search(text.lower()))
+
+
+def normalize_time(value):
+    """"HH:MM" for a time written as "15:00", "15:00:00", "3pm", "3:30 p.m." or "noon"; None otherwise."""
+    if not value:
+        return None
+    text = SECONDS.sub(r"\1", str(value).strip().lower())
+    times, spans = _find_times(text)
+    if len(times) != 1 or _mask(text, spans).strip(_MARK + " "):
+        return None
+    return times.pop()
+
+
+def normalize_date(value):
+    """The ISO date (YYYY-MM-DD) in `value`, or None if it is not a valid one."""
+    try:
+        return datetime.date.fromisoformat(str(value).strip()).isoformat()
+    except ValueError:
+        return None
+
+
+def parse(text, today=None):
+    """
+    Returns {"date", "time", "subject", "participants"} for a meeting
+    request, or None when the request needs the model to interpret it.
+    """
+    today = today or datetime.date.today()
+    lowered = text.lower()
+    participants = EMAIL.findall(lowered)
+    email_spans = [m.span() for m in EMAIL.finditer(lowered)]
+    without_emails = _mask(lowered, email_spans)
+
+    dates, date_spans = _find_dates(without_emails, today)
+    if len(dates) != 1 or None in dates:
+        return None
+    without_dates = _mask(without_emails, date_spans)
+
+    times, time_spans = _find_times(without_dates)
+    if len(times) != 1:
+        return None
+    masked = _mask(without_dates, time_spans)
+    if BARE_HOUR.search(masked):
+        return None
+
+    subject = _subject(masked)
+    if not subject:
+        return None
+    return {
+        "date": dates.pop().isoformat(),
+        "time": times.pop(),
+        "subject": subject,
+        "participants": participants,
+    }
+
+
+# Words of a removal request that say nothing about which event is meant.
+COMMAND_WORDS = frozenset("""
+    remove delete cancel drop clear please my the a an on at for with of
+    meeting meetings event events call appointment scheduled calendar from
+    this that i want to can you
+""".split())
+_WORD = re.compile(r"[a-z0-9]+")
+MIN_SCORE = 0.25
+CONFIDENT_SCORE = 0.6
+CONFIDENT_MARGIN = 0.3
+
+
+def _event_date(event):
+    start = event.get("start", {})
+    return start.get("dateTime", start.get("date", ""))[:10]
+
+
+def _summary_score(words, phrase, summary):
+    summary = summary.lower()
+    summary_words = set(_WORD.findall(summary))
+    if not words or not summary_words:
+        return 0.0
+    overlap = len(words & summary_words) / len(words)
+    return 0.6 * overlap + 0.4 * difflib.SequenceMatcher(None, phrase, summary).ratio()
+
+
+def rank_events(text, events, today=None, limit=5):
+    """
+    Scores `events` against a removal request and returns (shortlist, confident).
+
+    The shortlist is up to `limit` (score, event) pairs, best first. Events on
+    a date mentioned in the request get a bonus and, when dates are given,
+    events on other days are left out, as are summaries that barely resemble
+    the request. `confident` is True when the first
+    candidate clearly beats the rest.
+    """
+    today = today or datetime.date.today()
+    lowered = text.lower()
+    dates, date_spans = _find_dates(_mask(lowered, [m.span() for m in EMAIL.finditer(lowered)]), today)
+    dates.discard(None)
+    hinted = {date.isoformat() for date in dates}
+    words = [w for w in _WORD.findall(_mask(lowered, date_spans).replace(_MARK, " ")) if w not in COMMAND_WORDS]
+    phrase = " ".join(words)
+
+    scored = []
+    for event in events:
+        if hinted and _event_date(event) not in hinted:
+            continue
+        score = _summary_score(set(words), phrase, event.get("summary", ""))
+        if words and score < MIN_SCORE:
+            continue
+        if hinted:
+            score += 0.5
+        scored.append((score, event))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    shortlist = scored[:limit]
+    if not shortlist:
+        return [], False
+
+    if not words:
+        # Only a date was given: that is enough if a single event is on it.
+        return shortlist, bool(hinted) and len(scored) == 1
+    best = shortlist[0][0] - (0.5 if hinted else 0.0)
+    runner_up = shortlist[1][0] if len(shortlist) > 1 else None
+    confident = best >= CONFIDENT_SCORE and (runner_up is None or shortlist[0][0] - runner_up >= CONFIDENT_MARGIN)
+    return shortlist, confident
+
+
+def from_model_reply(data):
+    """
+    Turns the model's structured answer into the meeting dict, or the
+    string "no meeting request found".
+    """
+    if data.get("no_meeting"):
+        return "no meeting request found"
+    return {
+        "date": data.get("date"),
+        "time": data.get("time"),
+        "subject": data.get("subject"),
+        "participants": [p.strip() for p in data.get("participants") or [] if EMAIL.fullmatch(p.strip())],
+    }
+
+
+_counts = {"rules": 0, "model": 0}
+_counts_lock = threading.Lock()
+
+
+def record(source):
+    """Counts a parsed request as handled by "rules" or by the "model"."""
+    with _counts_lock:
+        _counts[source] += 1
+
+
+def hit_rate():
+    total = _counts["rules"] + _counts["model"]
+    return _counts["rules"] / total if total else None
+
+
+def print_stats():
+    """Prints how many requests the rules handled, if any were parsed in this process."""
+    total = _counts["rules"] + _counts["model"]
+    if total:
+        print(f"Meeting requests parsed locally: {_counts['rules']}/{total} ({hit_rate():.0%}); "
+              f"sent to Gemini: {_counts['model']}")
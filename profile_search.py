@@ -0,0 +1,169 @@
+"""Google Custom Search layer for the people search tool (1.py).
+
+The model's free-text recommendations are turned into a few short queries
+(`derive_queries`), and every (query, page) pair is fetched concurrently
+over one pooled `requests.Session`. Rate limits and server errors are
+retried with backoff (honouring Retry-After), every request has a timeout,
+and results are de-duplicated by profile URL.
+
+Each page is one Custom Search API call, so a run costs up to MAX_QUERIES x
+SEARCH_PAGES calls (20 with the defaults, against 1 before) from the daily
+quota, less any pages the profile store fetched recently.
+
+    CUSTOM_SEARCH_URL   endpoint (default Google's; point it at a local stub to test)
+    SEARCH_PAGES        result pages per query, 10 results each (default 5)
+    SEARCH_WORKERS      pages fetched at once (default 8)
+    SEARCH_TIMEOUT      seconds to wait for a page (default 10)
+"""
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+from lazy_imports import lazy_import
+
+requests = lazy_import("requests")
+requests_adapters = lazy_import("requests.adapters")
+urllib3_retry = lazy_import("urllib3.util.retry")
+
+CUSTOM_SEARCH_URL = os.getenv("CUSTOM_SEARCH_URL", "https://www.googleapis.com/customsearch/v1")
+SEARCH_PAGES = int(os.getenv("SEARCH_PAGES", "5"))
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "8"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "10"))
+
+PAGE_SIZE = 10          # the API's maximum per request
+MAX_RESULTS = 100       # the API never returns results past start=91
+MAX_QUERIES = 4
+MAX_QUERY_WORDS = 10
+SITE_FILTER = "site:linkedin.com/in"
+
+_BULLET = re.compile(r"^\s*(?:(?:[-*•]+|\d+[.)])\s*)+")
+_MARKUP = re.compile(r"[*_`#>]+")
+_LABEL = re.compile(r"^[^:\"]{1,40}:\s*")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def derive_queries(recommendations, role, max_queries=MAX_QUERIES):
+    """
+    Turns the model's recommendations into up to `max_queries` short search
+    queries, one per useful line, each restricted to LinkedIn profiles.
+    """
+    queries = []
+    for line in recommendations.splitlines():
+        line = _MARKUP.sub("", _BULLET.sub("", line)).strip()
+        if not line or line.endswith(":"):
+            continue
+        line = _LABEL.sub("", line).strip()
+        words = line.split()
+        if len(words) < 2:
+            continue
+        query = " ".join(words[:MAX_QUERY_WORDS])
+        if query.lower() not in (q.lower() for q in queries):
+            queries.append(query)
+        if len(queries) == max_queries:
+            break
+    if not queries:
+        queries = [role]
+    return [f"{SITE_FILTER} {query}" for query in queries]
+
+
+def get_session():
+    """The shared session: pooled keep-alive connections with retry/backoff on 429 and 5xx."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = urllib3_retry.Retry(
+                    total=4,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = requests_adapters.HTTPAdapter(
+                    pool_connections=4, pool_maxsize=max(SEARCH_WORKERS, 1), max_retries=retry
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def profile_key(url):
+    """Normalises a profile URL so country subdomains, query strings and trailing slashes do not create duplicates."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.endswith(".linkedin.com"):
+        host = "linkedin.com"
+    return host + parts.path.rstrip("/").lower()
+
+
+def fetch_page(query, start, api_key, engine_id, timeout=SEARCH_TIMEOUT):
+    """Returns the result items of one page (`start` is 1-based)."""
+    response = get_session().get(
+        CUSTOM_SEARCH_URL,
+        params={"key": api_key, "cx": engine_id, "q": query, "start": start, "num": PAGE_SIZE},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    return response.json().get("items", [])
+
+
+def search_profiles(queries, pages=SEARCH_PAGES, workers=SEARCH_WORKERS, timeout=SEARCH_TIMEOUT, store=None):
+    """
+    Fetches `pages` pages for every query concurrently and returns the unique
+    results, in query and page order, as dicts with title, link, snippet and
+    query. Pages that fail after retries are reported and skipped.
+
+    With a `profile_store.ProfileStore`, pages it fetched recently are not
+    requested again, and new results and pages are saved to it.
+    """
+    load_dotenv("auth.env")
+    api_key = os.getenv("CUSTOM_SEARCH_API_KEY")
+    engine_id = os.getenv("SEARCH_ENGINE_ID")
+    starts = range(1, min(pages * PAGE_SIZE, MAX_RESULTS), PAGE_SIZE)
+    jobs = []
+    for query in queries:
+        fresh = store.fresh_pages(query) if store is not None else set()
+        jobs.extend((query, start) for start in starts if start not in fresh)
+    if not jobs:
+        return []
+
+    def run(job):
+        try:
+            return fetch_page(job[0], job[1], api_key, engine_id, timeout)
+        except Exception as e:
+            print(f"Warning: search page {job[1]} for '{job[0]}' failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pages_items = list(pool.map(run, jobs))
+
+    seen = set()
+    profiles = []
+    for (query, start), items in zip(jobs, pages_items):
+        if items is None:
+            continue
+        if store is not None:
+            store.mark_page(query, start)
+        for item in items:
+            link = item.get("link")
+            if not link or profile_key(link) in seen:
+                continue
+            seen.add(profile_key(link))
+            profiles.append({
+                "title": item.get("title", ""),
+                "link": link,
+                "snippet": item.get("snippet", ""),
+                "query": query,
+            })
+    if store is not None:
+        store.add(profiles, profile_key)
+    return profiles
@@ -0,0 +1,175 @@
+"""Local store of LinkedIn profiles found by the people search tool (1.py).
+
+Every search result is kept in SQLite with a full-text (FTS5) index over
+its title and snippet, together with the (query, page) pairs that were
+fetched, so a repeated search only asks the API for pages it has not seen
+recently. `rank()` pulls the profiles found by the current search's queries
+that share words with the hiring requirements through the FTS index and
+orders them by TF-IDF cosine similarity, computed with NumPy.
+
+    PROFILE_STORE_PATH       database file (default profiles.sqlite)
+    PROFILE_PAGE_TTL_DAYS    days before a fetched page is fetched again (default 7)
+    PROFILE_RESULT_LIMIT     most profiles returned by rank() (default 100, 0 for all)
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+DAY = 24 * 3600
+PAGE_TTL = float(os.getenv("PROFILE_PAGE_TTL_DAYS", "7")) * DAY
+RESULT_LIMIT = int(os.getenv("PROFILE_RESULT_LIMIT", "100"))
+CANDIDATE_LIMIT = 2000
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it of on or that the to
+    with you your we our i me my any some need needs should must will can
+    linkedin profile profiles site com www https http
+""".split())
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def tfidf_scores(query, documents):
+    """Cosine similarity between `query` and each document, with TF-IDF weights over the documents."""
+    n_docs = len(documents)
+    vocab = {}
+    term_ids = []
+    doc_ids = []
+    for doc, text in enumerate(documents):
+        for token in tokenize(text):
+            term_ids.append(vocab.setdefault(token, len(vocab)))
+            doc_ids.append(doc)
+    query_terms = [vocab[token] for token in tokenize(query) if token in vocab]
+    if not query_terms:
+        return np.zeros(n_docs)
+
+    # One entry per (term, document) pair, as in law_index.LawIndex.
+    pairs = np.asarray(term_ids, dtype=np.int64) * n_docs + np.asarray(doc_ids, dtype=np.int64)
+    pairs, term_freqs = np.unique(pairs, return_counts=True)
+    terms = pairs // n_docs
+    docs = pairs % n_docs
+    idf = np.log((1 + n_docs) / (1 + np.bincount(terms, minlength=len(vocab)))) + 1
+    weights = term_freqs * idf[terms]
+    doc_norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=n_docs))
+    query_weights = np.bincount(query_terms, minlength=len(vocab)) * idf
+    dots = np.bincount(docs, weights=weights * query_weights[terms], minlength=n_docs)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = dots / (doc_norms * np.linalg.norm(query_weights))
+    return np.nan_to_num(scores)
+
+
+class ProfileStore:
+    def __init__(self, path=None):
+        self.path = path or os.getenv("PROFILE_STORE_PATH", "profiles.sqlite")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                key TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                link TEXT NOT NULL,
+                snippet TEXT NOT NULL,
+                query TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS profile_queries (
+                key TEXT NOT NULL,
+                query TEXT NOT NULL,
+                PRIMARY KEY (key, query)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS profiles_fts USING fts5(key UNINDEXED, title, snippet);
+            CREATE TABLE IF NOT EXISTS pages (
+                query TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (query, start)
+            );
+            INSERT OR IGNORE INTO profile_queries SELECT key, query FROM profiles WHERE query IS NOT NULL;
+        """)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def add(self, profiles, key):
+        """Stores search results; `key(link)` identifies duplicates. Returns how many were new."""
+        now = time.time()
+        added = 0
+        with self._lock:
+            for profile in profiles:
+                profile_key = key(profile["link"])
+                exists = self._db.execute("SELECT 1 FROM profiles WHERE key = ?", (profile_key,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?)",
+                    (profile_key, profile["title"], profile["link"], profile["snippet"], profile.get("query"), now),
+                )
+                if profile.get("query"):
+                    self._db.execute("INSERT OR IGNORE INTO profile_queries VALUES (?, ?)", (profile_key, profile["query"]))
+                self._db.execute("DELETE FROM profiles_fts WHERE key = ?", (profile_key,))
+                self._db.execute(
+                    "INSERT INTO profiles_fts VALUES (?, ?, ?)",
+                    (profile_key, profile["title"], profile["snippet"]),
+                )
+                added += not exists
+            self._db.commit()
+        return added
+
+    def fresh_pages(self, query, max_age=PAGE_TTL):
+        """Start offsets of `query` fetched within `max_age` seconds."""
+        rows = self._db.execute(
+            "SELECT start FROM pages WHERE query = ? AND fetched_at >= ?", (query, time.time() - max_age)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_page(self, query, start):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (query, start, time.time()))
+            self._db.commit()
+
+    def matching(self, text, queries=None, limit=CANDIDATE_LIMIT):
+        """
+        Profiles sharing at least one word with `text`, best BM25 match first.
+        With `queries`, only profiles found by one of those search queries.
+        """
+        terms = sorted(set(tokenize(text)))
+        if not terms or queries is not None and not queries:
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        where = ""
+        params = [match]
+        if queries is not None:
+            queries = list(dict.fromkeys(queries))
+            where = f" AND p.key IN (SELECT key FROM profile_queries WHERE query IN ({', '.join('?' * len(queries))}))"
+            params.extend(queries)
+        rows = self._db.execute(
+            f"""
+            SELECT p.title, p.link, p.snippet, p.query
+            FROM profiles_fts f JOIN profiles p ON p.key = f.key
+            WHERE profiles_fts MATCH ?{where}
+            ORDER BY bm25(profiles_fts)
+            LIMIT ?
+            """,
+            (*params, limit),
+        ).fetchall()
+        return [{"title": t, "link": link, "snippet": s, "query": q} for t, link, s, q in rows]
+
+    def rank(self, requirements, queries=None, limit=RESULT_LIMIT):
+        """
+        Returns the stored profiles most similar to `requirements`, with a
+        "score", at most `limit` of them (all if `limit` is 0 or None). With
+        `queries`, only profiles found by those search queries are ranked.
+        """
+        candidates = self.matching(requirements, queries)
+        if not candidates:
+            return []
+        scores = tfidf_scores(requirements, [f"{c['title']} {c['snippet']}" for c in candidates])
+        order = np.argsort(-scores, kind="stable")[:limit or None]
+        return [dict(candidates[i], score=float(scores[i])) for i in order if scores[i] > 0]
@@ -0,0 +1,336 @@
+"""Rate limiting, retries and quota accounting for Gemini calls.
+
+Every request made through gemini_client goes through `call()` (or
+`stream()`), which, per model:
+
+- waits for a token bucket of requests per minute and one of tokens per
+  minute, so concurrent tools queue up just below the quota instead of
+  running into 429s;
+- retries 429, 5xx, timeouts and dropped connections with jittered
+  exponential backoff, waiting at least as long as the server's retry-after;
+- opens a circuit breaker after GEMINI_BREAKER_FAILURES calls in a row have
+  failed with a server error, timeout or dropped connection, so new calls
+  fail at once for GEMINI_BREAKER_COOLDOWN seconds instead of piling onto a
+  model that is down. Quota errors (429) never open it: they empty the
+  model's request bucket, so every caller slows down until it refills.
+
+Requests, tokens, retries and the remaining budget are kept in a ledger per
+model (`quota()`, `print_stats()`).
+
+    GEMINI_RPM               requests per minute per model (default 15)
+    GEMINI_TPM               tokens per minute per model (default 1000000)
+    GEMINI_LIMITS            per-model overrides, e.g.
+                             "gemini-1.0-pro=2/32000,gemini-2.0-flash=15/1000000"
+    GEMINI_MAX_RETRIES       retries per call (default 5)
+    GEMINI_BACKOFF_SECONDS   first backoff delay (default 1, doubled per retry)
+    GEMINI_BACKOFF_MAX       longest backoff delay in seconds (default 60)
+    GEMINI_BREAKER_FAILURES  consecutive failed calls that open the breaker (default 5)
+    GEMINI_BREAKER_COOLDOWN  seconds the breaker stays open (default 30)
+"""
+import os
+import random
+import re
+import threading
+import time
+
+DEFAULT_RPM = float(os.getenv("GEMINI_RPM", "15"))
+DEFAULT_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+BACKOFF_SECONDS = float(os.getenv("GEMINI_BACKOFF_SECONDS", "1"))
+BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "60"))
+BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = ("Timeout", "ConnectError", "ConnectionError", "RemoteProtocolError", "ReadError")
+_SECONDS = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*s?\s*$")
+
+
+class CircuitOpenError(RuntimeError):
+    """The model failed repeatedly and is not being called until its cooldown ends."""
+
+
+def parse_limits(text):
+    """Parses GEMINI_LIMITS ("model=rpm/tpm,...") into {model: (rpm, tpm)}."""
+    limits = {}
+    for item in (text or "").split(","):
+        if "=" not in item:
+            continue
+        model, _, values = item.partition("=")
+        rpm, _, tpm = values.partition("/")
+        limits[model.strip()] = (float(rpm or DEFAULT_RPM), float(tpm or DEFAULT_TPM))
+    return limits
+
+
+MODEL_LIMITS = parse_limits(os.getenv("GEMINI_LIMITS"))
+
+
+def estimate_tokens(contents):
+    """Rough token count of a prompt (about four characters per token)."""
+    if isinstance(contents, str):
+        return len(contents) // 4 + 1
+    if isinstance(contents, (list, tuple)):
+        return sum(estimate_tokens(part) for part in contents)
+    return len(str(contents)) // 4 + 1
+
+
+def status_code(exc):
+    """HTTP status of an SDK or HTTP error, or None."""
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        try:
+            if value is not None:
+                return int(value)
+        except (TypeError, ValueError):
+            pass
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return int(value) if isinstance(value, int) else None
+
+
+def is_retryable(exc):
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status = status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return isinstance(exc, (TimeoutError, ConnectionError)) or any(name in type(exc).__name__ for name in _RETRYABLE_NAMES)
+
+
+def trips_breaker(exc):
+    """True for failures that suggest the model is down rather than over quota."""
+    return is_retryable(exc) and status_code(exc) != 429
+
+
+def retry_after(exc):
+    """Seconds the server asked us to wait (Retry-After header or RetryInfo), or None."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            match = _SECONDS.match(str(headers.get("retry-after") or ""))
+        except Exception:
+            match = None
+        if match:
+            return float(match.group(1))
+    details = getattr(exc, "details", None)
+    if isinstance(details, dict):
+        error = details.get("error")
+        details = (error if isinstance(error, dict) else details).get("details")
+    for detail in details if isinstance(details, list) else []:
+        if isinstance(detail, dict) and "retryDelay" in detail:
+            match = _SECONDS.match(str(detail["retryDelay"]))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt, minimum=None):
+    """Full-jitter exponential delay for retry `attempt` (0-based), at least `minimum`."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_SECONDS * 2 ** attempt))
+    return max(delay, minimum or 0)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, holding at most one minute's worth."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        """Takes `amount` units and returns how long to wait before using them."""
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level -= amount
+            return -self.level / self.rate if self.level < 0 else 0.0
+
+    def adjust(self, amount):
+        """Takes (or, if negative, gives back) units without waiting, e.g. once real usage is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level = min(self.capacity, self.level - amount)
+
+    def drain(self):
+        """Empties the bucket, so the next reservations wait for it to refill."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level = min(self.level, 0.0)
+
+    def remaining(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self.level)
+
+
+class ModelLimiter:
+    """Buckets, circuit breaker and ledger for one model."""
+
+    def __init__(self, name, rpm, tpm):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.failures = 0
+        self.open_until = 0.0
+        self.ledger = {"requests": 0, "tokens": 0, "retries": 0, "failed": 0, "rejected": 0, "waited_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def count(self, field, amount=1):
+        with self._lock:
+            self.ledger[field] += amount
+
+    def breaker_wait(self):
+        return max(0.0, self.open_until - time.monotonic())
+
+    def acquire(self, estimated_tokens):
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            self.count("waited_seconds", wait)
+            time.sleep(wait)
+        self.count("requests")
+
+    def settle(self, estimated_tokens, used_tokens):
+        """Books the tokens a call really used against the estimate taken up front."""
+        if used_tokens is None:
+            used_tokens = estimated_tokens
+        else:
+            self.tokens.adjust(used_tokens - min(estimated_tokens, self.tokens.capacity))
+        self.count("tokens", used_tokens)
+
+    def succeeded(self):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+
+    def failed(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= BREAKER_FAILURES:
+                self.open_until = time.monotonic() + BREAKER_COOLDOWN
+
+    def snapshot(self):
+        with self._lock:
+            ledger = dict(self.ledger)
+        return {
+            **ledger,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "remaining_requests": int(self.requests.remaining()),
+            "remaining_tokens": int(self.tokens.remaining()),
+            "breaker_open_seconds": round(self.breaker_wait(), 1),
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model):
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            rpm, tpm = MODEL_LIMITS.get(model, (DEFAULT_RPM, DEFAULT_TPM))
+            limiter = _limiters[model] = ModelLimiter(model, rpm, tpm)
+    return limiter
+
+
+def total_tokens(response):
+    """Total tokens billed for a response, from its usage metadata (None if absent)."""
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None)
+
+
+def call(model, fn, estimated_tokens=0, usage=total_tokens):
+    """
+    Runs `fn()` for `model` within its rate limits, retrying transient
+    failures. `usage(result)` gives the tokens actually used, which replace
+    `estimated_tokens` in the token bucket and ledger (with `usage=None` the
+    caller settles them itself).
+    """
+    limiter = get_limiter(model)
+    wait = limiter.breaker_wait()
+    if wait > 0:
+        limiter.count("rejected")
+        raise CircuitOpenError(f"{model} failed {limiter.failures} calls in a row; not calling it for another {wait:.0f}s")
+    attempt = 0
+    while True:
+        limiter.acquire(estimated_tokens)
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_retryable(e):
+                limiter.count("failed")
+                raise
+            if not trips_breaker(e):
+                limiter.requests.drain()
+            if attempt >= MAX_RETRIES or limiter.breaker_wait() > 0:
+                if trips_breaker(e):
+                    limiter.failed()
+                limiter.count("failed")
+                raise
+            delay = backoff_delay(attempt, retry_after(e))
+            limiter.count("retries")
+            limiter.count("waited_seconds", delay)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        limiter.succeeded()
+        if usage:
+            limiter.settle(estimated_tokens, usage(result))
+        return result
+
+
+def stream(model, start, estimated_tokens=0):
+    """
+    Yields the chunks of the stream returned by `start()`. Opening the stream
+    (up to its first chunk) is limited and retried like `call()`; a failure
+    after chunks have been yielded is raised as is.
+    """
+    def first_chunk():
+        chunks = iter(start())
+        return chunks, next(chunks, None)
+
+    chunks, chunk = call(model, first_chunk, estimated_tokens, usage=None)
+    used = None
+    try:
+        while chunk is not None:
+            used = total_tokens(chunk) or used
+            yield chunk
+            chunk = next(chunks, None)
+    finally:
+        get_limiter(model).settle(estimated_tokens, used)
+
+
+def quota(model=None):
+    """Ledger and remaining per-minute budget for one model, or {model: ...} for all used so far."""
+    if model is not None:
+        return get_limiter(model).snapshot()
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+
+def print_stats():
+    """Prints per-model usage and remaining budget, if any Gemini call was made."""
+    usage = quota()
+    if not usage:
+        return
+    print("\nGemini quota:")
+    for model, q in sorted(usage.items()):
+        line = (f"  {model}: {q['requests']} requests, {q['tokens']} tokens, {q['retries']} retries, "
+                f"{q['failed']} failed, waited {q['waited_seconds']:.1f}s; "
+                f"{q['remaining_requests']}/{q['rpm']:.0f} requests and {q['remaining_tokens']}/{q['tpm']:.0f} tokens left this minute")
+        if q["rejected"] or q["breaker_open_seconds"]:
+            line += f"; circuit breaker rejected {q['rejected']} call(s)"
+        print(line)
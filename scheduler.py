@@ -0,0 +1,165 @@
+"""Free/busy lookups and slot finding for the calendar tool (12.py).
+
+`query_busy()` asks the Calendar free/busy endpoint when the owner and the
+attendees are busy. `BusyIndex` merges all of those blocks into one sorted
+list of disjoint intervals, so checking a slot is a binary search and
+finding free slots is a single walk over the busy blocks, however many
+months and attendees are involved. `working_windows()` turns working hours
+in each participant's time zone into the UTC windows where all of them are
+at work, and `BusyIndex.free_slots()` returns the earliest slots of a given
+length inside those windows.
+"""
+import bisect
+import datetime
+import zoneinfo
+
+UTC = datetime.timezone.utc
+# The free/busy endpoint takes at most 50 calendars per request and rejects
+# very long ranges, so bigger queries are split.
+FREEBUSY_MAX_CALENDARS = 50
+FREEBUSY_WINDOW_DAYS = 60
+
+
+def parse_time(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def query_busy(service, calendars, time_min, time_max):
+    """
+    Returns ([(start, end)] busy intervals as aware datetimes, {calendar: error})
+    for every calendar id or email in `calendars` between two aware datetimes.
+    """
+    busy = []
+    errors = {}
+    window = datetime.timedelta(days=FREEBUSY_WINDOW_DAYS)
+    window_start = time_min
+    while window_start < time_max:
+        window_end = min(window_start + window, time_max)
+        for i in range(0, len(calendars), FREEBUSY_MAX_CALENDARS):
+            body = {
+                "timeMin": window_start.astimezone(UTC).isoformat(),
+                "timeMax": window_end.astimezone(UTC).isoformat(),
+                "items": [{"id": calendar} for calendar in calendars[i:i + FREEBUSY_MAX_CALENDARS]],
+            }
+            response = service.freebusy().query(body=body).execute()
+            for calendar, info in response.get("calendars", {}).items():
+                if info.get("errors"):
+                    errors[calendar] = ", ".join(error.get("reason", "unknown") for error in info["errors"])
+                for block in info.get("busy", []):
+                    busy.append((parse_time(block["start"]), parse_time(block["end"])))
+        window_start = window_end
+    return busy, errors
+
+
+class BusyIndex:
+    """Busy time as sorted, merged, non-overlapping intervals (epoch seconds)."""
+
+    def __init__(self, intervals=()):
+        merged = []
+        for start, end in sorted((_ts(start), _ts(end)) for start, end in intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def conflicts(self, start, end):
+        """Busy intervals overlapping [start, end), as (start, end) UTC datetimes."""
+        start, end = _ts(start), _ts(end)
+        i = bisect.bisect_right(self.ends, start)
+        found = []
+        while i < len(self.starts) and self.starts[i] < end:
+            found.append((_dt(self.starts[i]), _dt(self.ends[i])))
+            i += 1
+        return found
+
+    def is_free(self, start, end):
+        start, end = _ts(start), _ts(end)
+        i = bisect.bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def free_slots(self, windows, duration, count=3, step_minutes=30):
+        """
+        Returns up to `count` (start, end) UTC datetimes of length `duration`
+        inside `windows` that overlap no busy interval, earliest first.
+        Slot starts are aligned to `step_minutes`.
+        """
+        length = duration.total_seconds()
+        step = step_minutes * 60
+        slots = []
+        for window_start, window_end in windows:
+            window_start, window_end = _ts(window_start), _ts(window_end)
+            candidate = _round_up(window_start, step)
+            while candidate + length <= window_end:
+                i = bisect.bisect_right(self.ends, candidate)
+                if i < len(self.starts) and self.starts[i] < candidate + length:
+                    # Jump past the busy block in the way.
+                    candidate = _round_up(self.ends[i], step)
+                    continue
+                slots.append((_dt(candidate), _dt(candidate + length)))
+                if len(slots) == count:
+                    return slots
+                candidate += step
+        return slots
+
+
+def working_windows(date_from, date_to, time_zones, work_start=datetime.time(9), work_end=datetime.time(18)):
+    """
+    UTC (start, end) windows between two dates (inclusive) when it is within
+    working hours in every time zone of `time_zones`, skipping weekends in
+    any of them.
+    """
+    windows = None
+    for name in dict.fromkeys(time_zones):
+        zone = zoneinfo.ZoneInfo(name)
+        zone_windows = []
+        # A day either side covers zones whose working day straddles the range.
+        day = date_from - datetime.timedelta(days=1)
+        while day <= date_to + datetime.timedelta(days=1):
+            if day.weekday() < 5:
+                start = datetime.datetime.combine(day, work_start, zone)
+                end = datetime.datetime.combine(day, work_end, zone)
+                zone_windows.append((_ts(start), _ts(end)))
+            day += datetime.timedelta(days=1)
+        windows = zone_windows if windows is None else _intersect(windows, zone_windows)
+
+    range_start = _ts(datetime.datetime.combine(date_from, datetime.time(0), UTC))
+    range_end = _ts(datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time(0), UTC))
+    return [
+        (_dt(max(start, range_start)), _dt(min(end, range_end)))
+        for start, end in windows or []
+        if end > range_start and start < range_end
+    ]
+
+
+def _intersect(a, b):
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _round_up(ts, step):
+    return -(-ts // step) * step
+
+
+def _ts(value):
+    return value.timestamp() if isinstance(value, datetime.datetime) else float(value)
+
+
+def _dt(ts):
+    return datetime.datetime.fromtimestamp(ts, UTC)
@@ -0,0 +1,165 @@
+"""JSON responses with a fixed shape for tasks whose answer a tool parses.
+
+Each task in SCHEMAS has a response schema that is sent with the request
+(`response_mime_type` JSON plus `response_schema`), so the model returns
+JSON of that shape instead of free text. `generate()` makes the call and
+validates the reply against the same schema; a reply that does not fit
+raises ParseError rather than being re-asked, and is dropped from the
+response cache so the next run asks again. Parsed and failed replies are
+counted per tool (`print_stats()`).
+"""
+import json
+import threading
+
+import gemini_client
+import llm_cache
+
+SCHEMAS = {
+    # 11.py: one entry per law checked.
+    "law_check": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "law": {"type": "STRING"},
+                "violated": {"type": "BOOLEAN"},
+                "explanation": {"type": "STRING"},
+            },
+            "required": ["law", "violated", "explanation"],
+        },
+    },
+    # 12.py: a meeting request, or no_meeting for anything else.
+    "meeting_request": {
+        "type": "OBJECT",
+        "properties": {
+            "no_meeting": {"type": "BOOLEAN"},
+            "date": {"type": "STRING", "nullable": True},
+            "time": {"type": "STRING", "nullable": True},
+            "subject": {"type": "STRING", "nullable": True},
+            "participants": {"type": "ARRAY", "items": {"type": "STRING"}},
+        },
+        "required": ["no_meeting"],
+    },
+    # 12.py: the event to delete, or null.
+    "event_choice": {
+        "type": "OBJECT",
+        "properties": {"event_id": {"type": "STRING", "nullable": True}},
+        "required": ["event_id"],
+    },
+    # 7.py
+    "hashtags": {"type": "ARRAY", "items": {"type": "STRING"}},
+    "marketing_batch": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "industry": {"type": "STRING"},
+                "hashtags": {"type": "ARRAY", "items": {"type": "STRING"}},
+                "recommendations": {"type": "STRING"},
+            },
+            "required": ["industry", "hashtags", "recommendations"],
+        },
+    },
+    # 1.py: the questions to ask about a role.
+    "headers": {"type": "ARRAY", "items": {"type": "STRING"}},
+}
+
+_PYTHON_TYPES = {
+    "STRING": str,
+    "BOOLEAN": bool,
+    "ARRAY": list,
+    "OBJECT": dict,
+}
+
+
+class ParseError(ValueError):
+    """The model's reply is not JSON of the expected shape."""
+
+
+def config(task):
+    return {"response_mime_type": "application/json", "response_schema": SCHEMAS[task]}
+
+
+def validate(value, schema, path="$"):
+    """Checks `value` against a (subset of the OpenAPI) schema; raises ParseError on the first mismatch."""
+    if value is None:
+        if schema.get("nullable"):
+            return
+        raise ParseError(f"{path} is null")
+    kind = schema["type"]
+    if kind in ("NUMBER", "INTEGER"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ParseError(f"{path} should be a number")
+        return
+    if not isinstance(value, _PYTHON_TYPES[kind]):
+        raise ParseError(f"{path} should be {kind.lower()}, got {type(value).__name__}")
+    if kind == "ARRAY":
+        for i, item in enumerate(value):
+            validate(item, schema["items"], f"{path}[{i}]")
+    elif kind == "OBJECT":
+        for key in schema.get("required", []):
+            if key not in value:
+                raise ParseError(f"{path}.{key} is missing")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in value:
+                validate(value[key], sub_schema, f"{path}.{key}")
+
+
+def parse(task, text, tool=None):
+    """Returns the validated JSON value of a reply to `task`."""
+    try:
+        value = json.loads(text)
+    except (ValueError, TypeError) as e:
+        _count(tool, "failed")
+        raise ParseError(f"reply is not valid JSON: {e}") from e
+    try:
+        validate(value, SCHEMAS[task])
+    except ParseError:
+        _count(tool, "failed")
+        raise
+    _count(tool, "parsed")
+    return value
+
+
+def generate(contents, task, model=gemini_client.DEFAULT_MODEL, tool=None, use_cache=True):
+    """
+    Runs `contents` with the schema for `task` and returns the parsed reply.
+    `model` is a model name or a `gemini_client.ModelHandle`; a model that
+    does not support response schemas raises ValueError before any call.
+    """
+    handle = model if isinstance(model, gemini_client.ModelHandle) else gemini_client.get_model(model)
+    if not gemini_client.supports_response_schema(handle.name):
+        raise ValueError(f"{handle.name} does not support response schemas; use {gemini_client.DEFAULT_MODEL} or newer")
+    task_config = config(task)
+    text = handle.generate(contents, config=task_config, tool=tool, use_cache=use_cache)
+    try:
+        return parse(task, text, tool)
+    except ParseError:
+        llm_cache.get_cache().delete(llm_cache.cache_key(handle.name, contents, task_config))
+        raise
+
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+
+def _count(tool, outcome):
+    with _counts_lock:
+        counts = _counts.setdefault(tool, {"parsed": 0, "failed": 0})
+        counts[outcome] += 1
+
+
+def stats():
+    """Returns {tool: {"parsed": n, "failed": n}} for this process."""
+    with _counts_lock:
+        return {tool: dict(counts) for tool, counts in _counts.items()}
+
+
+def print_stats():
+    """Prints per-tool parse failure rates, if any structured replies were parsed."""
+    if not _counts:
+        return
+    print("\nStructured replies (failed/total):")
+    for tool, counts in sorted(stats().items(), key=lambda item: str(item[0])):
+        total = counts["parsed"] + counts["failed"]
+        print(f"  {tool or 'untagged'}: {counts['failed']}/{total} ({counts['failed'] / total:.0%} failed)")
@@ -0,0 +1,155 @@
+"""In-memory stand-in for the parts of the Calendar API service the tools use."""
+import copy
+import datetime
+import itertools
+
+
+def parse_time(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class HttpError(Exception):
+    """Shaped like googleapiclient.errors.HttpError: the status is on `resp`, the reason codes in `error_details`."""
+
+    def __init__(self, status, reason=""):
+        super().__init__(f"HTTP {status} {reason}".strip())
+        self.resp = type("Response", (), {"status": status, "reason": reason})()
+        self.reason = reason
+        self.error_details = [{"reason": reason}] if reason else []
+
+
+class Request:
+    def __init__(self, run):
+        self._run = run
+
+    def execute(self):
+        return self._run()
+
+
+class BatchRequest:
+    """Runs its requests one by one and reports each to the callback, like BatchHttpRequest."""
+
+    def __init__(self, callback):
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self._requests:
+            try:
+                response, exception = request.execute(), None
+            except HttpError as e:
+                response, exception = None, e
+            self._callback(request_id, response, exception)
+
+
+class FakeCalendarService:
+    """
+    Events live in a dict; every insert or delete bumps a version number
+    and sync tokens are simply the version they were issued at. Setting
+    `expire_sync_token` makes the next incremental list fail with a 410;
+    errors put in `insert_errors` are raised by the next inserts, in order,
+    and the next `lost_insert_responses` inserts are stored but answered
+    with a 503, as when a response is lost on the way back.
+    Free/busy queries are recorded and answered from `busy`, a list of
+    (start, end) ISO strings that applies to every calendar.
+    """
+
+    def __init__(self):
+        self.events_by_id = {}
+        self.version = 0
+        self.changes = []
+        self.list_calls = []
+        self.expire_sync_token = False
+        self.insert_errors = []
+        self.lost_insert_responses = 0
+        self.busy = []
+        self.freebusy_queries = []
+        self.batches = 0
+        self._ids = itertools.count(1)
+
+    def events(self):
+        return self
+
+    def _touch(self, event):
+        self.version += 1
+        self.events_by_id[event["id"]] = event
+        self.changes.append((self.version, event["id"]))
+
+    def add(self, summary, start, end=None, **extra):
+        """Creates an event directly, as if it was added in another client."""
+        event = {"id": f"e{next(self._ids)}", "status": "confirmed", "summary": summary,
+                 "start": {"dateTime": start}, "end": {"dateTime": end or start}, **extra}
+        self._touch(event)
+        return copy.deepcopy(event)
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.freebusy_queries.append(body)
+
+        def run():
+            blocks = [{"start": start, "end": end} for start, end in self.busy
+                      if parse_time(start) < parse_time(body["timeMax"]) and parse_time(end) > parse_time(body["timeMin"])]
+            return {"calendars": {item["id"]: {"busy": blocks} for item in body["items"]}}
+        return Request(run)
+
+    def new_batch_http_request(self, callback):
+        self.batches += 1
+        return BatchRequest(callback)
+
+    def insert(self, calendarId, body, **kwargs):
+        def run():
+            if self.insert_errors:
+                raise self.insert_errors.pop(0)
+            event = copy.deepcopy(body)
+            event.setdefault("id", f"e{next(self._ids)}")
+            if event["id"] in self.events_by_id:
+                raise HttpError(409, "duplicate")
+            event["status"] = "confirmed"
+            self._touch(event)
+            if self.lost_insert_responses:
+                self.lost_insert_responses -= 1
+                raise HttpError(503, "backendError")
+            return copy.deepcopy(event)
+        return Request(run)
+
+    def get(self, calendarId, eventId, **kwargs):
+        def run():
+            if eventId not in self.events_by_id:
+                raise HttpError(404, "notFound")
+            return copy.deepcopy(self.events_by_id[eventId])
+        return Request(run)
+
+    def delete(self, calendarId, eventId, **kwargs):
+        def run():
+            if eventId not in self.events_by_id or self.events_by_id[eventId]["status"] == "cancelled":
+                raise HttpError(410, "deleted")
+            event = self.events_by_id[eventId]
+            event["status"] = "cancelled"
+            self._touch(event)
+        return Request(run)
+
+    def list(self, calendarId, pageToken=None, syncToken=None, maxResults=250, **kwargs):
+        self.list_calls.append({"syncToken": syncToken, "pageToken": pageToken})
+
+        def run():
+            if syncToken and self.expire_sync_token:
+                self.expire_sync_token = False
+                raise HttpError(410, "fullSyncRequired")
+            since = int(syncToken) if syncToken else 0
+            ids = sorted({event_id for version, event_id in self.changes if version > since})
+            items = [self.events_by_id[event_id] for event_id in ids]
+            if not syncToken:
+                items = [event for event in items if event["status"] != "cancelled"]
+            start = int(pageToken or 0)
+            page = {"items": copy.deepcopy(items[start:start + maxResults])}
+            if start + maxResults < len(items):
+                page["nextPageToken"] = str(start + maxResults)
+            else:
+                page["nextSyncToken"] = str(self.version)
+            return page
+        return Request(run)
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_and_print(directory, script, expression):
+    """Loads `script` as a module in a fresh interpreter in `directory` and prints `expression`."""
+    code = (
+        "import importlib.util\n"
+        f"spec = importlib.util.spec_from_file_location('tool', {os.path.join(ROOT, script)!r})\n"
+        "tool = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(tool)\n"
+        f"print({expression})\n"
+    )
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("LAW_", "GEMINI_"))}
+    env["PYTHONPATH"] = ROOT
+    return subprocess.run([sys.executable, "-c", code], cwd=directory, env=env,
+                          capture_output=True, text=True, check=True).stdout.split()
+
+
+def test_tool_reads_its_settings_from_auth_env(tmp_path):
+    (tmp_path / "auth.env").write_text("LAW_TOP_K=7\nGEMINI_RPM=3\n")
+    assert load_and_print(tmp_path, "11.py", "tool.LAW_TOP_K, tool.gemini_client.rate_limit.DEFAULT_RPM") == ["7", "3.0"]
+
+
+def test_launcher_loads_auth_env_before_the_shared_modules(tmp_path):
+    (tmp_path / "auth.env").write_text("GEMINI_RPM=3\n")
+    assert load_and_print(tmp_path, "0.py", "tool.rate_limit.DEFAULT_RPM") == ["3.0"]
@@ -0,0 +1,132 @@
+import datetime
+import importlib.util
+import json
+import os
+
+import pytest
+
+from fake_calendar import FakeCalendarService, HttpError
+
+UTC = datetime.timezone.utc
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_12", os.path.join(ROOT, "12.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def service():
+    return FakeCalendarService()
+
+
+@pytest.fixture
+def calendar(tool, service, tmp_path, monkeypatch):
+    monkeypatch.setattr(tool.time, "sleep", lambda seconds: None)
+    monkeypatch.setenv("CALENDAR_STORE_PATH", str(tmp_path / "events.sqlite"))
+    calendar = tool.StartupFounderCalendar()
+    calendar.calendar_manager._service = service
+    return calendar
+
+
+def write_jsonl(path, lines):
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (HttpError(403, "rateLimitExceeded"), True),
+    (HttpError(403, "userRateLimitExceeded"), True),
+    (HttpError(403, "forbidden"), False),
+    (HttpError(403), False),
+    (HttpError(404, "notFound"), False),
+    (HttpError(429, "rateLimitExceeded"), True),
+    (HttpError(503, "backendError"), True),
+    (ConnectionError("reset"), True),
+])
+def test_is_retryable(tool, error, expected):
+    assert tool.is_retryable(error) is expected
+
+
+def test_is_retryable_reads_the_reason_from_the_response_body(tool):
+    error = HttpError(403)
+    error.content = json.dumps({"error": {"errors": [{"reason": "userRateLimitExceeded"}]}}).encode()
+    assert tool.is_retryable(error)
+
+
+def test_malformed_jsonl_lines_are_reported_and_skipped(calendar, service, tmp_path, capsys):
+    path = write_jsonl(tmp_path / "bulk.jsonl", [
+        {"action": "add", "date": "2030-01-02", "time": "10:00", "subject": "Standup", "participants": []},
+        '{"action": "add", "date": ',
+        '["not", "an", "object"]',
+        {"action": "add", "date": "2030-01-03", "time": "3pm", "subject": "Review", "participants": []},
+    ])
+    items = calendar.run_bulk(path)
+
+    assert [item.get("ok") for item in items] == [True, None, None, True]
+    assert items[1]["result"].startswith("skipped, not valid JSON")
+    assert items[2]["result"] == "skipped, not a JSON object"
+    assert sorted(event["summary"] for event in service.events_by_id.values()) == ["Review", "Standup"]
+    assert "2 of 4 item(s) done." in capsys.readouterr().out
+
+
+def test_unreadable_time_is_reported_not_raised(calendar, service, tmp_path):
+    path = write_jsonl(tmp_path / "bulk.jsonl", [
+        {"action": "add", "date": "2030-01-02", "time": "after lunch", "subject": "Standup", "participants": []},
+    ])
+    items = calendar.run_bulk(path)
+
+    assert items[0]["result"] == "could not read the date '2030-01-02' and time 'after lunch'"
+    assert not service.events_by_id
+
+
+def test_run_batch_retries_rate_limited_inserts_only(calendar, service):
+    service.insert_errors = [HttpError(403, "rateLimitExceeded"), HttpError(403, "forbidden")]
+    operations = [{"action": "add", "body": {"summary": name}} for name in ("a", "b", "c")]
+    results = calendar.calendar_manager.run_batch(operations)
+
+    assert [result["ok"] for result in results] == [True, False, True]
+    assert "forbidden" in results[1]["error"]
+    assert service.batches == 2
+    assert sorted(event["summary"] for event in service.events_by_id.values()) == ["a", "c"]
+
+
+def test_check_slot_only_fetches_free_busy_around_the_meeting(tool, calendar, service):
+    conflicts, suggestions = calendar.calendar_manager.check_slot("2030-03-05", "10:00", ["a@b.com"])
+
+    assert (conflicts, suggestions) == ([], [])
+    zone = tool.zoneinfo.ZoneInfo(tool.CALENDAR_TIME_ZONE)
+    start = datetime.datetime(2030, 3, 5, 10, 0, tzinfo=zone)
+    assert [(query["timeMin"], query["timeMax"]) for query in service.freebusy_queries] == [
+        (start.astimezone(UTC).isoformat(), (start + datetime.timedelta(hours=1)).astimezone(UTC).isoformat())]
+
+
+def test_check_slot_suggests_free_slots_from_the_meeting_day(tool, calendar, service):
+    zone = tool.zoneinfo.ZoneInfo(tool.CALENDAR_TIME_ZONE)
+    start = datetime.datetime(2030, 3, 5, 10, 0, tzinfo=zone)
+    service.busy = [(start.isoformat(), (start + datetime.timedelta(hours=2)).isoformat())]
+
+    conflicts, suggestions = calendar.calendar_manager.check_slot("2030-03-05", "10:00", ["a@b.com"])
+
+    assert len(conflicts) == 1
+    assert suggestions[0][0] == start.replace(hour=9)  # free before the meeting too
+    assert all(slot_start >= start + datetime.timedelta(hours=2) for slot_start, _ in suggestions[1:])
+    day_before = (start - datetime.timedelta(days=1)).astimezone(UTC).isoformat()
+    assert all(query["timeMin"] >= day_before for query in service.freebusy_queries)
+
+
+def test_retried_insert_whose_response_was_lost_is_not_created_twice(calendar, service):
+    service.lost_insert_responses = 1
+    operations = [{"action": "add", "body": {"summary": name, "start": {"dateTime": "2030-01-02T10:00:00+00:00"},
+                                              "end": {"dateTime": "2030-01-02T11:00:00+00:00"}}}
+                  for name in ("a", "b")]
+    results = calendar.calendar_manager.run_batch(operations)
+
+    assert [result["ok"] for result in results] == [True, True]
+    assert sorted(event["summary"] for event in service.events_by_id.values()) == ["a", "b"]
+    assert results[0]["event"]["id"] == operations[0]["body"]["id"]
+    assert calendar.calendar_manager.store.get(operations[0]["body"]["id"])["summary"] == "a"
@@ -0,0 +1,120 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import calendar_store
+from fake_calendar import FakeCalendarService
+
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture
+def service():
+    return FakeCalendarService()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(calendar_store, "SYNC_PAGE_SIZE", 2)
+    return calendar_store.EventStore(str(tmp_path / "events.sqlite"))
+
+
+def at(hour, minute=0, day=2):
+    return datetime.datetime(2030, 1, day, hour, minute, tzinfo=UTC)
+
+
+def test_first_sync_downloads_every_page(service, store):
+    for i in range(5):
+        service.add(f"Meeting {i}", f"2030-01-02T1{i}:00:00Z")
+    assert store.sync(service) == (5, 0)
+    assert [call["syncToken"] for call in service.list_calls] == [None, None, None]
+    assert len(store.between(at(0))) == 5
+
+
+def test_later_syncs_send_the_sync_token_and_apply_only_changes(service, store):
+    first = service.add("Standup", "2030-01-02T09:00:00Z")
+    store.sync(service)
+    service.list_calls.clear()
+
+    added = service.add("Pitch", "2030-01-02T15:00:00Z")
+    assert store.sync(service) == (1, 0)
+    assert service.list_calls == [{"syncToken": "1", "pageToken": None}]
+    assert store.get(first["id"])["summary"] == "Standup"
+    assert store.find("pitch", "2030-01-02")[0]["id"] == added["id"]
+
+
+def test_cancelled_events_are_deleted(service, store):
+    kept = service.add("Standup", "2030-01-02T09:00:00Z")
+    dropped = service.add("Offsite", "2030-01-05T09:00:00Z")
+    store.sync(service)
+    service.delete("primary", dropped["id"]).execute()
+
+    assert store.sync(service) == (0, 1)
+    assert store.get(dropped["id"]) is None
+    assert store.find("offsite", "2030-01-05") == []
+    assert [event["id"] for event in store.between(at(0))] == [kept["id"]]
+
+
+def test_expired_sync_token_triggers_a_full_resync(service, store):
+    service.add("Standup", "2030-01-02T09:00:00Z")
+    stale = service.add("Offsite", "2030-01-05T09:00:00Z")
+    store.sync(service)
+    service.delete("primary", stale["id"]).execute()
+    service.add("Pitch", "2030-01-03T09:00:00Z")
+    service.expire_sync_token = True
+    service.list_calls.clear()
+
+    assert store.sync(service) == (2, 0)
+    assert service.list_calls[0]["syncToken"] is not None
+    assert all(call["syncToken"] is None for call in service.list_calls[1:])
+    assert sorted(event["summary"] for event in store.between(at(0))) == ["Pitch", "Standup"]
+
+
+def test_between_includes_events_still_running(service, store):
+    service.add("Workshop", "2030-01-02T09:00:00Z", "2030-01-02T12:00:00Z")
+    service.add("Lunch", "2030-01-02T12:30:00Z", "2030-01-02T13:30:00Z")
+    service.add("Earlier", "2030-01-02T07:00:00Z", "2030-01-02T08:00:00Z")
+    store.sync(service)
+
+    assert [e["summary"] for e in store.between(at(10), at(13))] == ["Workshop", "Lunch"]
+    assert [e["summary"] for e in store.between(at(12), at(12, 30))] == []
+
+
+def test_between_reads_all_day_and_local_time_events(service, store):
+    service.insert("primary", {"summary": "Holiday", "start": {"date": "2030-01-02"}, "end": {"date": "2030-01-03"}}).execute()
+    service.insert("primary", {"summary": "Call", "start": {"dateTime": "2030-01-02T15:30:00", "timeZone": "Asia/Kolkata"},
+                               "end": {"dateTime": "2030-01-02T16:00:00", "timeZone": "Asia/Kolkata"}}).execute()
+    store.sync(service)
+
+    # 15:30 in Kolkata is 10:00 UTC.
+    assert [e["summary"] for e in store.between(at(9, 59), at(10, 15))] == ["Holiday", "Call"]
+    assert [e["summary"] for e in store.between(at(10, 30), at(11))] == ["Holiday"]
+
+
+def test_put_and_remove_update_the_indexes(store):
+    event = {"id": "x1", "summary": "Board  Meeting", "start": {"dateTime": "2030-01-02T09:00:00Z"},
+             "end": {"dateTime": "2030-01-02T10:00:00Z"}}
+    store.put(event)
+    assert store.find("board meeting", "2030-01-02") == [event]
+    store.remove("x1")
+    assert store.find("board meeting", "2030-01-02") == []
+    assert store.between(at(0)) == []
+
+
+def test_old_database_without_end_column_is_cleared(tmp_path, service):
+    path = str(tmp_path / "old.sqlite")
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE events (id TEXT PRIMARY KEY, summary_norm TEXT NOT NULL, start_date TEXT NOT NULL,
+                             start_ts REAL NOT NULL, event TEXT NOT NULL);
+        CREATE TABLE sync_state (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO sync_state VALUES ('sync_token', '99');
+    """)
+    db.commit()
+    db.close()
+    store = calendar_store.EventStore(path)
+    service.add("Standup", "2030-01-02T09:00:00Z")
+    store.sync(service)
+    assert service.list_calls[0]["syncToken"] is None
+    assert len(store.between(at(0))) == 1
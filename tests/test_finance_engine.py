@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+import finance_engine
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$12,500", 12500.0),
+    ("4k", 4000.0),
+    ("2.5 lakh", 250000.0),
+    ("Rs.2,50,000 per month", 250000.0),
+    ("1.2 million", 1.2e6),
+    ("5 months", 5.0),
+])
+def test_parse_amount_reads_a_single_amount(text, expected):
+    assert finance_engine.parse_amount(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", [None, "", "about the same as last year", "rent 20,000, salaries 50,000", "10% of price", "Q3"])
+def test_parse_amount_rejects_missing_or_ambiguous_amounts(text):
+    assert finance_engine.parse_amount(text) is None
+
+
+def test_parse_total_adds_every_amount():
+    assert finance_engine.parse_total("rent 20,000, salaries 50,000") == 70000.0
+    assert finance_engine.parse_total("rent 1.5 lakh, salaries 3 lakh, tools 5k") == 455000.0
+    assert finance_engine.parse_total("rent $2000, salaries $8000") == 10000.0
+    assert finance_engine.parse_total("25000") == 25000.0
+
+
+@pytest.mark.parametrize("text", [
+    "2 employees at 50k each",
+    "rent 20000 for 12 months",
+    "rent $20,000 for 12 months",
+    "rent 2000 and salaries 8000",
+    "rent 20k + salaries 2x50k",
+    "salaries 50k each",
+    "Q3 rent 5000",
+])
+def test_parse_total_rejects_numbers_that_are_not_amounts(text):
+    assert finance_engine.parse_total(text) is None
+
+
+def test_parse_total_rejects_percentages():
+    assert finance_engine.parse_total("rent 20,000 plus 10% of revenue") is None
+    assert finance_engine.parse_total("nothing yet") is None
+
+
+def test_parse_percent():
+    assert finance_engine.parse_percent("5%") == 5.0
+    assert finance_engine.parse_percent("7.5") == 7.5
+    assert finance_engine.parse_percent("5% to 10%") is None
+
+
+def test_breakeven():
+    result = finance_engine.breakeven(10000, 20, 45)
+    assert result["contribution_margin"] == 25
+    assert result["units"] == 400
+    assert result["units_rounded"] == 400
+    assert result["revenue"] == 18000
+    assert finance_engine.breakeven(10000, 50, 45) is None
+
+
+def test_project_cash_flow_runway_and_breakeven_month():
+    projection = finance_engine.project_cash_flow(10000, 5000, variable_cost=0, price=100,
+                                                  units_per_month=20, monthly_growth=0.5, months=6)
+    # Net per month: -3000, -2000, -500, +1750, ...
+    assert list(projection["net"][:3]) == [-3000, -2000, -500]
+    assert projection["runway_months"] is None
+    assert projection["breakeven_month"] == 4
+
+
+def test_project_cash_flow_extends_runway_past_horizon():
+    projection = finance_engine.project_cash_flow(10000, 1000, months=3)
+    assert projection["runway_months"] == 10
+    assert projection["breakeven_month"] is None
+
+
+def test_sensitivity_grid_marks_loss_making_prices():
+    grid = finance_engine.sensitivity_grid(1000, [10, 20], [5, 15])
+    assert grid[0].tolist() == [200, 67]
+    assert np.isinf(grid[1][0]) and grid[1][1] == 200
+
+
+OPTIONS = [
+    {"name": "Ads", "monthly_spend": 5000, "cac": {"mean": 100, "sd": 20}, "growth": 0.02,
+     "churn": {"mean": 0.05, "sd": 0.01}, "cost": 0},
+    {"name": "Hire", "monthly_spend": 0, "cac": 1, "growth": {"mean": 0.05, "sd": 0.02},
+     "churn": 0.03, "cost": 8000},
+]
+
+
+def test_simulation_is_reproducible_with_a_seed():
+    first, seed = finance_engine.simulate_capital_options(OPTIONS, 200000, 20000, 50, 100, months=12, paths=500, seed=7)
+    second, _ = finance_engine.simulate_capital_options(OPTIONS, 200000, 20000, 50, 100, months=12, paths=500, seed=7, workers=2)
+    assert seed == 7
+    assert first == second
+    assert [summary["name"] for summary in first] == ["Ads", "Hire"]
+    assert all(0 <= summary["p_out_of_cash"] <= 1 for summary in first)
+
+
+@pytest.mark.parametrize("kwargs", [{"paths": 0}, {"paths": -5}, {"paths": 0.5}, {"months": 0}])
+def test_simulation_rejects_empty_runs(kwargs):
+    with pytest.raises(ValueError):
+        finance_engine.simulate_capital_options(OPTIONS, 200000, 20000, 50, **kwargs)
+
+
+def test_simulation_needs_an_option():
+    with pytest.raises(ValueError, match="option"):
+        finance_engine.simulate_capital_options([], 200000, 20000, 50, paths=10)
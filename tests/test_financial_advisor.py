@@ -0,0 +1,71 @@
+import importlib.util
+import os
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_4_5", os.path.join(ROOT, "4, 5.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+DETAILS = {
+    "industry": "SaaS", "product": "Invoicing", "stage": "revenue",
+    "fixed_costs": "rent 20,000, salaries 50,000", "variable_costs": "10", "pricing": "50",
+    "monthly_units": "1000", "monthly_growth": "5%",
+}
+
+
+def test_cash_flow_starts_from_the_available_capital(tool):
+    projection = tool.project_startup_cash_flow(DETAILS, "300000", months=3)
+    # Month 1: 1000 units at a 40 margin against 70,000 of fixed costs.
+    assert projection["net"][0] == pytest.approx(-30000.0)
+    assert projection["cash"][0] == pytest.approx(270000.0)
+
+
+@pytest.mark.parametrize("changes", [
+    {"fixed_costs": "2 employees at 50k each"},
+    {"fixed_costs": "rent 20000 for 12 months"},
+])
+def test_cash_flow_leaves_unclear_costs_to_the_model(tool, changes):
+    assert tool.project_startup_cash_flow({**DETAILS, **changes}, "300000") is None
+
+
+def test_cash_flow_needs_the_available_capital(tool):
+    assert tool.project_startup_cash_flow(DETAILS, None) is None
+
+
+@pytest.fixture
+def sections(tool, monkeypatch):
+    """Replaces the four analyses with local ones that take `delays[name]` seconds."""
+    delays = {}
+
+    def section(name):
+        def run(*args):
+            time.sleep(delays.get(name, 0))
+            return f"{name} done"
+        return run
+
+    for name in ("calculate_breakeven", "create_budget_plan", "analyze_focus_areas", "evaluate_capital_options"):
+        monkeypatch.setattr(tool, name, section(name))
+    return delays
+
+
+def test_report_sections_are_timed_from_when_they_start(tool, sections):
+    sections.update(calculate_breakeven=0.2, create_budget_plan=0.2, analyze_focus_areas=0.2)
+    report = tool.generate_full_report(DETAILS, "5000", "300000", timeout=0.5, max_concurrency=1)
+    assert "Timed out" not in report
+    assert report.count(" done") == 4
+
+
+def test_slow_report_section_times_out(tool, sections):
+    sections.update(analyze_focus_areas=1.0)
+    report = tool.generate_full_report(DETAILS, "5000", "300000", timeout=0.2, max_concurrency=4)
+    assert "=== Key Focus Areas ===\n\nTimed out after 0.2 seconds." in report
+    assert report.count(" done") == 3
@@ -0,0 +1,75 @@
+import types
+
+import pytest
+
+import gemini_client
+import llm_cache
+
+
+class FakeCaches:
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+
+    def create(self, model, config):
+        self.created.append(model)
+        return types.SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+    def delete(self, name):
+        self.deleted.append(name)
+
+
+class FakeModels:
+    def __init__(self):
+        self.requests = []
+
+    def generate_content_stream(self, model, contents, config=None):
+        self.requests.append((model, contents, config))
+        usage = types.SimpleNamespace(prompt_token_count=120, cached_content_token_count=0)
+        yield types.SimpleNamespace(text="answer", usage_metadata=usage)
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    fake = types.SimpleNamespace(caches=FakeCaches(), models=FakeModels())
+    monkeypatch.setattr(gemini_client, "_client", fake)
+    monkeypatch.setattr(gemini_client, "genai_types", types.SimpleNamespace(
+        CreateCachedContentConfig=dict, GenerateContentConfig=dict))
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.ResponseCache(str(tmp_path / "cache.sqlite")))
+    return fake
+
+
+def test_cache_min_tokens():
+    assert gemini_client.cache_min_tokens("gemini-2.0-flash") == 4096
+    assert gemini_client.cache_min_tokens("models/gemini-1.5-flash-001") == 32768
+    assert gemini_client.cache_min_tokens("gemini-pro") is None
+    assert gemini_client.cache_min_tokens("gemini-1.0-pro") is None
+
+
+def test_session_does_not_try_to_cache_a_small_context(client):
+    context = "Company: Acme, a 5 person startup selling shoes."
+    session = gemini_client.ContextSession(context, model="gemini-2.0-flash", tool="test")
+    assert "".join(session.stream("task")) == "answer"
+    assert client.caches.created == []
+    assert client.models.requests[0][1:] == ("task", {"system_instruction": context})
+    assert "company context re-sent" in session.usage_report()
+    assert session.cache_error in session.usage_report()
+
+
+@pytest.mark.parametrize("model", ["gemini-pro", "gemini-1.0-pro"])
+def test_session_puts_the_context_in_the_prompt_for_models_without_system_instructions(client, model):
+    context = "x" * 100000
+    session = gemini_client.ContextSession(context, model=model, tool="test")
+    assert "".join(session.stream("task")) == "answer"
+    assert client.caches.created == []
+    assert client.models.requests[0][1:] == ([context, "task"], None)
+    assert "does not support context caching" in session.usage_report()
+
+
+def test_session_caches_a_large_enough_context(client):
+    session = gemini_client.ContextSession("word " * 20000, model="gemini-2.0-flash", tool="test")
+    list(session.stream("task"))
+    assert client.caches.created == ["gemini-2.0-flash"]
+    assert client.models.requests[0][2] == {"cached_content": "cachedContents/1"}
+    session.close()
+    assert client.caches.deleted == ["cachedContents/1"]
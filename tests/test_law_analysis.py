@@ -0,0 +1,94 @@
+import importlib.util
+import os
+import threading
+import time
+
+import pytest
+
+import structured_output
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_11", os.path.join(ROOT, "11.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def law(n, words=10):
+    return f"Law {n}: " + " ".join(["rule"] * words)
+
+
+def test_shards_stay_under_the_token_budget_and_keep_law_order(tool):
+    laws = [law(n) for n in range(20)]
+    budget = 60
+    shards = tool.pack_law_shards(laws, budget)
+    assert len(shards) > 1
+    assert [item for shard in shards for item in shard] == laws
+    for shard in shards:
+        assert sum(tool.estimate_tokens(item) + 1 for item in shard) <= budget
+
+
+def test_a_law_larger_than_the_budget_gets_a_shard_of_its_own(tool):
+    laws = [law(0), law(1, words=200), law(2)]
+    assert tool.pack_law_shards(laws, 30) == [[laws[0]], [laws[1]], [laws[2]]]
+    assert tool.pack_law_shards([], 30) == []
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Answers law checks locally: even-numbered laws are violated; a shard holding "Law 5" fails."""
+    calls = []
+    lock = threading.Lock()
+
+    def generate(prompt, task, model, tool=None):
+        laws = [line for line in prompt.splitlines() if line.startswith("Law ")]
+        with lock:
+            calls.append(laws)
+        if any(line.startswith("Law 5:") for line in laws):
+            raise RuntimeError("quota exhausted")
+        if laws[0].startswith("Law 0:"):
+            time.sleep(0.05)  # the first shard answers last
+        numbers = [int(line.split()[1].rstrip(":")) for line in laws]
+        return [{"law": line, "violated": n % 2 == 0, "explanation": f"because of law {n}"}
+                for line, n in zip(laws, numbers)]
+
+    monkeypatch.setattr(structured_output, "generate", generate)
+    return calls
+
+
+def test_shard_results_are_merged_in_law_order(tool, gemini):
+    laws = [law(n) for n in range(10) if n != 5]
+    violations, rationales = tool.analyze_decision_vs_laws(
+        "decision", laws, model=None, top_k=0, shard_tokens=40, max_concurrency=4)
+    assert len(gemini) > 1
+    assert violations == [law(n) for n in (0, 2, 4, 6, 8)]
+    assert rationales == [f"because of law {n}" for n in (0, 2, 4, 6, 8)]
+
+
+def test_failed_shards_are_reported_and_skipped(tool, gemini, capsys):
+    laws = [law(n) for n in range(10)]
+    failures = []
+    violations, _ = tool.analyze_decision_vs_laws(
+        "decision", laws, model=None, top_k=0, shard_tokens=40, failures=failures)
+
+    assert len(failures) == 1
+    assert law(5) in failures[0]["laws"]
+    assert failures[0]["error"] == "quota exhausted"
+    assert not set(failures[0]["laws"]) & set(violations)
+    assert set(violations) == {law(n) for n in (0, 2, 4, 6, 8)} - set(failures[0]["laws"])
+    assert "could not be checked; the result is incomplete" in capsys.readouterr().out
+
+
+def test_strict_mode_raises_shard_errors(tool, gemini):
+    with pytest.raises(RuntimeError, match="quota exhausted"):
+        tool.analyze_decision_vs_laws("decision", [law(5)], model=None, top_k=0, strict=True)
+
+
+def test_no_model_call_when_no_law_is_relevant(tool, gemini):
+    laws = [law(n) for n in range(10)]
+    assert tool.analyze_decision_vs_laws("open a bakery", laws, model=None, top_k=3) == ([], [])
+    assert gemini == []
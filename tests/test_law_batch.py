@@ -0,0 +1,129 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_11", os.path.join(ROOT, "11.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def evaluate(tool, monkeypatch):
+    """Replaces the Gemini check: decisions listed in `failing` fail, the others pass."""
+    failing = set()
+    checked = []
+
+    def evaluate_record(record_id, decision_text, laws, model, index):
+        checked.append(record_id)
+        error = "quota exhausted" if record_id in failing else None
+        return {"id": record_id, "decision": decision_text, "violations": [], "error": error}
+
+    monkeypatch.setattr(tool, "evaluate_record", evaluate_record)
+    return failing, checked
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def write_decisions(path, count):
+    path.write_text("\n".join(json.dumps({"id": f"d{i}", "decision": f"decision {i}"}) for i in range(count)), encoding="utf-8")
+    return str(path)
+
+
+def test_resumed_batch_replaces_earlier_failures(tool, evaluate, tmp_path):
+    failing, checked = evaluate
+    input_path = write_decisions(tmp_path / "decisions.jsonl", 4)
+    output_path = str(tmp_path / "results.jsonl")
+
+    failing.update({"d1", "d3"})
+    assert tool.run_batch(input_path, output_path, [], None, index=object(), workers=2) == {"ok": 2, "failed": 2, "skipped": 0}
+
+    failing.clear()
+    checked.clear()
+    assert tool.run_batch(input_path, output_path, [], None, index=object(), workers=2) == {"ok": 2, "failed": 0, "skipped": 2}
+    assert sorted(checked) == ["d1", "d3"]
+
+    results = read_results(output_path)
+    assert sorted(result["id"] for result in results) == ["d0", "d1", "d2", "d3"]
+    assert not any(result["error"] for result in results)
+
+
+def test_partial_last_line_is_dropped_on_resume(tool, evaluate, tmp_path):
+    failing, checked = evaluate
+    input_path = write_decisions(tmp_path / "decisions.jsonl", 2)
+    output_path = tmp_path / "results.jsonl"
+    output_path.write_text(json.dumps({"id": "d0", "decision": "decision 0", "violations": [], "error": None}) + '\n{"id": "d1", "dec', encoding="utf-8")
+
+    tool.run_batch(input_path, str(output_path), [], None, index=object())
+
+    assert checked == ["d1"]
+    assert [result["id"] for result in read_results(output_path)] == ["d0", "d1"]
+
+
+def test_unreadable_jsonl_lines_are_reported_and_skipped(tool, evaluate, tmp_path, capsys):
+    failing, checked = evaluate
+    input_path = tmp_path / "decisions.jsonl"
+    input_path.write_text("\n".join([
+        json.dumps({"id": "a", "decision": "Hire contractors"}),
+        '{"id": "b", "decision": ',
+        "5",
+        "[]",
+        json.dumps("Open a branch abroad"),
+    ]), encoding="utf-8")
+    output_path = str(tmp_path / "results.jsonl")
+
+    counts = tool.run_batch(str(input_path), output_path, [], None, index=object())
+
+    assert counts == {"ok": 2, "failed": 0, "skipped": 3}
+    assert sorted(checked) == ["5", "a"]
+    out = capsys.readouterr().out
+    assert "Line 2: skipped, not valid JSON" in out
+    assert "Line 3: skipped, not a JSON object or string" in out
+    assert "Line 4: skipped, not a JSON object or string" in out
+
+
+def test_finished_results_are_written_when_reading_fails(tool, evaluate, tmp_path, monkeypatch):
+    def read_decisions(path, invalid=None):
+        yield "a", "Hire contractors"
+        raise OSError("input file went away")
+
+    monkeypatch.setattr(tool, "read_decisions", read_decisions)
+    output_path = str(tmp_path / "results.jsonl")
+
+    with pytest.raises(OSError):
+        tool.run_batch(str(tmp_path / "decisions.jsonl"), output_path, [], None, index=object())
+
+    assert [result["id"] for result in read_results(output_path)] == ["a"]
+
+
+def test_csv_without_a_decision_column_is_rejected(tool, evaluate, tmp_path):
+    failing, checked = evaluate
+    input_path = tmp_path / "decisions.csv"
+    input_path.write_text("id,text\n1,Hire contractors\n", encoding="utf-8")
+    output_path = tmp_path / "results.jsonl"
+
+    with pytest.raises(ValueError, match="no 'decision' column"):
+        tool.run_batch(str(input_path), str(output_path), [], None, index=object())
+    assert not checked
+    assert not output_path.exists()
+
+
+def test_csv_decisions(tool, evaluate, tmp_path):
+    failing, checked = evaluate
+    input_path = tmp_path / "decisions.csv"
+    input_path.write_text("id,decision\nx,Hire contractors\n,Open a branch\ny,\n", encoding="utf-8")
+
+    counts = tool.run_batch(str(input_path), str(tmp_path / "results.jsonl"), [], None, index=object())
+
+    assert counts == {"ok": 2, "failed": 0, "skipped": 1}
+    assert sorted(checked) == ["2", "x"]
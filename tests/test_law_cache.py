@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+import law_cache
+
+LAWS = ["Section 1: No fraud.", "Section 2: Pay taxes — on time.", ""]
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "laws.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    return str(path)
+
+
+def test_round_trip(pdf):
+    law_cache.save(pdf, LAWS)
+    laws = law_cache.load(pdf)
+    assert list(laws) == LAWS
+    assert laws[-2] == LAWS[1]
+    assert laws[1:] == LAWS[1:]
+
+
+def test_changed_pdf_invalidates_the_cache(pdf):
+    law_cache.save(pdf, LAWS)
+    with open(pdf, "ab") as f:
+        f.write(b" more")
+    assert law_cache.load(pdf) is None
+
+
+def test_touched_pdf_keeps_the_cache_and_records_the_new_mtime(pdf):
+    law_cache.save(pdf, LAWS)
+    os.utime(pdf, (1_000_000, 1_000_000))
+    assert list(law_cache.load(pdf)) == LAWS
+    with open(law_cache.cache_path(pdf), "rb") as f:
+        assert law_cache._HEADER.unpack(f.read(law_cache._HEADER.size))[2] == 1_000_000
+
+
+def test_read_only_cache_is_loaded(pdf, monkeypatch):
+    law_cache.save(pdf, LAWS)
+    os.utime(pdf, (1_000_000, 1_000_000))
+
+    def read_only_open(path, mode="r", *args, **kwargs):
+        if any(flag in mode for flag in "wa+"):
+            raise PermissionError(13, "Permission denied", path)
+        return open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(law_cache, "open", read_only_open, raising=False)
+    assert list(law_cache.load(pdf)) == LAWS
@@ -0,0 +1,67 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+from law_index import LawIndex, tokenize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAWS = [
+    "Employers must pay overtime for hours worked beyond forty per week.",
+    "Personal data may not be transferred abroad without consent of the data subject.",
+    "A company must keep accounting records for seven years.",
+    "Data breaches involving personal data must be reported within 72 hours.",
+    "Alcohol may not be sold to persons under eighteen.",
+]
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_11", os.path.join(ROOT, "11.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The data, of the Subject!") == ["data", "subject"]
+
+
+def test_ranking_prefers_laws_sharing_more_and_rarer_terms():
+    index = LawIndex(LAWS)
+    ranked = [i for i, _ in index.top_k("Store customer personal data on servers abroad", k=5)]
+    assert ranked[:2] == [1, 3]
+    assert 0 not in ranked  # shares no term with the query
+
+
+def test_top_k_limits_and_thresholds():
+    index = LawIndex(LAWS)
+    everything = index.top_k("personal data overtime records", k=5)
+    assert len(everything) == 4
+    assert [score for _, score in everything] == sorted((score for _, score in everything), reverse=True)
+    assert index.top_k("personal data overtime records", k=2) == everything[:2]
+    threshold = everything[1][1]
+    assert [i for i, _ in index.top_k("personal data overtime records", k=5, min_score=threshold)] == [everything[0][0]]
+    assert index.top_k("personal data", k=0) == []
+
+
+def test_empty_corpus_and_query():
+    empty = LawIndex([])
+    assert len(empty) == 0
+    assert empty.top_k("personal data") == []
+    index = LawIndex(LAWS)
+    assert np.array_equal(index.scores(""), np.zeros(len(LAWS)))
+    assert index.top_k("the of and") == []
+    assert index.top_k("blockchain") == []
+
+
+def test_select_relevant_laws(tool):
+    index = LawIndex(LAWS)
+    assert tool.select_relevant_laws("transfer personal data abroad", LAWS, index, top_k=2) == [LAWS[1], LAWS[3]]
+    # A corpus no larger than top_k, or top_k=0, is sent whole without ranking.
+    assert tool.select_relevant_laws("blockchain", LAWS, index, top_k=10) == LAWS
+    assert tool.select_relevant_laws("blockchain", LAWS, index, top_k=0) == LAWS
+    # Nothing matches: no law is selected, so no model call is made for it.
+    assert tool.select_relevant_laws("blockchain", LAWS, index, top_k=2) == []
@@ -0,0 +1,37 @@
+import sys
+import threading
+
+import lazy_imports
+
+
+def test_lazy_module_loads_on_first_attribute():
+    module = lazy_imports.lazy_import("colorsys")
+    assert "not loaded" in repr(module)
+    assert module.rgb_to_hsv(1, 0, 0)[0] == 0
+    assert "colorsys" in sys.modules
+
+
+def test_import_timer_keeps_nesting_per_thread():
+    timer = lazy_imports.ImportTimer()
+    outer_started = threading.Event()
+    inner_done = threading.Event()
+
+    def other_thread():
+        outer_started.wait()
+        timer.enter()
+        timer.leave("other", 50.0)
+        inner_done.set()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    timer.enter()
+    outer_started.set()
+    inner_done.wait()
+    timer.enter()
+    timer.leave("child", 10.0)
+    timer.leave("parent", 30.0)
+    thread.join()
+
+    records = {name: (self_ms, cumulative_ms) for name, self_ms, cumulative_ms in timer.records}
+    # The other thread's import is not counted as a child of "parent".
+    assert records == {"other": (50.0, 50.0), "child": (10.0, 10.0), "parent": (20.0, 30.0)}
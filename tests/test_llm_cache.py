@@ -0,0 +1,69 @@
+import pytest
+
+import llm_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return llm_cache.ResponseCache(str(tmp_path / "cache.sqlite"))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_key_ignores_indentation_but_not_content():
+    key = llm_cache.cache_key("gemini-1.5-flash", "Analyse\n    the market  for   tea")
+    assert key == llm_cache.cache_key("gemini-1.5-flash", "  Analyse\nthe market for tea  ")
+    assert key != llm_cache.cache_key("gemini-1.5-flash", "Analyse\nthe market for coffee")
+    assert key != llm_cache.cache_key("gemini-1.5-pro", "Analyse\nthe market for tea")
+    assert key != llm_cache.cache_key("gemini-1.5-flash", "Analyse\nthe market for tea", {"temperature": 0})
+
+
+def test_get_put_delete_and_hit_counts(cache):
+    assert cache.get("k", tool="marketing") is None
+    cache.put("k", "reply", tool="marketing")
+    assert cache.get("k", tool="marketing") == "reply"
+    cache.delete("k")
+    assert cache.get("k", tool="marketing") is None
+    assert cache.stats() == {"marketing": {"hits": 1, "misses": 2}}
+
+
+def test_entries_expire_after_the_tool_ttl(cache, clock):
+    cache.put("calendar", "reply", tool="calendar")
+    cache.put("legal", "reply", tool="legal_check")
+    clock[0] += llm_cache.HOUR + 1
+    assert cache.get("calendar") is None
+    assert cache.get("legal") == "reply"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = llm_cache.ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 100)
+        clock[0] += 1
+        if key == "b":
+            cache.get("a")  # "a" is now used more recently than "b"
+            clock[0] += 1
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 100
+    assert cache.get("c") == "x" * 100
+
+
+def test_cached_call_only_calls_the_model_once(cache, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    calls = []
+
+    def call():
+        calls.append(1)
+        return "reply"
+
+    assert llm_cache.cached_call("m", "prompt", None, "marketing", call) == "reply"
+    assert llm_cache.cached_call("m", "prompt", None, "marketing", call) == "reply"
+    assert llm_cache.cached_call("m", "prompt", None, "marketing", call, use_cache=False) == "reply"
+    monkeypatch.setenv("NEONET_CACHE_BYPASS", "1")
+    assert llm_cache.cached_call("m", "prompt", None, "marketing", call) == "reply"
+    assert len(calls) == 3
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_9_10", os.path.join(ROOT, "9, 10.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeSession:
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def stream(self, prompt):
+        yield from self.chunks
+        if self.error:
+            raise self.error
+
+    def usage_report(self):
+        return "Input tokens: 10"
+
+
+def test_finished_analysis_replaces_the_file(tool, tmp_path):
+    path = tmp_path / "analysis.txt"
+    path.write_text("old analysis")
+    assert tool.stream_analysis("p", str(path), "analysis", FakeSession(["new ", "analysis"])) == "new analysis"
+    assert path.read_text() == "new analysis"
+    assert not (tmp_path / "analysis.txt.partial").exists()
+
+
+def test_failure_before_the_first_chunk_keeps_the_old_file(tool, tmp_path, capsys):
+    path = tmp_path / "analysis.txt"
+    path.write_text("old analysis")
+    tool.stream_analysis("p", str(path), "analysis", FakeSession([], RuntimeError("quota")))
+    assert path.read_text() == "old analysis"
+    assert not (tmp_path / "analysis.txt.partial").exists()
+    assert "Error generating analysis: quota" in capsys.readouterr().out
+
+
+def test_failure_midway_keeps_the_partial_output_separately(tool, tmp_path):
+    path = tmp_path / "analysis.txt"
+    path.write_text("old analysis")
+    tool.stream_analysis("p", str(path), "analysis", FakeSession(["half "], RuntimeError("dropped")))
+    assert path.read_text() == "old analysis"
+    assert (tmp_path / "analysis.txt.partial").read_text() == "half "
@@ -0,0 +1,86 @@
+import csv
+import importlib.util
+import json
+import os
+import threading
+
+import pytest
+
+import structured_output
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def tool():
+    spec = importlib.util.spec_from_file_location("tool_7", os.path.join(ROOT, "7.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """
+    Answers marketing batches locally, echoing each industry in upper case.
+    Industries in `dropped` are left out of any reply with others; a request
+    holding one of `failing` raises.
+    """
+    state = {"requests": [], "dropped": set(), "failing": set()}
+    lock = threading.Lock()
+
+    def generate(contents, task, model=None, tool=None):
+        industries = [line[2:] for line in contents[0].splitlines() if line.startswith("- ")]
+        with lock:
+            state["requests"].append(industries)
+        if set(industries) & state["failing"]:
+            raise structured_output.ParseError("reply is not valid JSON")
+        return [{"industry": industry.upper(), "hashtags": [industry.replace(" ", ""), "#startup"],
+                 "recommendations": f" Post about {industry} "}
+                for industry in industries if len(industries) == 1 or industry not in state["dropped"]]
+
+    monkeypatch.setattr(structured_output, "generate", generate)
+    return state
+
+
+def test_industries_are_packed_into_batches(tool, gemini):
+    industries = [f"industry {n}" for n in range(5)]
+    rows = tool.run_batch(industries, batch_size=2, concurrency=2)
+
+    assert sorted(map(len, gemini["requests"])) == [1, 2, 2]
+    assert [row["industry"] for row in rows] == industries
+    assert rows[0] == {"industry": "industry 0", "hashtags": ["#industry0", "#startup"],
+                       "recommendations": "Post about industry 0", "error": ""}
+
+
+def test_repeats_in_any_case_are_checked_once(tool, gemini):
+    rows = tool.run_batch(["Fintech", "fintech ", "FINTECH", "Edtech"], batch_size=8)
+    assert gemini["requests"] == [["Fintech", "Edtech"]]
+    assert [row["industry"] for row in rows] == ["Fintech", "Edtech"]
+    assert rows[0]["recommendations"] == "Post about Fintech"
+
+
+def test_missing_and_failed_industries_are_retried_alone(tool, gemini):
+    gemini["dropped"].add("b")
+    gemini["failing"].add("d")
+    rows = tool.run_batch(["a", "b", "c", "d"], batch_size=2, concurrency=1)
+
+    assert gemini["requests"] == [["a", "b"], ["c", "d"], ["b"], ["c"], ["d"]]
+    assert [row["error"] for row in rows] == ["", "", "", "reply is not valid JSON"]
+
+
+def test_read_industries(tool, tmp_path):
+    (tmp_path / "list.txt").write_text("Fintech\n\nfintech\nEdtech  \n", encoding="utf-8")
+    (tmp_path / "list.csv").write_text("id,Industry\n1,Fintech\n2,Edtech\n", encoding="utf-8")
+    (tmp_path / "list.json").write_text(json.dumps(["Fintech", " Edtech", "EDTECH"]), encoding="utf-8")
+    for name in ("list.txt", "list.csv", "list.json"):
+        assert tool.read_industries(str(tmp_path / name)) == ["Fintech", "Edtech"]
+
+
+def test_write_results(tool, tmp_path):
+    rows = [{"industry": "Fintech", "hashtags": ["#pay", "#bank"], "recommendations": "Post", "error": ""}]
+    tool.write_results(rows, str(tmp_path / "out.csv"))
+    tool.write_results(rows, str(tmp_path / "out.json"))
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        assert list(csv.DictReader(f)) == [{"industry": "Fintech", "hashtags": "#pay #bank", "recommendations": "Post", "error": ""}]
+    assert json.loads((tmp_path / "out.json").read_text(encoding="utf-8")) == rows
@@ -0,0 +1,105 @@
+import datetime
+
+import pytest
+
+import meeting_parser
+
+
+@pytest.mark.parametrize("text", [
+    "find a free slot 45 min with a@b.com",
+    "Show available slots next week",
+    "when are we all free?",
+    "find time with priya@fund.com",
+    "check my availability",
+])
+def test_free_slot_requests(text):
+    assert meeting_parser.is_free_slot_request(text)
+
+
+@pytest.mark.parametrize("text", [
+    "delete the meeting if I'm not available",
+    "schedule a meeting about availability of funds",
+    "meet bob when he is available tomorrow at 3pm",
+])
+def test_other_requests_mentioning_availability(text):
+    assert not meeting_parser.is_free_slot_request(text)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("15:00", "15:00"),
+    ("15:00:00", "15:00"),
+    ("3pm", "15:00"),
+    ("3:30 p.m.", "15:30"),
+    ("12 am", "00:00"),
+    ("noon", "12:00"),
+    ("3pm-ish", None),
+    ("afternoon", None),
+    ("25:00", None),
+    ("", None),
+    (None, None),
+])
+def test_normalize_time(value, expected):
+    assert meeting_parser.normalize_time(value) == expected
+
+
+def test_normalize_date():
+    assert meeting_parser.normalize_date("2030-01-02") == "2030-01-02"
+    assert meeting_parser.normalize_date("2030-02-30") is None
+    assert meeting_parser.normalize_date("next friday") is None
+    assert meeting_parser.normalize_date(None) is None
+
+
+TODAY = datetime.date(2026, 10, 14)  # a Wednesday
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Meet priya@fund.com on 2026-11-02 at 3pm about the seed round",
+     {"date": "2026-11-02", "time": "15:00", "subject": "Seed round", "participants": ["priya@fund.com"]}),
+    ("Schedule a call with a@b.com and c@d.org tomorrow at 14:30 to discuss hiring",
+     {"date": "2026-10-15", "time": "14:30", "subject": "Hiring", "participants": ["a@b.com", "c@d.org"]}),
+    ("next friday at noon regarding board prep",
+     {"date": "2026-10-23", "time": "12:00", "subject": "Board prep", "participants": []}),
+    ("Lunch with bob@x.io on 2 November at 1pm about pricing",
+     {"date": "2026-11-02", "time": "13:00", "subject": "Pricing", "participants": ["bob@x.io"]}),
+    ("Nov 2nd 2026 at 9am re: term sheet",
+     {"date": "2026-11-02", "time": "09:00", "subject": "Term sheet", "participants": []}),
+    ("the 20th at 10am about metrics",
+     {"date": "2026-10-20", "time": "10:00", "subject": "Metrics", "participants": []}),
+    ("day after tomorrow at 4:15 p.m. to discuss churn",
+     {"date": "2026-10-16", "time": "16:15", "subject": "Churn", "participants": []}),
+])
+def test_parse(text, expected):
+    assert meeting_parser.parse(text, TODAY) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "meet at 3 tomorrow about hiring",  # bare hour: am or pm?
+    "meet tomorrow about hiring",  # no time
+    "meet tomorrow or friday at 3pm about hiring",  # two dates
+    "meet tomorrow at 3pm",  # no subject
+])
+def test_parse_leaves_unclear_requests_to_the_model(text):
+    assert meeting_parser.parse(text, TODAY) is None
+
+
+EVENTS = [
+    {"summary": "Investor call", "start": {"dateTime": "2026-10-16T10:00:00Z"}},
+    {"summary": "Team standup", "start": {"dateTime": "2026-10-16T09:00:00Z"}},
+    {"summary": "Investor call", "start": {"dateTime": "2026-10-23T10:00:00Z"}},
+]
+
+
+def test_rank_events_is_confident_when_the_date_settles_it():
+    shortlist, confident = meeting_parser.rank_events("cancel the investor call on friday", EVENTS, TODAY)
+    assert [event for _, event in shortlist] == [EVENTS[0]]
+    assert confident
+
+
+def test_rank_events_asks_when_two_events_match():
+    shortlist, confident = meeting_parser.rank_events("cancel the investor call", EVENTS, TODAY)
+    assert [event for _, event in shortlist] == [EVENTS[0], EVENTS[2]]
+    assert not confident
+
+
+def test_rank_events_leaves_out_unrelated_events():
+    assert meeting_parser.rank_events("delete the dentist", EVENTS, TODAY) == ([], False)
@@ -0,0 +1,130 @@
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+import profile_search
+import profile_store
+
+
+class StubSearch(http.server.ThreadingHTTPServer):
+    """Local Custom Search endpoint: ten results per page, optional one-off 429s."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttle_once = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/customsearch/v1"
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        params = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        query, start = params["q"][0], int(params["start"][0])
+        with server.lock:
+            server.requests.append((query, start))
+            throttled = (query, start) in server.throttle_once
+            server.throttle_once.discard((query, start))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if throttled:
+                self._reply(429, {}, {"Retry-After": "0"})
+                return
+            if "missing" in query:
+                self._reply(404, {})
+                return
+            time.sleep(0.05)
+            # Both queries return profiles p1..p15, on alternating country subdomains.
+            offset = 0 if query.endswith("python") else 5
+            items = [{"title": f"Person {n}", "snippet": query,
+                      "link": f"https://{'in' if n % 2 else 'www'}.linkedin.com/in/p{n}/?trk=x"}
+                     for n in range(start + offset, start + offset + profile_search.PAGE_SIZE) if n <= 15]
+            self._reply(200, {"items": items})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubSearch()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(profile_search, "CUSTOM_SEARCH_URL", server.url)
+    monkeypatch.setattr(profile_search, "_session", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+QUERIES = ["site:linkedin.com/in python", "site:linkedin.com/in django"]
+
+
+def test_pages_are_fetched_concurrently_retried_and_deduplicated(stub):
+    stub.throttle_once.add((QUERIES[0], 11))
+    profiles = profile_search.search_profiles(QUERIES, pages=2, workers=4)
+
+    # 2 queries x 2 pages, plus one retry of the throttled page.
+    assert sorted(stub.requests) == sorted([(q, s) for q in QUERIES for s in (1, 11)] + [(QUERIES[0], 11)])
+    assert stub.max_in_flight > 1
+    # p1..p15 from the first query and p6..p20 (capped at p15) from the second, each once.
+    keys = [profile_search.profile_key(p["link"]) for p in profiles]
+    assert len(keys) == len(set(keys)) == 15
+    assert profiles[0]["query"] == QUERIES[0]
+
+
+def test_store_skips_pages_fetched_recently(stub, tmp_path):
+    store = profile_store.ProfileStore(str(tmp_path / "profiles.sqlite"))
+    profile_search.search_profiles(QUERIES, pages=2, store=store)
+    assert len(store) == 15
+    stub.requests.clear()
+    assert profile_search.search_profiles(QUERIES, pages=3, store=store) == []
+    assert sorted(stub.requests) == sorted((q, 21) for q in QUERIES)
+
+
+def test_failed_page_is_reported_and_skipped(stub, capsys):
+    profiles = profile_search.search_profiles(["site:linkedin.com/in missing", QUERIES[0]], pages=1)
+    assert len(profiles) == 10
+    assert "search page 1 for 'site:linkedin.com/in missing' failed" in capsys.readouterr().out
+
+
+def test_profile_key_ignores_country_subdomain_query_and_slash():
+    assert (profile_search.profile_key("https://in.linkedin.com/in/Asha-Rao/?trk=1")
+            == profile_search.profile_key("https://www.linkedin.com/in/asha-rao"))
+
+
+def test_derive_queries():
+    recommendations = "**Search terms:**\n1. Senior Python developer Django\n- Backend engineer, fintech\nHi"
+    assert profile_search.derive_queries(recommendations, "Developer") == [
+        "site:linkedin.com/in Senior Python developer Django",
+        "site:linkedin.com/in Backend engineer, fintech",
+    ]
+    assert profile_search.derive_queries("", "Designer") == ["site:linkedin.com/in Designer"]
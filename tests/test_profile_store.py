@@ -0,0 +1,52 @@
+import profile_search
+import profile_store
+
+
+def profile(title, snippet, query, link=None):
+    link = link or "https://www.linkedin.com/in/" + title.lower().replace(" ", "-")
+    return {"title": title, "link": link, "snippet": snippet, "query": query}
+
+
+def make_store(tmp_path):
+    store = profile_store.ProfileStore(str(tmp_path / "profiles.sqlite"))
+    store.add([
+        profile("Asha Rao - Python Developer", "Backend developer, Django and Postgres", "python developer bangalore"),
+        profile("Ravi Menon - Product Designer", "Designer working with developer teams on Figma", "product designer",
+                link="https://www.linkedin.com/in/ravi-menon"),
+        profile("Kiran Shah - Frontend Developer", "React developer", "react developer"),
+    ], key=profile_search.profile_key)
+    return store
+
+
+def test_rank_only_returns_profiles_from_the_given_queries(tmp_path):
+    store = make_store(tmp_path)
+    ranked = store.rank("developer python", queries=["python developer bangalore", "react developer"])
+    assert [p["title"] for p in ranked] == ["Asha Rao - Python Developer", "Kiran Shah - Frontend Developer"]
+    assert store.rank("developer", queries=[]) == []
+
+
+def test_rank_without_queries_uses_the_whole_store(tmp_path):
+    store = make_store(tmp_path)
+    assert len(store.rank("developer")) == 3
+
+
+def test_profile_found_by_several_queries_matches_each(tmp_path):
+    store = make_store(tmp_path)
+    store.add([profile("Ravi Menon - Product Designer", "Designer", "ux designer",
+                       link="https://in.linkedin.com/in/ravi-menon/")], key=profile_search.profile_key)
+    assert len(store) == 3
+    assert [p["title"] for p in store.rank("designer", queries=["product designer"])] == ["Ravi Menon - Product Designer"]
+    assert [p["title"] for p in store.rank("designer", queries=["ux designer"])] == ["Ravi Menon - Product Designer"]
+
+
+def test_rank_limit(tmp_path):
+    store = make_store(tmp_path)
+    assert len(store.rank("developer", limit=1)) == 1
+    assert len(store.rank("developer", limit=0)) == 3
+
+
+def test_fresh_pages(tmp_path):
+    store = make_store(tmp_path)
+    store.mark_page("react developer", 11)
+    assert store.fresh_pages("react developer") == {11}
+    assert store.fresh_pages("react developer", max_age=-1) == set()
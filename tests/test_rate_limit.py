@@ -0,0 +1,155 @@
+import itertools
+import types
+
+import pytest
+
+import rate_limit
+
+_models = itertools.count()
+
+
+class ApiError(Exception):
+    def __init__(self, code, details=None, headers=None):
+        super().__init__(f"{code} error")
+        self.code = code
+        self.details = details
+        if headers is not None:
+            self.response = types.SimpleNamespace(headers=headers)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(rate_limit.time, "sleep", slept.append)
+    monkeypatch.setattr(rate_limit, "MAX_RETRIES", 5)
+    monkeypatch.setattr(rate_limit, "BREAKER_FAILURES", 3)
+    monkeypatch.setattr(rate_limit, "BACKOFF_SECONDS", 0.01)
+    return slept
+
+
+def model_name():
+    return f"test-model-{next(_models)}"
+
+
+def failing(*errors, result="ok"):
+    errors = list(errors)
+
+    def fn():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return fn
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = rate_limit.TokenBucket(60)
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    bucket.adjust(-61)
+    assert bucket.remaining() == pytest.approx(60, abs=0.1)
+    bucket.drain()
+    assert bucket.reserve(30) == pytest.approx(30, abs=0.05)
+
+
+def test_token_bucket_caps_oversized_reservations():
+    bucket = rate_limit.TokenBucket(100)
+    assert bucket.reserve(1000) == 0
+    assert bucket.remaining() == pytest.approx(0, abs=0.01)
+
+
+def test_retry_after_from_header_and_retry_info():
+    assert rate_limit.retry_after(ApiError(429, headers={"retry-after": "7"})) == 7
+    details = {"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"}]}}
+    assert rate_limit.retry_after(ApiError(429, details=details)) == 17
+    assert rate_limit.retry_after(ApiError(500)) is None
+
+
+def test_call_retries_transient_errors_honouring_retry_after(sleeps):
+    model = model_name()
+    details = {"error": {"details": [{"retryDelay": "3s"}]}}
+    assert rate_limit.call(model, failing(ApiError(429, details), ApiError(503)), usage=None) == "ok"
+    assert sleeps[0] >= 3
+    assert rate_limit.quota(model)["retries"] == 2
+
+
+def test_quota_error_empties_the_request_bucket(sleeps):
+    model = model_name()
+    limiter = rate_limit.get_limiter(model)
+    rate_limit.call(model, failing(), usage=None)
+    assert limiter.requests.remaining() > 0
+    rate_limit.call(model, failing(ApiError(429)), usage=None)
+    # Other callers now wait for the bucket to refill instead of adding to the 429s.
+    assert limiter.requests.remaining() == pytest.approx(0, abs=0.01)
+
+
+def test_call_does_not_retry_client_errors(sleeps):
+    model = model_name()
+    with pytest.raises(ApiError):
+        rate_limit.call(model, failing(ApiError(400)), usage=None)
+    assert sleeps == []
+    assert rate_limit.quota(model)["failed"] == 1
+
+
+def test_quota_errors_never_open_the_breaker(sleeps):
+    model = model_name()
+    for _ in range(rate_limit.BREAKER_FAILURES + 1):
+        with pytest.raises(ApiError):
+            rate_limit.call(model, failing(*[ApiError(429)] * 10), usage=None)
+    q = rate_limit.quota(model)
+    assert q["retries"] == (rate_limit.BREAKER_FAILURES + 1) * rate_limit.MAX_RETRIES
+    assert q["breaker_open_seconds"] == 0
+    assert rate_limit.call(model, failing(), usage=None) == "ok"
+
+
+def test_server_errors_open_the_breaker_after_consecutive_failed_calls(sleeps):
+    model = model_name()
+    for _ in range(rate_limit.BREAKER_FAILURES):
+        with pytest.raises(ApiError):
+            rate_limit.call(model, failing(*[ApiError(503)] * 10), usage=None)
+    # Each call used all its retries before counting as one failure.
+    assert rate_limit.quota(model)["retries"] == rate_limit.BREAKER_FAILURES * rate_limit.MAX_RETRIES
+    with pytest.raises(rate_limit.CircuitOpenError):
+        rate_limit.call(model, failing(), usage=None)
+    assert rate_limit.quota(model)["rejected"] == 1
+
+
+def test_success_resets_the_breaker_count(sleeps):
+    model = model_name()
+    for _ in range(rate_limit.BREAKER_FAILURES - 1):
+        with pytest.raises(ApiError):
+            rate_limit.call(model, failing(*[ApiError(500)] * 10), usage=None)
+    rate_limit.call(model, failing(), usage=None)
+    with pytest.raises(ApiError):
+        rate_limit.call(model, failing(*[ApiError(500)] * 10), usage=None)
+    assert rate_limit.call(model, failing(), usage=None) == "ok"
+
+
+def test_call_settles_real_token_usage(sleeps):
+    model = model_name()
+    response = types.SimpleNamespace(usage_metadata=types.SimpleNamespace(total_token_count=250))
+    rate_limit.call(model, lambda: response, estimated_tokens=100)
+    q = rate_limit.quota(model)
+    assert q["requests"] == 1
+    assert q["tokens"] == 250
+    assert q["remaining_tokens"] == pytest.approx(rate_limit.DEFAULT_TPM - 250, abs=50)
+
+
+def test_stream_retries_only_before_the_first_chunk(sleeps):
+    model = model_name()
+    chunk = types.SimpleNamespace(text="a", usage_metadata=types.SimpleNamespace(total_token_count=9))
+    attempts = []
+
+    def start():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ApiError(500)
+        yield chunk
+        raise ApiError(500)
+
+    received = []
+    with pytest.raises(ApiError):
+        for item in rate_limit.stream(model, start, estimated_tokens=5):
+            received.append(item)
+    assert received == [chunk]
+    assert len(attempts) == 2
+    assert rate_limit.quota(model)["tokens"] == 9
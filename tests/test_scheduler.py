@@ -0,0 +1,88 @@
+import datetime
+
+import scheduler
+
+UTC = datetime.timezone.utc
+HOUR = datetime.timedelta(hours=1)
+
+
+def at(hour, minute=0, day=7):
+    # 2030-01-07 is a Monday.
+    return datetime.datetime(2030, 1, day, hour, minute, tzinfo=UTC)
+
+
+def test_busy_intervals_are_merged():
+    index = scheduler.BusyIndex([(at(9), at(10)), (at(9, 30), at(11)), (at(11), at(12)), (at(14), at(15)), (at(16), at(16))])
+    assert len(index) == 2
+    assert index.conflicts(at(8), at(20)) == [(at(9), at(12)), (at(14), at(15))]
+
+
+def test_conflicts_and_is_free_use_half_open_intervals():
+    index = scheduler.BusyIndex([(at(10), at(11))])
+    assert index.conflicts(at(10, 30), at(12)) == [(at(10), at(11))]
+    assert index.is_free(at(11), at(12))
+    assert index.is_free(at(9), at(10))
+    assert not index.is_free(at(9), at(10, 1))
+
+
+def test_free_slots_skip_busy_blocks_and_align_to_step():
+    index = scheduler.BusyIndex([(at(9), at(10, 10)), (at(11), at(12))])
+    slots = index.free_slots([(at(9), at(13))], HOUR, count=3)
+    assert slots == [(at(12), at(13))]
+    slots = index.free_slots([(at(9), at(13))], datetime.timedelta(minutes=30), count=3)
+    assert slots == [(at(10, 30), at(11)), (at(12), at(12, 30)), (at(12, 30), at(13))]
+
+
+def test_free_slots_span_several_windows():
+    index = scheduler.BusyIndex([(at(9), at(18))])
+    windows = [(at(9), at(18)), (at(9, day=8), at(18, day=8))]
+    assert index.free_slots(windows, HOUR, count=1) == [(at(9, day=8), at(10, day=8))]
+
+
+def test_working_windows_skip_weekends():
+    windows = scheduler.working_windows(datetime.date(2030, 1, 11), datetime.date(2030, 1, 14), ["UTC"])
+    # Friday the 11th and Monday the 14th only.
+    assert windows == [(at(9, day=11), at(18, day=11)), (at(9, day=14), at(18, day=14))]
+
+
+def test_working_windows_intersect_time_zones():
+    day = datetime.date(2030, 1, 7)
+    windows = scheduler.working_windows(day, day, ["Asia/Kolkata", "Europe/London"])
+    # 09:00-18:00 in Kolkata is 03:30-12:30 UTC; London works 09:00-18:00 UTC in January.
+    assert windows == [(at(9), at(12, 30))]
+
+
+def test_working_windows_with_no_overlap():
+    day = datetime.date(2030, 1, 7)
+    assert scheduler.working_windows(day, day, ["Asia/Tokyo", "America/Los_Angeles"]) == []
+
+
+def test_working_windows_custom_hours():
+    day = datetime.date(2030, 1, 7)
+    windows = scheduler.working_windows(day, day, ["UTC"], datetime.time(10), datetime.time(12, 30))
+    assert windows == [(at(10), at(12, 30))]
+
+
+class FakeFreeBusy:
+    def __init__(self):
+        self.bodies = []
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.bodies.append(body)
+        calendars = {item["id"]: {"busy": [{"start": "2030-01-07T10:00:00Z", "end": "2030-01-07T11:00:00Z"}]}
+                     for item in body["items"]}
+        calendars[body["items"][0]["id"]] = {"errors": [{"reason": "notFound"}]}
+        return type("Request", (), {"execute": lambda self: {"calendars": calendars}})()
+
+
+def test_query_busy_splits_calendars_and_long_ranges():
+    service = FakeFreeBusy()
+    calendars = [f"person{i}@example.com" for i in range(120)]
+    busy, errors = scheduler.query_busy(service, calendars, at(0), at(0) + datetime.timedelta(days=100))
+    assert len(service.bodies) == 6  # 2 windows of at most 60 days x 3 groups of at most 50 calendars
+    assert max(len(body["items"]) for body in service.bodies) == 50
+    assert set(errors) == {"person0@example.com", "person50@example.com", "person100@example.com"}
+    assert busy[0] == (at(10), at(11))
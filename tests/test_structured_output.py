@@ -0,0 +1,106 @@
+import importlib.util
+import json
+import os
+import re
+
+import pytest
+
+import gemini_client
+import llm_cache
+import structured_output
+from structured_output import ParseError, SCHEMAS, validate
+
+
+@pytest.mark.parametrize("task, value", [
+    ("law_check", [{"law": "Section 1", "violated": False, "explanation": "Not relevant"}]),
+    ("law_check", []),
+    ("meeting_request", {"no_meeting": True}),
+    ("meeting_request", {"no_meeting": False, "date": "2026-11-02", "time": None, "subject": "Demo",
+                         "participants": ["a@b.com"]}),
+    ("event_choice", {"event_id": None}),
+    ("marketing_batch", [{"industry": "fintech", "hashtags": ["#pay"], "recommendations": "Post daily"}]),
+    ("headers", ["Experience", "Location"]),
+])
+def test_valid_replies(task, value):
+    validate(value, SCHEMAS[task])
+
+
+@pytest.mark.parametrize("task, value, message", [
+    ("law_check", {"law": "Section 1"}, "$ should be array, got dict"),
+    ("law_check", [{"law": "Section 1", "violated": "no", "explanation": ""}], "$[0].violated should be boolean"),
+    ("law_check", [{"law": "Section 1", "violated": True}], "$[0].explanation is missing"),
+    ("meeting_request", {"date": "2026-11-02"}, "$.no_meeting is missing"),
+    ("meeting_request", {"no_meeting": False, "participants": ["a@b.com", 3]}, "$.participants[1] should be string"),
+    ("event_choice", {"event_id": 42}, "$.event_id should be string"),
+    ("headers", None, "$ is null"),
+])
+def test_invalid_replies(task, value, message):
+    with pytest.raises(ParseError, match=re.escape(message)):
+        validate(value, SCHEMAS[task])
+
+
+def test_numbers_are_not_booleans():
+    validate(3.5, {"type": "NUMBER"})
+    with pytest.raises(ParseError):
+        validate(True, {"type": "INTEGER"})
+
+
+def test_parse_counts_outcomes_per_tool(monkeypatch):
+    monkeypatch.setattr(structured_output, "_counts", {})
+    assert structured_output.parse("headers", '["Experience"]', tool="people_search") == ["Experience"]
+    with pytest.raises(ParseError, match="not valid JSON"):
+        structured_output.parse("headers", "Experience, Location", tool="people_search")
+    with pytest.raises(ParseError):
+        structured_output.parse("headers", '{"headers": []}', tool="people_search")
+    assert structured_output.stats() == {"people_search": {"parsed": 1, "failed": 2}}
+
+
+class FakeHandle(gemini_client.ModelHandle):
+    def __init__(self, replies):
+        super().__init__("gemini-test")
+        self.replies = list(replies)
+        self.calls = 0
+
+    def generate_content(self, contents, config=None):
+        self.calls += 1
+        return type("Response", (), {"text": self.replies.pop(0)})()
+
+
+def test_generate_drops_a_bad_reply_from_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.ResponseCache(str(tmp_path / "cache.sqlite")))
+    handle = FakeHandle(["not json", json.dumps(["Experience"])])
+
+    with pytest.raises(ParseError):
+        structured_output.generate("Questions?", "headers", model=handle, tool="people_search")
+    assert structured_output.generate("Questions?", "headers", model=handle, tool="people_search") == ["Experience"]
+    assert structured_output.generate("Questions?", "headers", model=handle, tool="people_search") == ["Experience"]
+    assert handle.calls == 2
+
+
+def test_generate_refuses_models_without_response_schemas():
+    handle = FakeHandle(["[]"])
+    handle.name = "gemini-1.0-pro"
+    with pytest.raises(ValueError, match="does not support response schemas"):
+        structured_output.generate("Questions?", "headers", model=handle)
+    assert handle.calls == 0
+
+
+@pytest.mark.parametrize("model, expected", [
+    ("gemini-pro", False),
+    ("gemini-1.0-pro-001", False),
+    ("models/gemini-1.0-pro", False),
+    ("gemini-1.5-flash", True),
+    ("gemini-2.0-flash", True),
+    ("gemini-2.5-pro", True),
+])
+def test_supports_response_schema(model, expected):
+    assert gemini_client.supports_response_schema(model) is expected
+
+
+@pytest.mark.parametrize("script", ["11.py", "12.py", "7.py"])
+def test_tools_send_schema_tasks_to_a_model_that_supports_them(script):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    spec = importlib.util.spec_from_file_location(f"tool_{script[:-3]}", os.path.join(root, script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert gemini_client.supports_response_schema(module.MODEL_NAME)